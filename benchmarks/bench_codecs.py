@@ -0,0 +1,80 @@
+"""Compares the per-object overhead of decoding/encoding models
+one at a time (creating a new decoder every time) with the cached
+codecs and the bulk `decode_many`/`encode_many` API of `BaseInfo`.
+
+Usage:
+    python benchmarks/bench_codecs.py [num_objects]
+"""
+
+import sys
+import timeit
+
+import msgspec as msg
+
+from mkite_core.models import JobInfo, CrystalInfo
+
+
+def make_jobinfo(i: int) -> JobInfo:
+    crystal = CrystalInfo(
+        species=["Si", "Si"],
+        coords=[(0.0, 0.0, 0.0), (1.365, 1.365, 1.365)],
+        lattice=((0.0, 2.73, 2.73), (2.73, 0.0, 2.73), (2.73, 2.73, 0.0)),
+    )
+    return JobInfo(
+        job={"id": i, "uuid": f"{i:08d}-962d-4053-8c73-36f313d6fa36"},
+        recipe={"name": "test_recipe"},
+        options={"INCAR": {"ENCUT": 680}},
+        inputs=[crystal.as_dict()],
+    )
+
+
+def report(name: str, seconds: float, num: int):
+    print(f"{name:<40} {seconds * 1e3:10.2f} ms {seconds / num * 1e6:10.2f} us/obj")
+
+
+def main(num: int = 100_000, repeat: int = 3):
+    infos = [make_jobinfo(i) for i in range(num)]
+    payloads = [msg.json.encode(info) for info in infos]
+    array = JobInfo.encode_many(infos)
+    lines = JobInfo.encode_many(infos, lines=True)
+
+    def decode_uncached():
+        return [msg.json.Decoder(JobInfo).decode(p) for p in payloads]
+
+    def decode_cached():
+        return [JobInfo.decode(p) for p in payloads]
+
+    def decode_array():
+        return JobInfo.decode_many(array)
+
+    def decode_lines():
+        return JobInfo.decode_many(lines)
+
+    def encode_single():
+        return [msg.json.encode(info) for info in infos]
+
+    def encode_array():
+        return JobInfo.encode_many(infos)
+
+    def encode_lines():
+        return JobInfo.encode_many(infos, lines=True)
+
+    benchmarks = [
+        ("decode: new Decoder per object", decode_uncached),
+        ("decode: cached Decoder per object", decode_cached),
+        ("decode_many: JSON array", decode_array),
+        ("decode_many: JSON Lines", decode_lines),
+        ("encode: per object", encode_single),
+        ("encode_many: JSON array", encode_array),
+        ("encode_many: JSON Lines", encode_lines),
+    ]
+
+    print(f"{num} JobInfo objects, best of {repeat}")
+    for name, fn in benchmarks:
+        seconds = min(timeit.repeat(fn, number=1, repeat=repeat))
+        report(name, seconds, num)
+
+
+if __name__ == "__main__":
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    main(num)
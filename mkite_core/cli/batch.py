@@ -0,0 +1,254 @@
+import os
+import time
+import click
+import functools
+import inspect
+import importlib
+import traceback
+from typing import Iterable, Iterator, List
+
+from mkite_core.models import JobInfo, JobResults
+from mkite_core.models.base import get_decoder, get_encoder, get_format
+from mkite_core.models.compression import open_file
+from mkite_core.models.jobs import LENGTH, STREAM_MAGIC
+from mkite_core.plugins import get_recipes
+
+
+SUMMARY_FILE = "summary.jsonl"
+
+
+def iter_jobpack(path: os.PathLike) -> Iterator[JobInfo]:
+    """Reads the jobs of a jobpack one at a time. JSON Lines jobpacks
+    contain one JobInfo per line. MessagePack jobpacks written by
+    `write_jobpack` are streams of length-prefixed JobInfo, as in the
+    streams of results. JSON files and MessagePack arrays of JobInfo,
+    as created by `JobInfo.encode_many`, are also accepted, but are
+    decoded at once."""
+    fmt = get_format(path)
+    decoder = get_decoder(JobInfo, fmt)
+
+    with open_file(path, "rb") as f:
+        if fmt == "json":
+            yield from JobInfo.decode_many(f.read(), fmt="json")
+            return
+
+        if fmt == "jsonl":
+            for line in f:
+                if line.strip():
+                    yield decoder.decode(line)
+            return
+
+        prefix = f.read(len(STREAM_MAGIC))
+        if prefix != STREAM_MAGIC:
+            yield from JobInfo.decode_many(prefix + f.read(), fmt="msgpack")
+            return
+
+        while size := f.read(LENGTH.size):
+            (length,) = LENGTH.unpack(size)
+            yield decoder.decode(f.read(length))
+
+
+def write_jobpack(path: os.PathLike, infos: Iterable[JobInfo]):
+    """Writes a jobpack that can be read by `iter_jobpack`. Jobs are
+    written one at a time, so `infos` can be a generator."""
+    fmt = get_format(path)
+    with open_file(path, "wb") as f:
+        if fmt != "msgpack":
+            for info in infos:
+                f.write(info.encode(fmt="jsonl"))
+            return
+
+        encoder = get_encoder("msgpack")
+        f.write(STREAM_MAGIC)
+        for info in infos:
+            data = encoder.encode(info)
+            f.write(LENGTH.pack(len(data)) + data)
+
+
+@functools.lru_cache(maxsize=None)
+def load_recipe(name: str):
+    """Loads a recipe class from its entry point or, if `name` has the
+    form `module:Class`, from its module. Classes are loaded only once
+    per process."""
+    recipes = get_recipes()
+    if name in recipes:
+        return recipes[name].load()
+
+    if ":" in name:
+        module, cls_name = name.split(":", 1)
+        return getattr(importlib.import_module(module), cls_name)
+
+    raise KeyError(f"Recipe {name} not found")
+
+
+@functools.lru_cache(maxsize=None)
+def accepts_settings(recipe_cls) -> bool:
+    """Returns True if the recipe can be created with already loaded
+    `settings` instead of loading them from `settings_path`"""
+    params = inspect.signature(recipe_cls.__init__).parameters
+    return "settings" in params
+
+
+@functools.lru_cache(maxsize=None)
+def load_settings(settings_cls, settings_path: os.PathLike = None):
+    if settings_path is not None and os.path.exists(settings_path):
+        return settings_cls.from_file(settings_path)
+
+    return settings_cls()
+
+
+def run_job(
+    info: JobInfo, recipe: str, settings_path: os.PathLike, outdir: os.PathLike
+) -> dict:
+    """Runs a job inside its own folder in `outdir` and returns a summary
+    of the job, including the path of its results file. The results are
+    saved to the folder unless the recipe already saved them."""
+    name = recipe or info.recipe["name"]
+    folder = os.path.join(outdir, info.uuid)
+    summary = {"job": info.job, "recipe": name, "folder": folder}
+
+    basedir = os.getcwd()
+    start = time.perf_counter()
+    try:
+        recipe_cls = load_recipe(name)
+        kwargs = {"settings_path": settings_path}
+        settings_cls = getattr(recipe_cls, "SETTINGS_CLS", None)
+        if settings_cls is not None and accepts_settings(recipe_cls):
+            kwargs["settings"] = load_settings(settings_cls, settings_path)
+
+        os.makedirs(folder, exist_ok=True)
+        os.chdir(folder)
+        job = recipe_cls(info, **kwargs)
+        results = job.run()
+
+        if results is None:
+            summary["status"] = "E"
+        else:
+            # recipes that save their own results (e.g. streamed nodes or
+            # arrays in binary files) must not have them overwritten
+            path = getattr(job, "results_path", None)
+            if path is None:
+                path = save_results(results, folder, getattr(job, "settings", None))
+
+            summary["results"] = path
+            summary["status"] = "D"
+
+    except Exception:
+        summary["status"] = "E"
+        summary["error"] = traceback.format_exc(limit=-1).strip()
+
+    finally:
+        os.chdir(basedir)
+
+    summary["duration"] = round(time.perf_counter() - start, 6)
+    return summary
+
+
+def save_results(results: JobResults, folder: os.PathLike, settings=None) -> str:
+    """Saves the results returned by a recipe to `folder`. Returns the
+    path of the results file."""
+    fmt = getattr(settings, "RESULTS_FORMAT", "json")
+    compression = getattr(settings, "RESULTS_COMPRESSION", None)
+    level = getattr(settings, "COMPRESSION_LEVEL", None)
+
+    path = os.path.join(folder, JobResults.file_name(fmt, compression))
+    results.to_file(path, level=level)
+    return path
+
+
+def run_jobs(
+    infos: List[JobInfo], recipe: str, settings_path: os.PathLike, outdir: str
+) -> List[dict]:
+    return [run_job(info, recipe, settings_path, outdir) for info in infos]
+
+
+def run_jobpack(
+    path: os.PathLike,
+    outdir: os.PathLike,
+    recipe: str = None,
+    settings_path: os.PathLike = None,
+    n_workers: int = None,
+    chunksize: int = 1,
+) -> Iterator[dict]:
+    """Runs all jobs of a jobpack in a pool of `n_workers` processes.
+    Each worker loads the recipe classes and settings only once. Yields
+    the summary of each job in the order of the jobpack."""
+    from mkite_core.external.parallel import map_chunks
+
+    outdir = os.path.abspath(outdir)
+    if settings_path is not None:
+        settings_path = os.path.abspath(settings_path)
+
+    fn = functools.partial(
+        run_jobs, recipe=recipe, settings_path=settings_path, outdir=outdir
+    )
+    jobs = iter_jobpack(path)
+    for summaries in map_chunks(fn, jobs, n_workers=n_workers, chunksize=chunksize):
+        yield from summaries
+
+
+@click.command("run-batch")
+@click.option(
+    "-i",
+    "--jobpack",
+    type=str,
+    required=True,
+    help="path to the jobpack containing the JobInfo of all jobs \
+            (.jsonl, one job per line, or .msgpack)",
+)
+@click.option(
+    "-o",
+    "--outdir",
+    type=str,
+    default="./batch",
+    help="folder where the results of each job and the summary are saved",
+)
+@click.option(
+    "-r",
+    "--recipe",
+    type=str,
+    default=None,
+    help="name of the recipe that will be run. If not given, the name\
+            is extracted from each JobInfo.",
+)
+@click.option(
+    "-s",
+    "--settings",
+    type=str,
+    default=None,
+    help="path to the settings.yaml file configuring the mkite runner",
+)
+@click.option(
+    "-n",
+    "--workers",
+    type=int,
+    default=None,
+    help="number of processes running the jobs. Defaults to the number of CPUs",
+)
+@click.option(
+    "-c",
+    "--chunksize",
+    type=int,
+    default=1,
+    help="number of jobs sent to a process at once",
+)
+def run_batch(jobpack, outdir, recipe, settings, workers, chunksize):
+    os.makedirs(outdir, exist_ok=True)
+    summaries = run_jobpack(
+        jobpack,
+        outdir,
+        recipe=recipe,
+        settings_path=settings,
+        n_workers=workers,
+        chunksize=chunksize,
+    )
+
+    encoder = get_encoder("json")
+    counts = {"D": 0, "E": 0}
+    with open(os.path.join(outdir, SUMMARY_FILE), "wb") as f:
+        for summary in summaries:
+            f.write(encoder.encode(summary) + b"\n")
+            f.flush()
+            counts[summary["status"]] += 1
+
+    click.echo(f"{counts['D']} jobs done, {counts['E']} jobs failed")
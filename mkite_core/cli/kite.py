@@ -1,6 +1,7 @@
 import click
 
 from mkite_core.cli.runner import run
+from mkite_core.cli.batch import run_batch
 
 
 class MkiteGroup(click.Group):
@@ -13,6 +14,7 @@ def kite():
 
 
 kite.add_command(run)
+kite.add_command(run_batch)
 
 if __name__ == "__main__":
     kite()
@@ -1,11 +1,14 @@
 import os
+import glob
 import click
 import importlib
+from itertools import islice
+from typing import Iterable, Iterator, List, Union
 
-from ase.io import read
 from mkite_core.models import JobInfo, CrystalInfo, ConformerInfo
+from mkite_core.models.base import FILE_FORMATS
+from mkite_core.models.compression import strip_compression
 from mkite_core.plugins import get_recipe
-from mkite_core.recipes.settings import EnvSettings
 
 
 class RunnerCmd:
@@ -25,31 +28,108 @@ class RunnerCmd:
 
     @staticmethod
     def load_info(info_path: os.PathLike):
-        return JobInfo.from_json(info_path)
+        return JobInfo.from_file(info_path)
 
-    def run(self):
-        self.recipe.run()
+    def run(self, folder: os.PathLike = None):
+        """Runs the recipe. If `folder` is given, the recipe runs
+        inside it instead of the current directory."""
+        if folder is None:
+            return self.recipe.run()
+
+        basedir = os.getcwd()
+        os.makedirs(folder, exist_ok=True)
+        os.chdir(folder)
+        try:
+            return self.recipe.run()
+        finally:
+            os.chdir(basedir)
 
     @classmethod
     def from_json(cls, info_path: str, recipe: str, settings_path: str):
         info = cls.load_info(info_path)
         return cls(info, recipe, settings_path)
 
+    @staticmethod
+    def is_info_file(path: str) -> bool:
+        _, extension = os.path.splitext(strip_compression(path))
+        return extension.lower() in FILE_FORMATS
+
+    @staticmethod
+    def get_paths(patterns: Iterable[str]) -> List[str]:
+        """Expands glob patterns into a list of paths"""
+        paths = []
+        for pattern in patterns:
+            matches = sorted(glob.glob(pattern))
+            if not matches:
+                raise FileNotFoundError(f"Input file {pattern} not found")
+
+            paths.extend(matches)
+
+        return paths
+
     @classmethod
-    def from_input(cls, inp_path: str, recipe: str, settings_path: str):
-        if not os.path.exists(inp_path):
-            raise FileNotFoundError(f"Input file {inp_path} not found")
+    def iter_frames(
+        cls, patterns: Iterable[str]
+    ) -> Iterator[Union[CrystalInfo, ConformerInfo]]:
+        """Reads all frames of the files matching `patterns` one at a time.
+        Frames that are periodic along any direction (including slabs
+        and wires) are read as CrystalInfo, and the remaining frames as
+        ConformerInfo."""
+        from ase.io import iread
+
+        for path in cls.get_paths(patterns):
+            for atoms in iread(path, index=":"):
+                if any(atoms.pbc):
+                    yield CrystalInfo.from_ase(atoms)
+                else:
+                    yield ConformerInfo.from_ase(atoms)
+
+    @classmethod
+    def iter_jobinfos(
+        cls, patterns: Iterable[str], recipe: str, chunksize: int = None
+    ) -> Iterator[JobInfo]:
+        """Creates jobs whose inputs are the frames of the files matching
+        `patterns`. If `chunksize` is None, all frames are inputs of a single
+        job. Otherwise, one job is created for every `chunksize` frames."""
+        if chunksize is not None and chunksize < 1:
+            raise ValueError("chunksize has to be at least 1")
 
-        atoms = read(inp_path)
-        if not all(atoms.pbc):
-            raise NotImplementedError("Support for non-crystals not yet implemented")
+        frames = (info.as_dict() for info in cls.iter_frames(patterns))
 
-        info = CrystalInfo.from_ase(atoms)
+        while True:
+            inputs = list(islice(frames, chunksize))
+            if not inputs:
+                return
 
-        jinfo = JobInfo(job={}, options={}, recipe={"name": recipe}, inputs=[info.as_dict()])
-        jinfo.job["uuid"] = jinfo.create_uuid()
+            jinfo = JobInfo(job={}, options={}, recipe={"name": recipe}, inputs=inputs)
+            jinfo.job["uuid"] = jinfo.create_uuid()
+            yield jinfo
 
-        return cls(jinfo, recipe, settings_path)
+            if chunksize is None:
+                return
+
+    @classmethod
+    def from_inputs(
+        cls,
+        patterns: Iterable[str],
+        recipe: str,
+        settings_path: str,
+        chunksize: int = None,
+    ) -> Iterator["RunnerCmd"]:
+        """Yields one runner for each job created by `iter_jobinfos`"""
+        for jinfo in cls.iter_jobinfos(patterns, recipe, chunksize=chunksize):
+            yield cls(jinfo, recipe, settings_path)
+
+    @classmethod
+    def from_input(cls, inp_path: str, recipe: str, settings_path: str):
+        """Creates a runner for a job whose inputs are all the frames
+        of the structure file `inp_path`"""
+        runners = cls.from_inputs([inp_path], recipe, settings_path)
+        runner = next(runners, None)
+        if runner is None:
+            raise ValueError(f"No structures found in {inp_path}")
+
+        return runner
 
 
 @click.command("run")
@@ -74,12 +154,27 @@ class RunnerCmd:
     type=str,
     default="./jobinfo.json",
     help="path to the JobInfo file containing all\
-            the information about the job to be run, \
-            or to the structure file used as an input.",
+            the information about the job to be run (.json, .jsonl \
+            or .msgpack), or to the structure files used as inputs. \
+            Glob patterns are accepted for structure files.",
 )
-def run(recipe, settings, input_file):
-    if input_file.endswith(".json"):
+@click.option(
+    "-c",
+    "--chunksize",
+    type=click.IntRange(min=1),
+    default=None,
+    help="if given, frames of the structure files are split into \
+            jobs of at most this number of inputs, each one run in \
+            its own folder. By default, all frames are inputs of a \
+            single job.",
+)
+def run(recipe, settings, input_file, chunksize):
+    if RunnerCmd.is_info_file(input_file):
         runner = RunnerCmd.from_json(input_file, recipe, settings)
-    else:
-        runner = RunnerCmd.from_input(input_file, recipe, settings)
-    runner.run()
+        runner.run()
+        return
+
+    runners = RunnerCmd.from_inputs([input_file], recipe, settings, chunksize)
+    for runner in runners:
+        folder = None if chunksize is None else runner.info.folder_prefix
+        runner.run(folder)
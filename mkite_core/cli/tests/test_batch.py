@@ -0,0 +1,156 @@
+import os
+import json
+import unittest as ut
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from mkite_core.tests.tempdirs import run_in_tempdir
+from mkite_core.models import JobInfo, JobResults, JobResultsReader, NodeResults
+from mkite_core.recipes import PythonRecipe
+from mkite_core.recipes.parser import BaseParser
+from mkite_core.recipes.recipe import BaseRecipe
+from mkite_core.cli.batch import (
+    iter_jobpack,
+    write_jobpack,
+    load_recipe,
+    load_settings,
+    accepts_settings,
+    run_batch,
+    run_job,
+)
+
+
+RECIPE = "mkite_core.cli.tests.test_batch:MockRecipe"
+
+
+class MockRecipe(PythonRecipe):
+    def run(self):
+        if self.info.options.get("fail"):
+            raise RuntimeError("failed job")
+
+        node = NodeResults(chemnode={"value": self.info.options["value"]})
+        return JobResults(job=self.info.job, nodes=[node])
+
+
+class MockStreamParser(BaseParser):
+    def parse(self):
+        return JobResults(job={}, nodes=list(self.iter_nodes()))
+
+    def iter_nodes(self):
+        for i in range(3):
+            yield NodeResults(chemnode={"idx": i})
+
+
+class MockRunner:
+    def __init__(self, settings):
+        self.settings = settings
+
+    def run(self):
+        pass
+
+
+class MockStreamRecipe(BaseRecipe):
+    PARSER_CLS = MockStreamParser
+    RUNNER_CLS = MockRunner
+
+    def setup(self, workdir):
+        os.makedirs(workdir, exist_ok=True)
+
+    def get_options(self):
+        return {}
+
+
+class MockLegacyRecipe(MockRecipe):
+    def __init__(self, info: JobInfo, settings_path: os.PathLike = None):
+        super().__init__(info, settings_path=settings_path)
+
+
+def get_jobs(n: int):
+    jobs = []
+    for i in range(n):
+        info = JobInfo(
+            job={"id": i}, recipe={"name": RECIPE}, options={"value": i}, inputs=[]
+        )
+        info.job["uuid"] = info.create_uuid()
+        jobs.append(info)
+
+    return jobs
+
+
+class TestBatch(ut.TestCase):
+    @run_in_tempdir
+    def test_jobpack(self):
+        jobs = get_jobs(3)
+        for name in ["jobs.jsonl", "jobs.msgpack", "jobs.jsonl.gz"]:
+            write_jobpack(name, (job for job in jobs))
+            self.assertEqual(list(iter_jobpack(name)), jobs)
+
+    @run_in_tempdir
+    def test_jobpack_array(self):
+        jobs = get_jobs(3)
+        with open("jobs.msgpack", "wb") as f:
+            f.write(JobInfo.encode_many(jobs, fmt="msgpack"))
+
+        self.assertEqual(list(iter_jobpack("jobs.msgpack")), jobs)
+
+        with open("jobs.json", "w") as f:
+            json.dump([job.as_dict() for job in jobs], f, indent=4)
+
+        self.assertEqual(list(iter_jobpack("jobs.json")), jobs)
+
+        write_jobpack("lines.json", jobs)
+        self.assertEqual(list(iter_jobpack("lines.json")), jobs)
+
+    @run_in_tempdir
+    def test_legacy_recipe(self):
+        self.assertTrue(accepts_settings(MockRecipe))
+        self.assertFalse(accepts_settings(MockLegacyRecipe))
+
+        recipe = "mkite_core.cli.tests.test_batch:MockLegacyRecipe"
+        summary = run_job(get_jobs(1)[0], recipe, None, os.getcwd())
+        self.assertEqual(summary["status"], "D", summary.get("error"))
+
+    def test_load_recipe(self):
+        self.assertIs(load_recipe(RECIPE), MockRecipe)
+        with self.assertRaises(KeyError):
+            load_recipe("not_a_recipe")
+
+    @run_in_tempdir
+    @patch.dict(os.environ, {"SCRATCH_DIR": ".", "RESULTS_FORMAT": "jsonl"})
+    def test_stream_recipe(self):
+        load_settings.cache_clear()
+        recipe = "mkite_core.cli.tests.test_batch:MockStreamRecipe"
+        summary = run_job(get_jobs(1)[0], recipe, None, os.getcwd())
+        self.assertEqual(summary["status"], "D", summary.get("error"))
+
+        path = summary["results"]
+        self.assertEqual(os.path.basename(path), "jobresults.jsonl")
+        self.assertNotEqual(os.path.dirname(path), summary["folder"])
+        saved = os.path.join(summary["folder"], "jobresults.json")
+        self.assertFalse(os.path.exists(saved))
+
+        nodes = list(JobResultsReader(path))
+        self.assertEqual([n.chemnode["idx"] for n in nodes], [0, 1, 2])
+
+    @run_in_tempdir
+    def test_run_batch(self):
+        jobs = get_jobs(4)
+        jobs[2].options["fail"] = True
+        write_jobpack("jobs.jsonl", jobs)
+
+        runner = CliRunner()
+        result = runner.invoke(run_batch, ["-i", "jobs.jsonl", "-o", "out", "-n", "2"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("3 jobs done, 1 jobs failed", result.output)
+
+        with open("out/summary.jsonl", "r") as f:
+            summaries = [json.loads(line) for line in f]
+
+        self.assertEqual([s["job"]["id"] for s in summaries], [0, 1, 2, 3])
+        self.assertEqual([s["status"] for s in summaries], ["D", "D", "E", "D"])
+        self.assertIn("failed job", summaries[2]["error"])
+
+        path = os.path.join(summaries[3]["folder"], "jobresults.json")
+        results = JobResults.from_file(path)
+        self.assertEqual(results.nodes[0].chemnode, {"value": 3})
@@ -0,0 +1,61 @@
+import unittest as ut
+
+import numpy as np
+from click.testing import CliRunner
+
+from ase import Atoms
+from ase.io import write
+
+from mkite_core.tests.tempdirs import run_in_tempdir
+from mkite_core.cli.runner import RunnerCmd, run
+
+
+def write_frames():
+    crystal = Atoms("Si2", positions=[[0, 0, 0], [1, 1, 1]], cell=3 * [4], pbc=True)
+    molecule = Atoms("H2O", positions=[[0, 0, 0], [0.9, 0, 0], [0, 0.9, 0]])
+    slab = crystal.copy()
+    slab.pbc = [True, True, False]
+    write("frames.extxyz", [crystal, molecule, crystal, slab])
+    write("POSCAR", crystal, format="vasp")
+
+
+class TestRunnerInputs(ut.TestCase):
+    @run_in_tempdir
+    def test_iter_frames(self):
+        write_frames()
+        frames = list(RunnerCmd.iter_frames(["*.extxyz", "POSCAR"]))
+
+        classes = [info.extra_dict_fields["@class"] for info in frames]
+        expected = ["Crystal", "Conformer", "Crystal", "Crystal", "Crystal"]
+        self.assertEqual(classes, expected)
+        self.assertEqual(frames[1].species, ["H", "H", "O"])
+        self.assertTrue(np.allclose(frames[3].lattice, np.eye(3) * 4))
+
+    @run_in_tempdir
+    def test_iter_jobinfos(self):
+        write_frames()
+        jobs = list(RunnerCmd.iter_jobinfos(["frames.extxyz"], "test.recipe"))
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(len(jobs[0].inputs), 4)
+
+        jobs = list(
+            RunnerCmd.iter_jobinfos(["frames.extxyz"], "test.recipe", chunksize=2)
+        )
+        self.assertEqual([len(job.inputs) for job in jobs], [2, 2])
+        self.assertNotEqual(jobs[0].uuid, jobs[1].uuid)
+        self.assertEqual(jobs[1].recipe, {"name": "test.recipe"})
+
+    @run_in_tempdir
+    def test_chunksize(self):
+        write_frames()
+        with self.assertRaises(ValueError):
+            list(RunnerCmd.iter_jobinfos(["frames.extxyz"], "test", chunksize=0))
+
+        result = CliRunner().invoke(run, ["-i", "frames.extxyz", "-c", "0"])
+        self.assertNotEqual(result.exit_code, 0)
+        self.assertIn("--chunksize", result.output)
+
+    @run_in_tempdir
+    def test_missing(self):
+        with self.assertRaises(FileNotFoundError):
+            list(RunnerCmd.iter_frames(["*.extxyz"]))
@@ -0,0 +1,182 @@
+import os
+import time
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .parallel import chunked
+
+
+# SQLite limits the number of variables in a single query
+MAX_VARIABLES = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS smiles (
+    smiles TEXT NOT NULL,
+    stereo INTEGER NOT NULL,
+    rdkit TEXT NOT NULL,
+    canonical TEXT,
+    inchikey TEXT,
+    atime INTEGER NOT NULL,
+    PRIMARY KEY (smiles, stereo, rdkit)
+);
+CREATE INDEX IF NOT EXISTS smiles_atime ON smiles (atime);
+"""
+
+Result = Optional[Tuple[str, str]]
+
+
+def get_rdkit_version() -> str:
+    import rdkit
+
+    return rdkit.__version__
+
+
+class SmilesCache:
+    """Persistent cache mapping SMILES strings to their canonical SMILES
+    and InChIKey, stored in a SQLite database at `path`.
+
+    Entries are keyed on the input SMILES, the stereochemistry flag and
+    the RDKit version, so upgrading RDKit does not reuse stale results.
+    Invalid SMILES are cached as None. When the cache grows beyond
+    `max_size` entries, the least recently used entries are evicted
+    until the cache is `evict_fraction` below `max_size`. The size is
+    tracked by this process, so it is approximate if several processes
+    write to the same cache at once.
+
+    Example:
+        cache = SmilesCache("smiles.sqlite")
+        infos = MoleculeInfo.from_smiles_many(smiles, cache=cache)
+    """
+
+    def __init__(
+        self,
+        path: os.PathLike,
+        max_size: int = 10_000_000,
+        evict_fraction: float = 0.1,
+        rdkit_version: str = None,
+    ):
+        self.path = str(path)
+        self.max_size = max_size
+        self.evict_fraction = evict_fraction
+        self.rdkit_version = rdkit_version or get_rdkit_version()
+
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(SCHEMA)
+        self._size = self._count()
+
+    def _count(self) -> int:
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM smiles").fetchone()
+        return count
+
+    def __len__(self) -> int:
+        return self._size
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_many(
+        self, smiles: Iterable[str], stereochemistry: bool = True, touch: bool = True
+    ) -> Dict[str, Result]:
+        """Looks up several SMILES at once. Returns a dictionary with the
+        SMILES found in the cache, mapped to (canonical SMILES, InChIKey),
+        or to None if the SMILES is known to be invalid. If `touch` is
+        True, the access time of the entries found is updated, so that
+        they are evicted last."""
+        stereo = int(stereochemistry)
+        found = {}
+
+        for chunk in chunked(set(smiles), MAX_VARIABLES):
+            marks = ",".join("?" * len(chunk))
+            query = (
+                "SELECT smiles, canonical, inchikey FROM smiles "
+                f"WHERE stereo = ? AND rdkit = ? AND smiles IN ({marks})"
+            )
+            rows = self.conn.execute(query, [stereo, self.rdkit_version, *chunk])
+            for smi, canonical, inchikey in rows:
+                found[smi] = None if canonical is None else (canonical, inchikey)
+
+        if found and touch:
+            self._touch(list(found), stereo)
+
+        return found
+
+    def _touch(self, smiles: List[str], stereo: int):
+        atime = time.time_ns()
+        with self.conn:
+            for chunk in chunked(smiles, MAX_VARIABLES):
+                marks = ",".join("?" * len(chunk))
+                self.conn.execute(
+                    "UPDATE smiles SET atime = ? "
+                    f"WHERE stereo = ? AND rdkit = ? AND smiles IN ({marks})",
+                    [atime, stereo, self.rdkit_version, *chunk],
+                )
+
+    def put_many(
+        self, results: Iterable[Tuple[str, Result]], stereochemistry: bool = True
+    ):
+        """Adds several pairs of (SMILES, result) to the cache, where each
+        result is a (canonical SMILES, InChIKey) tuple or None. Entries
+        already in the cache are replaced."""
+        stereo = int(stereochemistry)
+        atime = time.time_ns()
+
+        entries = {}
+        for smi, result in results:
+            entries[smi] = (None, None) if result is None else result
+
+        rows = [
+            (smi, stereo, self.rdkit_version, canonical, inchikey, atime)
+            for smi, (canonical, inchikey) in entries.items()
+        ]
+        with self.conn:
+            cursor = self.conn.executemany(
+                "INSERT OR IGNORE INTO smiles VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            inserted = cursor.rowcount
+
+            # only new rows count towards the size of the cache
+            if inserted < len(rows):
+                self.conn.executemany(
+                    "UPDATE smiles SET canonical = ?, inchikey = ?, atime = ? "
+                    "WHERE smiles = ? AND stereo = ? AND rdkit = ?",
+                    [(*row[3:], *row[:3]) for row in rows],
+                )
+
+        self._size += inserted
+        if self._size > self.max_size:
+            self.evict()
+
+    def get(
+        self, smiles: str, stereochemistry: bool = True, touch: bool = True
+    ) -> Tuple[bool, Result]:
+        """Looks up a single SMILES. Returns whether it was found and
+        its result"""
+        found = self.get_many([smiles], stereochemistry, touch=touch)
+        return smiles in found, found.get(smiles)
+
+    def put(self, smiles: str, result: Result, stereochemistry: bool = True):
+        self.put_many([(smiles, result)], stereochemistry)
+
+    def evict(self):
+        """Removes the least recently used entries from the cache"""
+        self._size = self._count()
+        target = int(self.max_size * (1 - self.evict_fraction))
+        excess = self._size - target
+
+        if excess <= 0:
+            return
+
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM smiles WHERE rowid IN "
+                "(SELECT rowid FROM smiles ORDER BY atime LIMIT ?)",
+                (excess,),
+            )
+
+        self._size = self._count()
@@ -0,0 +1,65 @@
+import os
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """Splits `iterable` into lists of at most `size` elements"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def map_chunks(
+    fn: Callable[[List], Any],
+    iterable: Iterable,
+    n_workers: int = None,
+    chunksize: int = 1000,
+    max_pending: int = None,
+) -> Iterator[Any]:
+    """Applies `fn` to chunks of `iterable` in a pool of processes and
+    yields the result of each chunk in the original order.
+
+    Unlike `ProcessPoolExecutor.map`, the input is consumed lazily: at
+    most `max_pending` chunks (by default, twice the number of workers)
+    are submitted at once, so memory stays bounded for very long inputs.
+    If `n_workers` is 1, the chunks are processed in the current process.
+    """
+    return map_ordered(fn, chunked(iterable, chunksize), n_workers, max_pending)
+
+
+def map_ordered(
+    fn: Callable[[Any], Any],
+    items: Iterable,
+    n_workers: int = None,
+    max_pending: int = None,
+) -> Iterator[Any]:
+    """Applies `fn` to each element of `items` in a pool of processes and
+    yields the results in the original order. `items` is consumed lazily,
+    as described in `map_chunks`."""
+    if n_workers == 1:
+        for item in items:
+            yield fn(item)
+
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    n_workers = n_workers or os.cpu_count()
+    max_pending = max_pending or 2 * n_workers
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(fn, item))
+
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
@@ -1,7 +1,13 @@
-from typing import List
+import functools
+import warnings
+from collections import deque
+from typing import Iterable, Iterator, List, Optional, Tuple
+import numpy as np
 import rdkit.Chem.AllChem as Chem
 
 from mkite_core.models import FormulaInfo, MoleculeInfo, ConformerInfo
+from mkite_core.models import ConformerEnsembleInfo
+from .parallel import chunked, map_chunks, map_ordered
 
 
 def get_formula_info(rdmol: Chem.Mol):
@@ -16,6 +22,69 @@ def get_formula(rdmol: Chem.Mol):
     return info.name
 
 
+def canonicalize(
+    smiles: str, stereochemistry: bool = True
+) -> Optional[Tuple[str, str]]:
+    """Returns the canonical SMILES and the InChIKey of `smiles`, or None
+    (with a warning) if RDKit cannot parse `smiles`"""
+    try:
+        interf = RdkitInterface.from_smiles(smiles, stereochemistry=stereochemistry)
+    except ValueError as e:
+        warnings.warn(str(e))
+        return None
+
+    return interf.smiles, interf.inchikey
+
+
+def _canonicalize_chunk(
+    smiles: List[str], stereochemistry: bool = True
+) -> List[Optional[Tuple[str, str]]]:
+    return [canonicalize(smi, stereochemistry) for smi in smiles]
+
+
+def canonicalize_many(
+    smiles: Iterable[str],
+    stereochemistry: bool = True,
+    n_workers: int = None,
+    chunksize: int = 1000,
+    cache: "SmilesCache" = None,
+) -> Iterator[Optional[Tuple[str, str]]]:
+    """Canonicalizes SMILES strings in a pool of `n_workers` processes.
+    Yields the results of `canonicalize` in the same order as `smiles`,
+    with None for invalid SMILES. If a `SmilesCache` is given, only the
+    SMILES missing from the cache are sent to the workers, and their
+    results are added to the cache."""
+    fn = functools.partial(_canonicalize_chunk, stereochemistry=stereochemistry)
+
+    if cache is None:
+        for results in map_chunks(
+            fn, smiles, n_workers=n_workers, chunksize=chunksize
+        ):
+            yield from results
+
+        return
+
+    # lookups happen in this process, ahead of the results being yielded
+    lookups = deque()
+
+    def get_missing():
+        for chunk in chunked(smiles, chunksize):
+            found = cache.get_many(chunk, stereochemistry)
+            missing = [smi for smi in dict.fromkeys(chunk) if smi not in found]
+            lookups.append((chunk, found, missing))
+            yield missing
+
+    for results in map_ordered(fn, get_missing(), n_workers=n_workers):
+        chunk, found, missing = lookups.popleft()
+        computed = list(zip(missing, results))
+        if computed:
+            cache.put_many(computed, stereochemistry)
+
+        found.update(computed)
+        for smi in chunk:
+            yield found[smi]
+
+
 class RdkitInterface:
     def __init__(
         self,
@@ -29,16 +98,21 @@ class RdkitInterface:
         Chem.SanitizeMol(self.mol)
 
     @classmethod
-    def from_smiles(cls, smiles: str) -> "RdkitInterface":
+    def from_smiles(
+        cls, smiles: str, stereochemistry: bool = True
+    ) -> "RdkitInterface":
         """Creates an interface starting from a SMILES string"""
         mol = Chem.MolFromSmiles(smiles)
-        return cls(mol)
+        if mol is None:
+            raise ValueError(f"Invalid SMILES: {smiles}")
 
-    @property
+        return cls(mol, stereochemistry=stereochemistry)
+
+    @functools.cached_property
     def _mol(self) -> Chem.Mol:
         return Chem.MolFromSmiles(self._smiles)
 
-    @property
+    @functools.cached_property
     def smiles(self) -> str:
         """Gets the canonical SMILES of a Mol. The
         double conversion is necessary to canonize
@@ -46,11 +120,11 @@ class RdkitInterface:
         the original Mol"""
         return Chem.MolToSmiles(self._mol, isomericSmiles=self.stereochemistry)
 
-    @property
+    @functools.cached_property
     def inchi(self) -> str:
         return Chem.MolToInchi(self._mol)
 
-    @property
+    @functools.cached_property
     def inchikey(self) -> str:
         return Chem.MolToInchiKey(self._mol)
 
@@ -84,22 +158,26 @@ class RdkitInterface:
         )
 
     @property
-    def conformer_info(self) -> List[dict]:
-        if self.num_conformers == 0:
-            return {}
-
-        finfo = get_formula_info(self.add_hydrogens())
+    def conformer_coords(self) -> np.ndarray:
+        """Coordinates of all conformers as an array with shape
+        (n_conformers, n_atoms, 3)"""
+        coords = np.empty((self.num_conformers, self.mol.GetNumAtoms(), 3))
+        for i, conf in enumerate(self.mol.GetConformers()):
+            coords[i] = conf.GetPositions()
 
-        results = []
-        for conf in self.mol.GetConformers():
-            coords = conf.GetPositions().tolist()
+        return coords
 
-            conf_info = ConformerInfo(
-                species=self.symbols,
-                coords=coords,
-                mol=self.molecule_info,
-            )
+    @property
+    def conformer_ensemble(self) -> ConformerEnsembleInfo:
+        return ConformerEnsembleInfo(
+            species=self.symbols,
+            coords=self.conformer_coords,
+            mol=self.molecule_info,
+        )
 
-            results.append(conf_info)
+    @property
+    def conformer_info(self) -> List[ConformerInfo]:
+        if self.num_conformers == 0:
+            return []
 
-        return results
+        return self.conformer_ensemble.to_conformers()
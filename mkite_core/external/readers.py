@@ -0,0 +1,280 @@
+import os
+import csv
+import functools
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+import rdkit.Chem.AllChem as Chem
+
+from mkite_core.models import MoleculeInfo, ConformerInfo
+from .parallel import map_chunks
+from .rdkit import RdkitInterface
+
+
+SDF_DELIMITER = "$$$$"
+
+READER_FORMATS = {
+    ".sdf": "sdf",
+    ".mol": "sdf",
+    ".smi": "smi",
+    ".smiles": "smi",
+    ".csv": "csv",
+}
+
+DEFAULT_KINDS = {
+    "sdf": "conformer",
+    "smi": "molecule",
+    "csv": "molecule",
+}
+
+# maximum number of malformed records kept by a reader
+MAX_ERRORS = 1000
+
+Record = Union[str, dict]
+ParsedRecord = Tuple[int, int, Optional[Union[MoleculeInfo, ConformerInfo]], str]
+
+
+class LineTracker:
+    """Iterates over the lines of a file opened in binary mode, decoded
+    as text. `offset` is the byte offset after the last line read, and
+    can be used to seek to the next line later."""
+
+    def __init__(self, f, encoding: str = "utf-8"):
+        self.f = f
+        self.encoding = encoding
+        self.offset = f.tell()
+
+    def __iter__(self) -> Iterator[str]:
+        for line in self.f:
+            self.offset += len(line)
+            yield line.decode(self.encoding)
+
+
+def iter_sdf_records(f) -> Iterator[str]:
+    """Splits an SDF file into the text blocks of each record"""
+    lines = []
+    for line in f:
+        if line.rstrip() == SDF_DELIMITER:
+            yield "".join(lines)
+            lines = []
+        else:
+            lines.append(line)
+
+    if any(line.strip() for line in lines):
+        yield "".join(lines)
+
+
+def iter_smi_records(f) -> Iterator[str]:
+    """Yields the non-empty lines of a SMILES file"""
+    for line in f:
+        if line.strip():
+            yield line.strip()
+
+
+def parse_sdf_record(record: str, kind: str):
+    supplier = Chem.SDMolSupplier()
+    supplier.SetData(record, removeHs=False)
+    mol = next(supplier)
+    if mol is None:
+        raise ValueError("RDKit could not parse the molecule block")
+
+    attributes = mol.GetPropsAsDict()
+    name = mol.GetProp("_Name").strip() if mol.HasProp("_Name") else ""
+    if name:
+        attributes["name"] = name
+
+    interf = RdkitInterface(mol)
+    if kind == "molecule":
+        info = interf.molecule_info
+        info.attributes = attributes
+        return info
+
+    if interf.num_conformers == 0:
+        raise ValueError("Record does not contain coordinates")
+
+    info = interf.conformer_info[0]
+    info.attributes = attributes
+    return info
+
+
+def parse_smi_record(record: str, kind: str):
+    smiles, *name = record.split(maxsplit=1)
+    interf = RdkitInterface.from_smiles(smiles)
+    info = interf.molecule_info
+    if name:
+        info.attributes = {"name": name[0]}
+
+    return info
+
+
+def parse_csv_record(record: dict, kind: str, smiles_column: str = "smiles"):
+    attributes = dict(record)
+    smiles = attributes.pop(smiles_column, None)
+    if not smiles:
+        raise ValueError(f"Missing column {smiles_column}")
+
+    interf = RdkitInterface.from_smiles(smiles)
+    info = interf.molecule_info
+    info.attributes = attributes
+    return info
+
+
+PARSERS = {
+    "sdf": parse_sdf_record,
+    "smi": parse_smi_record,
+    "csv": parse_csv_record,
+}
+
+
+def _parse_chunk(
+    chunk: List[Tuple[int, int, Record]], fmt: str, kind: str, **kwargs
+) -> List[ParsedRecord]:
+    parse = PARSERS[fmt]
+    results = []
+    for idx, offset, record in chunk:
+        try:
+            results.append((idx, offset, parse(record, kind, **kwargs), ""))
+        except Exception as e:
+            results.append((idx, offset, None, str(e) or type(e).__name__))
+
+    return results
+
+
+class MalformedRecord:
+    def __init__(self, index: int, error: str):
+        self.index = index
+        self.error = error
+
+    def __repr__(self):
+        return f"MalformedRecord(index={self.index}, error={self.error!r})"
+
+
+class MoleculeReader:
+    """Streams the molecules of an SDF, SMILES or CSV file. The file is
+    split into records in the current process, and the records are parsed
+    by RDKit in chunks distributed across `n_workers` processes. Only a
+    few chunks are held in memory at once, so arbitrarily large files can
+    be read.
+
+    SDF files yield ConformerInfo by default, with the data fields of each
+    record as attributes. SMILES and CSV files yield MoleculeInfo, with the
+    names or the remaining columns as attributes.
+
+    Malformed records are skipped and passed to `on_error`, if given.
+    `num_errors` counts all of them, but only the first `max_errors` are
+    kept in `errors`.
+
+    `position` is the index of the record after the last one that was
+    processed, and `offset` is the byte offset where that record starts.
+    Both can be given as `start` and `offset` to resume reading the file
+    later without reading it again from the beginning. If only `start`
+    is given, the records before it are read and skipped.
+
+    Example:
+        reader = MoleculeReader("library.sdf", n_workers=8)
+        for info in reader:
+            ...
+
+        reader = MoleculeReader(
+            "library.sdf", start=reader.position, offset=reader.offset
+        )
+    """
+
+    def __init__(
+        self,
+        path: os.PathLike,
+        fmt: str = None,
+        kind: str = None,
+        start: int = 0,
+        offset: int = 0,
+        n_workers: int = None,
+        chunksize: int = 1000,
+        smiles_column: str = "smiles",
+        on_error: Callable[[MalformedRecord], None] = None,
+        max_errors: int = MAX_ERRORS,
+    ):
+        self.path = str(path)
+        self.fmt = fmt or self.get_format(path)
+        self.kind = kind or DEFAULT_KINDS[self.fmt]
+        self.start = start
+        self.position = start
+        self.start_offset = offset
+        self.offset = offset
+        self.n_workers = n_workers
+        self.chunksize = chunksize
+        self.smiles_column = smiles_column
+        self.on_error = on_error
+        self.max_errors = max_errors
+        self.errors: List[MalformedRecord] = []
+        self.num_errors = 0
+
+        if self.kind not in ["molecule", "conformer"]:
+            raise ValueError(f"Unrecognized kind {self.kind}")
+
+        if self.kind == "conformer" and self.fmt != "sdf":
+            raise ValueError("Conformers can only be read from SDF files")
+
+    @staticmethod
+    def get_format(path: os.PathLike) -> str:
+        ext = os.path.splitext(str(path))[1].lower()
+        if ext not in READER_FORMATS:
+            raise ValueError(f"Cannot read molecules from files with extension {ext}")
+
+        return READER_FORMATS[ext]
+
+    def iter_records(self) -> Iterator[Tuple[int, int, Record]]:
+        """Yields the index, the byte offset after the end and the unparsed
+        content of each record, starting from `start` (or from `offset`,
+        if given)"""
+        with open(self.path, "rb") as f:
+            lines = LineTracker(f)
+            fieldnames = None
+            if self.fmt == "csv":
+                fieldnames = next(csv.reader(lines), None)
+
+            if self.start_offset > lines.offset:
+                f.seek(self.start_offset)
+                lines.offset = self.start_offset
+
+            if self.fmt == "sdf":
+                records = iter_sdf_records(lines)
+            elif self.fmt == "smi":
+                records = iter_smi_records(lines)
+            else:
+                records = csv.DictReader(lines, fieldnames=fieldnames)
+
+            # when resuming from an offset, the records before it are not read
+            first = self.start if self.start_offset > 0 else 0
+            for idx, record in enumerate(records, first):
+                if idx >= self.start:
+                    yield idx, lines.offset, record
+
+    def __iter__(self) -> Iterator[Union[MoleculeInfo, ConformerInfo]]:
+        kwargs = {}
+        if self.fmt == "csv":
+            kwargs["smiles_column"] = self.smiles_column
+
+        fn = functools.partial(_parse_chunk, fmt=self.fmt, kind=self.kind, **kwargs)
+        chunks = map_chunks(
+            fn,
+            self.iter_records(),
+            n_workers=self.n_workers,
+            chunksize=self.chunksize,
+        )
+
+        for results in chunks:
+            for idx, offset, info, error in results:
+                self.position = idx + 1
+                self.offset = offset
+                if info is None:
+                    self._report(MalformedRecord(idx, error))
+                    continue
+
+                yield info
+
+    def _report(self, record: MalformedRecord):
+        self.num_errors += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(record)
+
+        if self.on_error is not None:
+            self.on_error(record)
@@ -1,16 +1,21 @@
 import json
 import numpy as np
 
+from mkite_core.models.arrays import as_builtins
+
 
 class NumpyEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, np.ndarray):
             return obj.tolist()
+
+        if isinstance(obj, np.generic):
+            return obj.item()
+
         return json.JSONEncoder.default(self, obj)
 
 
 def reserialize(data: dict):
-    """Converts numpy arrays into lists when serializing
-    a given dictionary"""
-    s = json.dumps(data, cls=NumpyEncoder)
-    return json.loads(s)
+    """Converts numpy arrays and scalars into lists and Python
+    scalars in the given dictionary"""
+    return as_builtins(data)
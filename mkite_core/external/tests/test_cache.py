@@ -0,0 +1,103 @@
+import os
+import unittest as ut
+
+from mkite_core.tests.tempdirs import run_in_tempdir
+from mkite_core.external.cache import SmilesCache
+from mkite_core.external.rdkit import canonicalize_many
+from mkite_core.models import MoleculeInfo
+
+
+ETHANOL = ("CCO", "LFQSCWFLJHTTHZ-UHFFFAOYSA-N")
+
+
+class TestSmilesCache(ut.TestCase):
+    @run_in_tempdir
+    def test_get_put(self):
+        with SmilesCache("cache.sqlite") as cache:
+            self.assertEqual(cache.get("OCC"), (False, None))
+
+            cache.put_many([("OCC", ETHANOL), ("C1CC", None)])
+            self.assertEqual(len(cache), 2)
+            self.assertEqual(cache.get("OCC"), (True, ETHANOL))
+            self.assertEqual(cache.get("C1CC"), (True, None))
+            self.assertEqual(cache.get("OCC", stereochemistry=False), (False, None))
+
+        with SmilesCache("cache.sqlite") as cache:
+            self.assertEqual(len(cache), 2)
+            self.assertEqual(cache.get_many(["OCC", "CCC"]), {"OCC": ETHANOL})
+
+        with SmilesCache("cache.sqlite", rdkit_version="0.0") as cache:
+            self.assertEqual(cache.get_many(["OCC"]), {})
+
+    @run_in_tempdir
+    def test_size(self):
+        with SmilesCache("cache.sqlite") as cache:
+            cache.put_many([("OCC", None), ("OCC", ETHANOL), ("C1CC", None)])
+            self.assertEqual(len(cache), 2)
+
+            cache.put_many([("OCC", ETHANOL), ("CCC", None)])
+            self.assertEqual(len(cache), 3)
+            self.assertEqual(len(cache), cache._count())
+            self.assertEqual(cache.get("OCC"), (True, ETHANOL))
+
+    @run_in_tempdir
+    def test_touch(self):
+        with SmilesCache("cache.sqlite") as cache:
+            cache.put_many([("OCC", ETHANOL), ("C1CC", None)])
+            query = "SELECT smiles, atime FROM smiles"
+            atimes = dict(cache.conn.execute(query))
+
+            self.assertEqual(cache.get("OCC", touch=False), (True, ETHANOL))
+            self.assertEqual(dict(cache.conn.execute(query)), atimes)
+
+            cache.get_many(["OCC", "C1CC"])
+            new_atimes = dict(cache.conn.execute(query))
+            self.assertGreater(new_atimes["OCC"], atimes["OCC"])
+            self.assertGreater(new_atimes["C1CC"], atimes["C1CC"])
+
+    @run_in_tempdir
+    def test_eviction(self):
+        with SmilesCache("cache.sqlite", max_size=10, evict_fraction=0.5) as cache:
+            cache.put_many([(f"C{i}", None) for i in range(10)])
+            cache.get("C0")
+            cache.put("C10", None)
+
+            self.assertEqual(len(cache), 5)
+            found = cache.get_many([f"C{i}" for i in range(11)])
+            self.assertEqual(sorted(found), ["C0", "C10", "C7", "C8", "C9"])
+
+    @run_in_tempdir
+    def test_molecule_info(self):
+        with SmilesCache("cache.sqlite") as cache:
+            info = MoleculeInfo.from_smiles("OCC", cache=cache)
+            self.assertEqual((info.smiles, info.inchikey), ETHANOL)
+            self.assertEqual(cache.get("OCC"), (True, ETHANOL))
+
+            # results are taken from the cache
+            cache.put("OCC", ("fake", "key"))
+            info = MoleculeInfo.from_smiles("OCC", cache=cache)
+            self.assertEqual(info.smiles, "fake")
+
+            with self.assertRaises(ValueError):
+                MoleculeInfo.from_smiles("C1CC", cache=cache)
+
+            self.assertEqual(cache.get("C1CC"), (True, None))
+
+    @run_in_tempdir
+    def test_canonicalize_many(self):
+        smiles = ["OCC", "C1CC", "OCC", "c1ccccc1", "CCO"]
+        expected = [ETHANOL, None, ETHANOL, "c1ccccc1", ETHANOL]
+
+        with SmilesCache("cache.sqlite") as cache:
+            cache.put("CCO", ("cached", "key"))
+            for n_workers in [1, 2]:
+                results = list(
+                    canonicalize_many(
+                        iter(smiles), n_workers=n_workers, chunksize=2, cache=cache
+                    )
+                )
+                self.assertEqual(results[:3], expected[:3])
+                self.assertEqual(results[3][0], expected[3])
+                self.assertEqual(results[4], ("cached", "key"))
+
+            self.assertEqual(len(cache), 4)
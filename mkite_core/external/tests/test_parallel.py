@@ -0,0 +1,27 @@
+import unittest as ut
+
+from mkite_core.external.parallel import chunked, map_chunks, map_ordered
+
+
+def square_all(chunk):
+    return [x**2 for x in chunk]
+
+
+class TestParallel(ut.TestCase):
+    def test_chunked(self):
+        chunks = list(chunked(range(7), 3))
+        self.assertEqual(chunks, [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertEqual(list(chunked([], 3)), [])
+
+    def test_map_chunks(self):
+        expected = [[x**2 for x in range(i, min(i + 4, 50))] for i in range(0, 50, 4)]
+        for n_workers in [1, 2]:
+            results = map_chunks(
+                square_all, iter(range(50)), n_workers=n_workers, chunksize=4
+            )
+            self.assertEqual(list(results), expected)
+
+    def test_map_ordered(self):
+        for n_workers in [1, 2]:
+            results = map_ordered(square_all, iter([[1, 2], [], [3]]), n_workers)
+            self.assertEqual(list(results), [[1, 4], [], [9]])
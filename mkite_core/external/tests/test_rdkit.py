@@ -1,8 +1,10 @@
 import unittest as ut
 from pkg_resources import resource_filename
 
+import numpy as np
 import rdkit.Chem.AllChem as Chem
-from mkite_core.external.rdkit import RdkitInterface
+from mkite_core.external.rdkit import RdkitInterface, canonicalize
+from mkite_core.models import MoleculeInfo
 
 
 TEST_MOL = resource_filename("mkite_core.tests.files", "tea.sdf")
@@ -41,3 +43,53 @@ class TestRdkitInterface(ut.TestCase):
     def test_num_conf(self):
         expected = 1
         self.assertEqual(self.interf.num_conformers, expected)
+
+    def test_conformer_ensemble(self):
+        mol = Chem.AddHs(self.mol, addCoords=True)
+        Chem.EmbedMultipleConfs(mol, numConfs=3, randomSeed=42)
+        interf = RdkitInterface(mol)
+
+        ensemble = interf.conformer_ensemble
+        self.assertEqual(ensemble.coords.shape, (3, 29, 3))
+        self.assertEqual(ensemble.mol.inchikey, "CBXCPBUEXACCNR-UHFFFAOYSA-N")
+
+        conformers = interf.conformer_info
+        self.assertEqual(len(conformers), 3)
+        expected = mol.GetConformer(2).GetPositions()
+        self.assertTrue(np.allclose(conformers[2].coords, expected))
+
+    def test_cached(self):
+        self.assertIs(self.interf._mol, self.interf._mol)
+        self.assertEqual(self.interf.inchikey, "CBXCPBUEXACCNR-UHFFFAOYSA-N")
+        self.assertIn("inchikey", vars(self.interf))
+
+    def test_invalid_smiles(self):
+        with self.assertRaises(ValueError):
+            RdkitInterface.from_smiles("C1CC")
+
+        with self.assertWarnsRegex(UserWarning, "C1CC"):
+            self.assertIsNone(canonicalize("C1CC"))
+
+        with self.assertRaises(TypeError):
+            canonicalize(None)
+
+
+class TestSmilesMany(ut.TestCase):
+    def setUp(self):
+        self.smiles = ["OCC", "C(C)[N+](CC)(CC)CC", "not_a_smiles", "c1ccccc1"]
+        self.expected = ["CCO", "CC[N+](CC)(CC)CC", None, "c1ccccc1"]
+
+    def check(self, infos):
+        smiles = [None if info is None else info.smiles for info in infos]
+        self.assertEqual(smiles, self.expected)
+        self.assertEqual(infos[1].inchikey, "CBXCPBUEXACCNR-UHFFFAOYSA-N")
+
+    def test_serial(self):
+        infos = list(MoleculeInfo.from_smiles_many(self.smiles, n_workers=1))
+        self.check(infos)
+
+    def test_parallel(self):
+        infos = MoleculeInfo.from_smiles_many(
+            iter(self.smiles), n_workers=2, chunksize=1
+        )
+        self.check(list(infos))
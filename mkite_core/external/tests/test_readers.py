@@ -0,0 +1,127 @@
+import unittest as ut
+from pkg_resources import resource_filename
+
+from mkite_core.tests.tempdirs import run_in_tempdir
+from mkite_core.external.readers import MoleculeReader
+from mkite_core.models import MoleculeInfo, ConformerInfo
+
+
+TEST_MOL = resource_filename("mkite_core.tests.files", "tea.sdf")
+TEA_INCHIKEY = "CBXCPBUEXACCNR-UHFFFAOYSA-N"
+
+
+class TestMoleculeReader(ut.TestCase):
+    def write_sdf(self, path):
+        with open(TEST_MOL, "r") as f:
+            block = f.read()
+
+        records = [
+            block + ">  <energy>\n-1.5\n\n",
+            "broken\n\n\n  1  0  0  0  0  0  0  0  0  0999 V2000\nM  END\n",
+            block,
+        ]
+        with open(path, "w") as f:
+            f.write("".join(rec + "$$$$\n" for rec in records))
+
+    @run_in_tempdir
+    def test_sdf(self):
+        self.write_sdf("mols.sdf")
+        errors = []
+        reader = MoleculeReader("mols.sdf", n_workers=1, on_error=errors.append)
+        infos = list(reader)
+
+        self.assertEqual(len(infos), 2)
+        self.assertIsInstance(infos[0], ConformerInfo)
+        self.assertEqual(len(infos[0].species), 29)
+        self.assertEqual(infos[0].mol.inchikey, TEA_INCHIKEY)
+        self.assertEqual(infos[0].attributes, {"energy": -1.5})
+        self.assertEqual([e.index for e in errors], [1])
+        self.assertEqual(reader.errors, errors)
+        self.assertEqual(reader.position, 3)
+
+    @run_in_tempdir
+    def test_resume(self):
+        self.write_sdf("mols.sdf")
+        reader = MoleculeReader("mols.sdf", kind="molecule", start=1, n_workers=1)
+        infos = list(reader)
+
+        self.assertEqual(len(infos), 1)
+        self.assertIsInstance(infos[0], MoleculeInfo)
+        self.assertEqual(infos[0].inchikey, TEA_INCHIKEY)
+        self.assertEqual(len(reader.errors), 1)
+
+    @run_in_tempdir
+    def test_resume_offset(self):
+        self.write_sdf("mols.sdf")
+        reader = MoleculeReader("mols.sdf", n_workers=1)
+        first = next(iter(reader))
+        self.assertEqual(reader.position, 1)
+
+        resumed = MoleculeReader(
+            "mols.sdf", start=reader.position, offset=reader.offset, n_workers=1
+        )
+        infos = list(resumed)
+        self.assertEqual(len(infos), 1)
+        self.assertEqual(infos[0].mol, first.mol)
+        self.assertEqual([e.index for e in resumed.errors], [1])
+        self.assertEqual(resumed.position, 3)
+
+        with open("mols.csv", "w") as f:
+            f.write('id,smiles\n1,OCC\n"2\n2",CC\n3,c1ccccc1\n')
+
+        reader = MoleculeReader("mols.csv", n_workers=1, chunksize=1)
+        infos = iter(reader)
+        next(infos)
+        next(infos)
+        resumed = MoleculeReader(
+            "mols.csv", start=reader.position, offset=reader.offset, n_workers=1
+        )
+        infos = list(resumed)
+        self.assertEqual([info.smiles for info in infos], ["c1ccccc1"])
+        self.assertEqual(infos[0].attributes, {"id": "3"})
+
+    @run_in_tempdir
+    def test_max_errors(self):
+        with open("mols.smi", "w") as f:
+            f.write("not_a_smiles\n" * 5 + "CCO\n")
+
+        errors = []
+        reader = MoleculeReader(
+            "mols.smi", n_workers=1, max_errors=2, on_error=errors.append
+        )
+        self.assertEqual(len(list(reader)), 1)
+        self.assertEqual(reader.num_errors, 5)
+        self.assertEqual(len(reader.errors), 2)
+        self.assertEqual(len(errors), 5)
+
+    @run_in_tempdir
+    def test_smi(self):
+        with open("mols.smi", "w") as f:
+            f.write("OCC ethanol\n\nnot_a_smiles\nc1ccccc1\n")
+
+        reader = MoleculeReader("mols.smi", n_workers=2, chunksize=1)
+        infos = list(reader)
+
+        self.assertEqual([info.smiles for info in infos], ["CCO", "c1ccccc1"])
+        self.assertEqual(infos[0].attributes, {"name": "ethanol"})
+        self.assertEqual([e.index for e in reader.errors], [1])
+        self.assertEqual(reader.position, 3)
+
+    @run_in_tempdir
+    def test_csv(self):
+        with open("mols.csv", "w") as f:
+            f.write("id,SMILES\n1,OCC\n2,\n3,c1ccccc1\n")
+
+        reader = MoleculeReader("mols.csv", smiles_column="SMILES", n_workers=1)
+        infos = list(reader)
+
+        self.assertEqual([info.smiles for info in infos], ["CCO", "c1ccccc1"])
+        self.assertEqual(infos[1].attributes, {"id": "3"})
+        self.assertEqual([e.index for e in reader.errors], [1])
+
+    def test_format(self):
+        with self.assertRaises(ValueError):
+            MoleculeReader("mols.xyz")
+
+        with self.assertRaises(ValueError):
+            MoleculeReader("mols.smi", kind="conformer")
@@ -0,0 +1,35 @@
+import json
+import unittest as ut
+
+import numpy as np
+
+from mkite_core.external.serialization import NumpyEncoder, reserialize
+
+
+class TestSerialization(ut.TestCase):
+    def test_reserialize(self):
+        data = {
+            "array": np.arange(4).reshape(2, 2),
+            "float": np.float32(0.5),
+            "int": np.int64(3),
+            "bool": np.bool_(True),
+            "nested": [{"x": np.zeros(2)}, (np.int8(1), "a")],
+            1: "one",
+        }
+        result = reserialize(data)
+        expected = {
+            "array": [[0, 1], [2, 3]],
+            "float": 0.5,
+            "int": 3,
+            "bool": True,
+            "nested": [{"x": [0.0, 0.0]}, (1, "a")],
+            "1": "one",
+        }
+        self.assertEqual(result, expected)
+        self.assertIs(type(result["bool"]), bool)
+        self.assertIs(type(result["int"]), int)
+
+    def test_encoder(self):
+        data = {"array": np.ones(2), "float": np.float32(0.5)}
+        result = json.loads(json.dumps(data, cls=NumpyEncoder))
+        self.assertEqual(result, {"array": [1.0, 1.0], "float": 0.5})
@@ -1,6 +1,35 @@
+import importlib
+
 from .base import BaseInfo, NodeResults, CalcInfo
 from .jobs import JobInfo, JobResults, RunStatsInfo
+from .jobs import JobResultsWriter, JobResultsReader
 from .formula import FormulaInfo
 from .structs import CrystalInfo, SpaceGroupInfo
-from .mols import MoleculeInfo, ConformerInfo
+from .mols import MoleculeInfo, ConformerInfo, ConformerEnsembleInfo
 from .status import Status
+
+# classes that are only imported when accessed (PEP 562)
+_LAZY_IMPORTS = {
+    "ArrayReference": ".blobs",
+    "ArrayWriter": ".blobs",
+    "CrystalBatch": ".batch",
+    "LazyJobInfo": ".lazy",
+    "LazyJobResults": ".lazy",
+    "StructureFingerprint": ".fingerprint",
+    "StructureIndex": ".fingerprint",
+    "StructureStore": ".store",
+    "StructureStoreWriter": ".store",
+    "StoreReference": ".store",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        return getattr(module, name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY_IMPORTS])
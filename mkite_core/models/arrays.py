@@ -0,0 +1,117 @@
+"""Helpers to store numerical data of the models as NumPy arrays and to
+serialize them with msgspec."""
+
+from typing import Any, Callable, Type
+
+import msgspec as msg
+import numpy as np
+
+
+FLOAT = np.float64
+NUMERIC_KINDS = "biuf"
+
+
+def as_float_array(data, shape: tuple = None) -> np.ndarray:
+    """Converts `data` into a float64 array with the given `shape`.
+    If `data` is already a float64 array, its buffer is shared
+    instead of copied."""
+    arr = np.asarray(data, dtype=FLOAT)
+
+    if shape is not None and arr.shape != shape:
+        arr = arr.reshape(shape)
+
+    return arr
+
+
+def as_writeable_array(arr: np.ndarray) -> np.ndarray:
+    """Returns `arr` itself if it is a writeable, C-contiguous float64
+    array, or a copy of it otherwise. Useful when handing the buffer
+    to libraries that modify it in place (e.g. ASE)."""
+    return np.require(arr, dtype=FLOAT, requirements=["C", "W"])
+
+
+def as_siteprops(siteprops: dict) -> dict:
+    """Converts the numeric values of `siteprops` into arrays. Values
+    that are not numeric (e.g. lists of strings) are kept as they are."""
+    if not siteprops:
+        return siteprops
+
+    props = {}
+    for key, value in siteprops.items():
+        if isinstance(value, (list, tuple, np.ndarray)):
+            value = _as_numeric_array(value)
+
+        props[key] = value
+
+    return props
+
+
+def _as_numeric_array(value):
+    try:
+        arr = np.asarray(value)
+    except ValueError:
+        return value
+
+    if arr.dtype.kind not in NUMERIC_KINDS:
+        return value
+
+    return arr
+
+
+def values_equal(a: Any, b: Any) -> bool:
+    """Compares two values that may be (or contain) arrays"""
+    if isinstance(a, dict) and isinstance(b, dict):
+        if a.keys() != b.keys():
+            return False
+
+        return all(values_equal(a[k], b[k]) for k in a)
+
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        a, b = np.asarray(a), np.asarray(b)
+        if a.shape != b.shape:
+            return False
+
+        if a.dtype.kind in NUMERIC_KINDS and b.dtype.kind in NUMERIC_KINDS:
+            return bool(np.allclose(a, b))
+
+        return bool(np.all(a == b))
+
+    return a == b
+
+
+def enc_hook(obj: Any) -> Any:
+    """Encodes NumPy objects that msgspec does not support natively"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+
+    if isinstance(obj, np.generic):
+        return obj.item()
+
+    raise TypeError(f"Objects of type {type(obj)} are not supported")
+
+
+def str_enc_hook(obj: Any) -> Any:
+    """Same as `enc_hook`, but encodes unsupported objects (e.g. the
+    `Spacegroup` of atoms read from a CIF file) as their string
+    representation. Only meant for free-form metadata."""
+    try:
+        return enc_hook(obj)
+    except TypeError:
+        return str(obj)
+
+
+def dec_hook(type_: Type, obj: Any) -> Any:
+    """Decodes the fields annotated as NumPy arrays"""
+    if type_ is np.ndarray:
+        return as_float_array(obj)
+
+    raise NotImplementedError(f"Objects of type {type_} are not supported")
+
+
+def as_builtins(data: Any, enc_hook: Callable = enc_hook) -> Any:
+    """Converts `data` into builtin Python types in a single pass. Arrays
+    become nested lists, NumPy scalars become Python scalars and keys of
+    dictionaries become strings, as in a JSON round trip. Tuples are
+    kept as tuples. Unsupported objects raise a TypeError unless
+    `enc_hook` encodes them."""
+    return msg.to_builtins(data, enc_hook=enc_hook, str_keys=True)
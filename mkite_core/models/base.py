@@ -1,36 +1,138 @@
 import os
+import copy
 import uuid
 import json
+import typing
+import functools
 import msgspec as msg
-from typing import List, BinaryIO
+from pathlib import Path
+from typing import List, BinaryIO, Iterable
 from datetime import datetime
 
+from .arrays import as_builtins, enc_hook, dec_hook
+from .compression import open_file, strip_compression
+
+
+FILE_FORMATS = {
+    ".json": "json",
+    ".jsonl": "jsonl",
+    ".msgpack": "msgpack",
+}
+
+CODECS = {
+    "json": msg.json,
+    "jsonl": msg.json,
+    "msgpack": msg.msgpack,
+}
+
+
+def get_format(path: os.PathLike) -> str:
+    """Returns the serialization format of a file given its extension.
+    Compression extensions (e.g. jobresults.json.gz) are ignored."""
+    extension = Path(strip_compression(path)).suffix.lower()
+
+    if extension not in FILE_FORMATS:
+        raise ValueError(f"File {path} has unrecognized extension {extension}")
+
+    return FILE_FORMATS[extension]
+
+
+def get_extension(fmt: str) -> str:
+    """Returns the file extension of a serialization format."""
+    for extension, _fmt in FILE_FORMATS.items():
+        if _fmt == fmt:
+            return extension
+
+    raise ValueError(f"Unrecognized format {fmt}")
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoder(fmt: str = "json"):
+    """Returns the encoder shared by all models for the format `fmt`.
+    msgspec encoders are not bound to a type, so a single instance
+    can be reused. NumPy arrays are encoded as nested lists."""
+    return CODECS[fmt].Encoder(enc_hook=enc_hook)
+
+
+@functools.lru_cache(maxsize=None)
+def get_decoder(type_, fmt: str = "json"):
+    """Returns a cached decoder for `type_` in the format `fmt`. Creating
+    a decoder requires processing the type annotations, which is often
+    slower than decoding small payloads."""
+    return CODECS[fmt].Decoder(type_, dec_hook=dec_hook)
+
+
+@functools.lru_cache(maxsize=None)
+def get_nested_fields(cls) -> tuple:
+    """Returns the fields of `cls` whose annotations allow them to hold
+    another model, and thus have to be converted when calling `as_dict`."""
+    hints = typing.get_type_hints(cls)
+    return tuple(f for f in cls.__struct_fields__ if _is_info_type(hints.get(f)))
+
+
+def _is_info_type(type_) -> bool:
+    if isinstance(type_, type):
+        return issubclass(type_, BaseInfo)
+
+    if typing.get_origin(type_) is typing.Union:
+        return any(_is_info_type(arg) for arg in typing.get_args(type_))
+
+    return False
+
+
+def is_json_lines(data: bytes) -> bool:
+    """Guesses whether `data` is a JSON Lines buffer (one object per line)
+    rather than a JSON array of objects."""
+    return data.lstrip()[:1] != b"["
+
 
 class BaseInfo(msg.Struct):
     @classmethod
     def from_json(cls, path: os.PathLike):
-        with open(path, "rb") as f:
+        with open_file(path, "rb") as f:
             data = f.read()
 
-        return msg.json.decode(data, type=cls)
+        return cls.decode(data)
+
+    def encode(self, fmt: str = "json"):
+        data = get_encoder(fmt).encode(self)
+        if fmt == "jsonl":
+            data += b"\n"
 
-    def encode(self):
-        return msg.json.encode(self)
+        return data
 
-    def to_json(self, path: os.PathLike):
-        with open(path, "wb") as f:
+    def to_json(self, path: os.PathLike, level: int = None):
+        with open_file(path, "wb", level=level) as f:
             f.write(self.encode())
 
+    @classmethod
+    def from_file(cls, path: os.PathLike):
+        """Loads the object from a JSON, JSON Lines or MessagePack file.
+        The format and compression are inferred from the extensions
+        of `path`."""
+        with open_file(path, "rb") as f:
+            data = f.read()
+
+        return cls.decode(data, fmt=get_format(path))
+
+    def to_file(self, path: os.PathLike, level: int = None):
+        """Saves the object to a JSON, JSON Lines or MessagePack file.
+        The format and compression are inferred from the extensions
+        of `path`. `level` is the compression level, if any."""
+        with open_file(path, "wb", level=level) as f:
+            f.write(self.encode(fmt=get_format(path)))
+
     def as_dict(self):
-        fields = {}
-        for f in self.__struct_fields__:
-            value = getattr(self, f)
-            fields[f] = value.as_dict() if isinstance(value, BaseInfo) else value
+        """Returns the object as a dictionary of builtin types, which can
+        be given to `json.dumps` or to the ORM. Arrays become lists."""
+        fields = msg.structs.asdict(self)
+        for f in get_nested_fields(self.__class__):
+            value = fields[f]
+            if isinstance(value, BaseInfo):
+                fields[f] = value.as_dict()
 
-        return {
-            **fields,
-            **self.extra_dict_fields,
-        }
+        fields.update(self.extra_dict_fields)
+        return as_builtins(fields)
 
     @property
     def extra_dict_fields(self):
@@ -42,13 +144,52 @@ class BaseInfo(msg.Struct):
         return cls(**internal_data)
 
     @classmethod
-    def decode(cls, data: BinaryIO):
-        decoder = msg.json.Decoder(cls)
-        return decoder.decode(data)
+    def decode(cls, data: BinaryIO, fmt: str = "json"):
+        return get_decoder(cls, fmt).decode(data)
+
+    @classmethod
+    def decode_many(
+        cls, data: bytes, lines: bool = None, fmt: str = "json"
+    ) -> List["BaseInfo"]:
+        """Decodes several objects of this class at once.
+
+        Parameters:
+            data: either an array of objects or a JSON Lines buffer,
+                with one object per line.
+            lines: whether `data` is in the JSON Lines format. If None,
+                the format is inferred from the first character of `data`.
+                Only used if `fmt` is "json".
+            fmt: serialization format of `data`. One of "json", "jsonl"
+                or "msgpack".
+        """
+        if fmt == "json" and lines is None:
+            lines = is_json_lines(data)
+
+        if fmt == "jsonl" or (fmt == "json" and lines):
+            return get_decoder(cls, fmt).decode_lines(data)
+
+        return get_decoder(List[cls], fmt).decode(data)
 
-    def copy(self):
-        cls = self.__class__
-        return cls.from_dict(self.as_dict())
+    @classmethod
+    def encode_many(
+        cls, items: Iterable["BaseInfo"], lines: bool = False, fmt: str = "json"
+    ) -> bytes:
+        """Encodes several objects at once into an array or, if `lines`
+        is True or `fmt` is "jsonl", into a JSON Lines buffer."""
+        if fmt == "jsonl" or (fmt == "json" and lines):
+            return get_encoder(fmt).encode_lines(items)
+
+        return get_encoder(fmt).encode(list(items))
+
+    def copy(self, deepcopy: bool = False):
+        """Copies the object. By default, the copy is shallow and shares
+        the values of the fields (e.g. dictionaries and arrays) with the
+        original object. If `deepcopy` is True, all values are copied,
+        and arrays stay arrays."""
+        if deepcopy:
+            return copy.deepcopy(self)
+
+        return msg.structs.replace(self)
 
     def create_uuid(self):
         return str(uuid.uuid4())
@@ -0,0 +1,199 @@
+import os
+from typing import Iterable, Iterator, List, Union
+
+import numpy as np
+
+from .structs import CrystalInfo
+from .elements import SYMBOLS, ATOMIC_NUMBERS
+from .formula import parse_species
+
+
+ARRAYS = ["numbers", "coords", "lattices", "offsets"]
+CHUNK_SIZE = 1 << 20
+
+
+def get_symbols(numbers: np.ndarray) -> List[str]:
+    return [SYMBOLS[z] for z in numbers.tolist()]
+
+
+def get_numbers(symbols: List[str]) -> np.ndarray:
+    """Returns the atomic numbers of `symbols`. Species with oxidation
+    states or isotopes (e.g. "Fe2+" or "D") are converted into their
+    elements, as done by `parse_species`."""
+    try:
+        return np.array([ATOMIC_NUMBERS[s] for s in symbols], dtype=np.uint8)
+    except KeyError:
+        pass
+
+    numbers = []
+    for symbol in symbols:
+        element, _ = parse_species(symbol)
+        if element not in ATOMIC_NUMBERS:
+            raise ValueError(f"Species {symbol!r} is not supported")
+
+        numbers.append(ATOMIC_NUMBERS[element])
+
+    return np.array(numbers, dtype=np.uint8)
+
+
+class CrystalBatch:
+    """Columnar container for a large number of crystal structures.
+    Instead of storing one `CrystalInfo` per structure, the batch
+    concatenates the data of all structures into a few arrays:
+
+    Parameters:
+        numbers: (N_total,) array with the atomic numbers of all sites.
+        coords: (N_total, 3) array with the cartesian coordinates of all
+            sites.
+        lattices: (n, 3, 3) array with the lattice vectors of the `n`
+            structures.
+        offsets: (n + 1,) array such that the sites of the structure `i`
+            are `offsets[i]:offsets[i + 1]`.
+
+    Only the species, coordinates and lattices are stored. Site properties
+    and attributes of the structures are not kept in the batch.
+    """
+
+    def __init__(
+        self,
+        numbers: np.ndarray,
+        coords: np.ndarray,
+        lattices: np.ndarray,
+        offsets: np.ndarray,
+    ):
+        self.numbers = np.asarray(numbers, dtype=np.uint8)
+        self.coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+        self.lattices = np.asarray(lattices, dtype=np.float64).reshape(-1, 3, 3)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+
+        if len(self.offsets) != len(self.lattices) + 1:
+            raise ValueError("offsets should have one more entry than lattices")
+
+        natoms = len(self.coords)
+        if len(self.numbers) != natoms or self.offsets[-1] != natoms:
+            raise ValueError("numbers, coords and offsets have inconsistent sizes")
+
+    @classmethod
+    def from_infos(cls, infos: Iterable[CrystalInfo]) -> "CrystalBatch":
+        infos = list(infos)
+        natoms = [len(info.species) for info in infos]
+        offsets = np.zeros(len(infos) + 1, dtype=np.int64)
+        np.cumsum(natoms, out=offsets[1:])
+
+        species = [sp for info in infos for sp in info.species]
+
+        if len(infos) == 0:
+            coords = np.zeros((0, 3))
+            lattices = np.zeros((0, 3, 3))
+        else:
+            coords = np.concatenate([info.coords for info in infos])
+            lattices = np.stack([info.lattice for info in infos])
+
+        return cls(
+            numbers=get_numbers(species),
+            coords=coords,
+            lattices=lattices,
+            offsets=offsets,
+        )
+
+    def to_infos(self) -> List[CrystalInfo]:
+        return list(self)
+
+    def __len__(self) -> int:
+        return len(self.lattices)
+
+    def __iter__(self) -> Iterator[CrystalInfo]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, idx: Union[int, slice]):
+        """Returns the structure `idx` as a `CrystalInfo` whose arrays are
+        views of the batch, or a new `CrystalBatch` if `idx` is a slice."""
+        if isinstance(idx, slice):
+            return self._get_slice(idx)
+
+        n = len(self)
+        if idx < 0:
+            idx += n
+
+        if not 0 <= idx < n:
+            raise IndexError(f"Index {idx} out of range for batch of size {n}")
+
+        start, end = self.offsets[idx], self.offsets[idx + 1]
+        return CrystalInfo(
+            species=get_symbols(self.numbers[start:end]),
+            coords=self.coords[start:end],
+            lattice=self.lattices[idx],
+        )
+
+    def _get_slice(self, idx: slice) -> "CrystalBatch":
+        start, stop, step = idx.indices(len(self))
+        if step != 1:
+            raise ValueError("Only contiguous slices of a CrystalBatch are supported")
+
+        stop = max(start, stop)
+        first, last = self.offsets[start], self.offsets[stop]
+        return self.__class__(
+            numbers=self.numbers[first:last],
+            coords=self.coords[first:last],
+            lattices=self.lattices[start:stop],
+            offsets=self.offsets[start : stop + 1] - first,
+        )
+
+    @property
+    def natoms(self) -> np.ndarray:
+        """Number of sites of each structure"""
+        return np.diff(self.offsets)
+
+    @property
+    def structure_index(self) -> np.ndarray:
+        """Index of the structure each site belongs to"""
+        return np.repeat(np.arange(len(self)), self.natoms)
+
+    @property
+    def volumes(self) -> np.ndarray:
+        return np.abs(np.linalg.det(self.lattices))
+
+    @property
+    def frac_coords(self) -> np.ndarray:
+        """Fractional coordinates of all sites, computed in chunks to
+        avoid allocating one inverse lattice per site at once."""
+        inv = np.linalg.inv(self.lattices)
+        index = self.structure_index
+        frac = np.empty_like(self.coords)
+
+        for start in range(0, len(self.coords), CHUNK_SIZE):
+            end = start + CHUNK_SIZE
+            frac[start:end] = np.einsum(
+                "ij,ijk->ik", self.coords[start:end], inv[index[start:end]]
+            )
+
+        return frac
+
+    def save(self, path: os.PathLike):
+        """Saves the batch to an uncompressed `.npz` file or, if `path`
+        does not end with `.npz`, to a directory of `.npy` files."""
+        arrays = {name: getattr(self, name) for name in ARRAYS}
+
+        if str(path).endswith(".npz"):
+            np.savez(path, **arrays)
+            return
+
+        os.makedirs(path, exist_ok=True)
+        for name, arr in arrays.items():
+            np.save(os.path.join(path, f"{name}.npy"), arr)
+
+    @classmethod
+    def load(cls, path: os.PathLike, mmap: bool = True) -> "CrystalBatch":
+        """Loads a batch saved with `save`. When loading from a directory,
+        the arrays are memory-mapped (read-only) if `mmap` is True."""
+        if os.path.isdir(path):
+            mmap_mode = "r" if mmap else None
+            arrays = {
+                name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+                for name in ARRAYS
+            }
+            return cls(**arrays)
+
+        with np.load(path) as data:
+            return cls(**{name: data[name] for name in ARRAYS})
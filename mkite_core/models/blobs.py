@@ -0,0 +1,152 @@
+"""Stores large arrays of the results in binary files (.npy or .npz)
+next to the result file. In the results, each array is replaced by a
+dictionary describing an `ArrayReference`."""
+
+import os
+from typing import Any, List, Optional
+
+import numpy as np
+
+from .base import BaseInfo
+from .arrays import NUMERIC_KINDS
+
+
+BLOB_THRESHOLD = 2**16
+BLOB_FORMATS = ["npy", "npz"]
+
+
+class ArrayReference(BaseInfo):
+    """Refers to an array saved in a .npy file or, if `key` is given,
+    to the array `key` of a .npz file. `path` is relative to the folder
+    of the file containing the reference."""
+
+    path: str
+    dtype: str
+    shape: List[int]
+    key: Optional[str] = None
+
+    @property
+    def extra_dict_fields(self):
+        return {
+            "@module": "mkite_core.models.blobs",
+            "@class": "ArrayReference",
+        }
+
+    @staticmethod
+    def is_reference(data: Any) -> bool:
+        return isinstance(data, dict) and data.get("@class") == "ArrayReference"
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ArrayReference":
+        return cls(
+            path=data["path"],
+            dtype=data["dtype"],
+            shape=data["shape"],
+            key=data.get("key"),
+        )
+
+    def load(self, folder: os.PathLike = ".", mmap: bool = True) -> np.ndarray:
+        """Loads the array. Arrays in .npy files are memory-mapped by
+        default (`mmap_mode="r"`), so their data is only read when accessed.
+        Arrays in .npz files cannot be memory-mapped and are read into
+        memory when loaded."""
+        path = os.path.join(folder, self.path)
+        if self.key is None:
+            return np.load(path, mmap_mode="r" if mmap else None)
+
+        with np.load(path) as npz:
+            return npz[self.key]
+
+
+class ArrayWriter:
+    """Replaces the numeric arrays with at least `threshold` bytes by
+    references to binary files. With the "npy" format, each array is
+    saved to its own file `{prefix}.{i}.npy`. With the "npz" format,
+    all arrays are saved to `{prefix}.npz` when the writer is closed.
+
+    Example:
+        with ArrayWriter(calcdir, "jobresults.arrays") as writer:
+            data = writer.externalize(data)
+    """
+
+    def __init__(
+        self,
+        folder: os.PathLike,
+        prefix: str,
+        threshold: int = BLOB_THRESHOLD,
+        fmt: str = "npy",
+    ):
+        if fmt not in BLOB_FORMATS:
+            raise ValueError(f"Unrecognized format {fmt}. Options are {BLOB_FORMATS}")
+
+        self.folder = str(folder)
+        self.prefix = prefix
+        self.threshold = threshold
+        self.fmt = fmt
+        self._count = 0
+        self._pending = {}
+
+    def externalize(self, data: Any) -> Any:
+        """Returns a copy of `data` in which large arrays inside nested
+        dictionaries and lists are replaced by references"""
+        if isinstance(data, dict):
+            return {k: self.externalize(v) for k, v in data.items()}
+
+        if isinstance(data, list):
+            return [self.externalize(v) for v in data]
+
+        if self._is_large(data):
+            return self._save(data).as_dict()
+
+        return data
+
+    def _is_large(self, data: Any) -> bool:
+        return (
+            isinstance(data, np.ndarray)
+            and data.dtype.kind in NUMERIC_KINDS
+            and data.nbytes >= self.threshold
+        )
+
+    def _save(self, arr: np.ndarray) -> ArrayReference:
+        i = self._count
+        self._count += 1
+
+        if self.fmt == "npz":
+            key = f"arr_{i}"
+            self._pending[key] = arr
+            path = f"{self.prefix}.npz"
+        else:
+            key = None
+            path = f"{self.prefix}.{i}.npy"
+            np.save(os.path.join(self.folder, path), arr)
+
+        return ArrayReference(
+            path=path, dtype=arr.dtype.str, shape=list(arr.shape), key=key
+        )
+
+    def close(self):
+        if self._pending:
+            path = os.path.join(self.folder, f"{self.prefix}.npz")
+            np.savez(path, **self._pending)
+            self._pending = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def load_arrays(data: Any, folder: os.PathLike = ".", mmap: bool = True) -> Any:
+    """Returns a copy of `data` in which the references created by
+    `ArrayWriter` are replaced by the arrays they refer to"""
+    if ArrayReference.is_reference(data):
+        return ArrayReference.from_dict(data).load(folder, mmap=mmap)
+
+    if isinstance(data, dict):
+        return {k: load_arrays(v, folder, mmap) for k, v in data.items()}
+
+    if isinstance(data, list):
+        return [load_arrays(v, folder, mmap) for v in data]
+
+    return data
@@ -0,0 +1,71 @@
+import io
+import os
+from typing import IO, Optional
+
+
+COMPRESSIONS = {
+    ".gz": "gzip",
+    ".xz": "xz",
+    ".zst": "zstd",
+}
+
+
+def get_compression(path: os.PathLike) -> Optional[str]:
+    """Returns the compression of a file given its last extension,
+    or None if the file is not compressed."""
+    _, extension = os.path.splitext(str(path))
+    return COMPRESSIONS.get(extension.lower())
+
+
+def strip_compression(path: os.PathLike) -> str:
+    """Removes the compression extension from `path`, if any."""
+    path = str(path)
+    if get_compression(path) is None:
+        return path
+
+    return os.path.splitext(path)[0]
+
+
+def get_compression_extension(compression: Optional[str]) -> str:
+    if compression is None:
+        return ""
+
+    for extension, _compression in COMPRESSIONS.items():
+        if _compression == compression:
+            return extension
+
+    raise ValueError(f"Unrecognized compression {compression}")
+
+
+def open_file(path: os.PathLike, mode: str = "rb", level: int = None) -> IO:
+    """Opens a file, compressing or decompressing it according to its
+    extension (.gz, .xz or .zst). `level` is the compression level used
+    when writing, and defaults to the default of each library. Reading
+    or writing .zst files requires the `zstandard` package."""
+    compression = get_compression(path)
+
+    if compression is None:
+        return open(path, mode)
+
+    if compression == "gzip":
+        import gzip
+
+        return gzip.open(path, mode, compresslevel=9 if level is None else level)
+
+    if compression == "xz":
+        import lzma
+
+        preset = level if "w" in mode or "a" in mode else None
+        return lzma.open(path, mode, preset=preset)
+
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("Reading or writing .zst files requires zstandard") from e
+
+    if mode == "rb":
+        # the zstandard readers do not support reading lines
+        return io.BufferedReader(zstandard.open(path, mode))
+
+    cctx = zstandard.ZstdCompressor(level=3 if level is None else level)
+    return zstandard.open(path, mode, cctx=cctx)
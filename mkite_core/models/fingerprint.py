@@ -0,0 +1,236 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+DEFAULT_TOL = 0.01
+
+# maximum number of displacement vectors held in memory at once
+# when computing the distances
+MAX_DISPLACEMENTS = 2**20
+
+# translations to the neighboring cells searched for the minimum image
+IMAGES = np.array(
+    [[i, j, k] for i in (-1, 0, 1) for j in (-1, 0, 1) for k in (-1, 0, 1)]
+)
+
+# bins of the lattice lengths searched by `StructureIndex`, starting
+# with the bin of the structure itself
+NEIGHBOR_BINS = IMAGES[np.argsort(np.abs(IMAGES).sum(axis=1), kind="stable")]
+
+
+class StructureFingerprint:
+    """Fingerprint of a crystal that does not depend on the ordering of
+    the atoms, on the ordering of the lattice vectors or on the origin
+    of the cell. It contains:
+
+        composition: sorted tuple of (species, count).
+        lengths: sorted lengths of the lattice vectors.
+        angles: sorted absolute cosines between the lattice vectors.
+        distances: for each pair of species (in sorted order), the sorted
+            interatomic distances between minimum images (see `get_distances`).
+
+    Structures described with different (e.g. non-reduced) bases of the same
+    lattice have different fingerprints. The number of distances, and thus
+    the memory used by the fingerprint, grows with the square of the number
+    of sites.
+    """
+
+    def __init__(
+        self,
+        composition: Tuple[Tuple[str, int], ...],
+        lengths: np.ndarray,
+        angles: np.ndarray,
+        distances: np.ndarray,
+    ):
+        self.composition = composition
+        self.lengths = lengths
+        self.angles = angles
+        self.distances = distances
+
+    @classmethod
+    def from_info(cls, info: "CrystalInfo") -> "StructureFingerprint":
+        lattice = info.lattice
+        lengths = np.linalg.norm(lattice, axis=1)
+
+        unit = lattice / lengths[:, None]
+        cosines = np.abs([unit[1] @ unit[2], unit[0] @ unit[2], unit[0] @ unit[1]])
+
+        return cls(
+            composition=tuple(sorted(Counter(info.species).items())),
+            lengths=np.sort(lengths),
+            angles=np.sort(cosines),
+            distances=get_distances(info),
+        )
+
+    def key(self, tol: float = DEFAULT_TOL) -> tuple:
+        """Hashable key obtained by quantizing the fingerprint to `tol`.
+        Fingerprints with the same key are equal within `tol`, but values
+        close to the boundaries of the bins may lead to different keys
+        for nearly identical structures. `StructureIndex` takes this into
+        account when looking for duplicates."""
+        return (
+            self.composition,
+            _quantize(self.lengths, tol),
+            _quantize(self.angles, tol),
+            _quantize(self.distances, tol),
+        )
+
+    def matches(
+        self, other: "StructureFingerprint", tol: float = DEFAULT_TOL
+    ) -> bool:
+        """Whether all the values of the fingerprints differ by at most `tol`"""
+        if self.composition != other.composition:
+            return False
+
+        if self.distances.shape != other.distances.shape:
+            return False
+
+        return all(
+            np.allclose(a, b, rtol=0, atol=tol)
+            for a, b in [
+                (self.lengths, other.lengths),
+                (self.angles, other.angles),
+                (self.distances, other.distances),
+            ]
+        )
+
+
+def _quantize(values: np.ndarray, tol: float) -> tuple:
+    return tuple(np.round(values / tol).astype(np.int64).tolist())
+
+
+def get_distances(info: "CrystalInfo") -> np.ndarray:
+    """Returns the sorted interatomic distances of `info` grouped by
+    pairs of species. The distance between two sites is the shortest
+    one among the images in the 27 cells around the reduced displacement,
+    which is the minimum image unless the lattice is extremely skewed
+    (reducing the lattice first avoids this case). Distances are computed
+    in chunks, so the temporary arrays are not quadratic in the number
+    of sites."""
+    frac = info.frac_coords
+    species = np.array(info.species)
+    unique = sorted(set(info.species))
+
+    groups = []
+    for i, a in enumerate(unique):
+        frac_a = frac[species == a]
+        for b in unique[i:]:
+            frac_b = frac[species == b]
+            values = _pair_distances(frac_a, frac_b, info.lattice, a == b)
+            groups.append(np.sort(values))
+
+    if not groups:
+        return np.zeros(0)
+
+    return np.concatenate(groups)
+
+
+def _pair_distances(
+    frac_a: np.ndarray, frac_b: np.ndarray, lattice: np.ndarray, same: bool
+) -> np.ndarray:
+    """Minimum-image distances between the sites in `frac_a` and in
+    `frac_b`. If `same` is True, both arrays contain the same sites and
+    each pair is returned only once."""
+    images = IMAGES @ lattice
+    step = max(1, MAX_DISPLACEMENTS // max(1, len(frac_b) * len(images)))
+
+    chunks = []
+    for start in range(0, len(frac_a), step):
+        diff = frac_a[start : start + step, None, :] - frac_b[None, :, :]
+        diff -= np.round(diff)
+        cart = (diff @ lattice)[:, :, None, :] + images
+        dist = np.linalg.norm(cart, axis=-1).min(axis=-1)
+
+        if same:
+            rows = np.arange(start, start + len(dist))
+            dist = dist[rows[:, None] < np.arange(len(frac_b))]
+
+        chunks.append(dist.ravel())
+
+    if not chunks:
+        return np.zeros(0)
+
+    return np.concatenate(chunks)
+
+
+class StructureIndex:
+    """Hash index of crystal structures to find duplicates.
+
+    Structures whose fingerprints have the same `key` are found with a
+    single dictionary lookup. Otherwise, structures are bucketed by their
+    composition and the quantized lengths of their lattice vectors, and
+    the buckets of the neighboring bins are searched as well, so that
+    structures near the boundary of a bin are not missed. Candidates in
+    these buckets are compared using `StructureFingerprint.matches`, so
+    this search is linear in the number of structures with the same
+    composition and similar lattices (e.g. sets of polymorphs).
+
+    Example:
+        index = StructureIndex(tol=0.01)
+        unique = index.dedup(infos)
+    """
+
+    def __init__(self, tol: float = DEFAULT_TOL):
+        self.tol = tol
+        self._keys: Dict[tuple, int] = {}
+        self._buckets: Dict[tuple, List[Tuple[StructureFingerprint, int]]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _bins(self, fp: StructureFingerprint) -> Tuple[int, ...]:
+        return _quantize(fp.lengths, self.tol)
+
+    def find(self, info: "CrystalInfo") -> Optional[int]:
+        """Returns the index of a structure equivalent to `info` that was
+        previously added to the index, or None if there is no duplicate"""
+        return self._find(StructureFingerprint.from_info(info))
+
+    def _find(self, fp: StructureFingerprint) -> Optional[int]:
+        idx = self._keys.get(fp.key(self.tol))
+        if idx is not None:
+            return idx
+
+        bins = np.array(self._bins(fp))
+        for shift in NEIGHBOR_BINS:
+            key = (fp.composition, tuple((bins + shift).tolist()))
+            for other, idx in self._buckets.get(key, []):
+                if fp.matches(other, self.tol):
+                    return idx
+
+        return None
+
+    def __contains__(self, info: "CrystalInfo") -> bool:
+        return self.find(info) is not None
+
+    def add(self, info: "CrystalInfo") -> int:
+        """Adds `info` to the index if it is not a duplicate. Returns the
+        index of the structure in the index, which is the index of the
+        existing structure if `info` is a duplicate."""
+        fp = StructureFingerprint.from_info(info)
+        idx = self._find(fp)
+        if idx is not None:
+            return idx
+
+        idx = self._size
+        self._keys[fp.key(self.tol)] = idx
+        key = (fp.composition, self._bins(fp))
+        self._buckets.setdefault(key, []).append((fp, idx))
+        self._size += 1
+        return idx
+
+    def dedup(self, infos: Iterable["CrystalInfo"]) -> List["CrystalInfo"]:
+        """Returns the structures of `infos` that are not duplicates of
+        each other or of structures already in the index, in the order
+        in which they were given"""
+        unique = []
+        for info in infos:
+            size = self._size
+            self.add(info)
+            if self._size > size:
+                unique.append(info)
+
+        return unique
@@ -1,9 +1,80 @@
 import os
+import re
+import functools
 import msgspec as msg
-from typing import List, Tuple, Dict
+import numpy as np
+from typing import List, Tuple, Dict, Iterable
 
-from pymatgen.core.composition import Composition
 from .base import BaseInfo
+from .elements import SYMBOLS, ELECTRONEGATIVITY
+
+
+AMOUNT_TOLERANCE = 1e-8
+
+# isotopes accepted by pymatgen, which are counted as their element
+ISOTOPES = {"D": "H", "T": "H"}
+
+# species with oxidation states, such as "Fe2+", "O2-" or "Na+"
+SPECIES_PATTERN = re.compile(r"^([A-Z][a-z]?)(\d*(?:\.\d+)?)([+-])$")
+
+
+def format_amount(amount: float, tol: float = AMOUNT_TOLERANCE):
+    """Formats the amount of an element as in pymatgen's formulas"""
+    if abs(amount - round(amount)) <= tol:
+        return round(amount)
+
+    return round(amount, 8)
+
+
+@functools.lru_cache(maxsize=2**16)
+def get_formula(counts: Tuple[Tuple[str, float], ...]) -> str:
+    """Creates the formula of a composition given by sorted pairs of
+    (element, amount). Reproduces `pymatgen.core.Composition.formula`,
+    which sorts the elements by electronegativity and then by symbol."""
+    for el, _ in counts:
+        if el not in ELECTRONEGATIVITY:
+            raise ValueError(f"{el} is not a valid element")
+
+    ordered = sorted(counts, key=lambda c: (ELECTRONEGATIVITY[c[0]], c[0]))
+    return " ".join(f"{el}{format_amount(amount)}" for el, amount in ordered)
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_species(symbol: str) -> Tuple[str, float]:
+    """Returns the element and oxidation state of a symbol such as "Fe",
+    "Fe2+", "O2-" or "D". Symbols that are not recognized are returned
+    as they are, with an oxidation state of zero."""
+    symbol = ISOTOPES.get(symbol, symbol)
+    match = SPECIES_PATTERN.match(symbol)
+    if symbol in ELECTRONEGATIVITY or match is None:
+        return symbol, 0
+
+    element, oxi_state, sign = match.groups()
+    oxi_state = float(oxi_state or 1) * (1 if sign == "+" else -1)
+    return ISOTOPES.get(element, element), oxi_state
+
+
+def split_species(eldict: Dict[str, float]) -> Tuple[Dict[str, float], float]:
+    """Converts the species of `eldict` into elements, as done by pymatgen.
+    Returns the amount of each element and the charge given by the
+    oxidation states of the species."""
+    elements = {}
+    charge = 0
+    for symbol, amount in eldict.items():
+        element, oxi_state = parse_species(symbol)
+        elements[element] = elements.get(element, 0) + amount
+        charge += oxi_state * amount
+
+    return elements, format_amount(charge)
+
+
+def get_counts(eldict: Dict[str, float]) -> Tuple[Tuple[str, float], ...]:
+    """Sorted pairs of (element, amount), skipping negligible amounts"""
+    for amount in eldict.values():
+        if amount < -AMOUNT_TOLERANCE:
+            raise ValueError("Amounts in a formula cannot be negative")
+
+    return tuple(sorted((el, n) for el, n in eldict.items() if n >= AMOUNT_TOLERANCE))
 
 
 class FormulaInfo(BaseInfo):
@@ -11,7 +82,7 @@ class FormulaInfo(BaseInfo):
     charge: int
 
     @classmethod
-    def from_pymatgen(cls, composition: Composition, charge: int = None):
+    def from_pymatgen(cls, composition: "Composition", charge: int = None):
         def get_charge(_composition):
             charge = 0
             for e, n in _composition.items():
@@ -26,6 +97,12 @@ class FormulaInfo(BaseInfo):
 
         return cls(name, charge)
 
+    @classmethod
+    def from_counts(cls, counts: Tuple[Tuple[str, float], ...], charge: int = None):
+        charge = charge if charge is not None else 0
+        name = f"{get_formula(counts)} {charge:+}"
+        return cls(name, charge)
+
     @classmethod
     def from_list(cls, elements: List[str], charge: int = None):
         eldict = {}
@@ -36,8 +113,41 @@ class FormulaInfo(BaseInfo):
 
     @classmethod
     def from_dict(cls, eldict: Dict[str, int], charge: int = None):
-        comp = Composition(eldict)
-        return cls.from_pymatgen(comp, charge=charge)
+        """Creates the formula from the amount of each element or species
+        (e.g. "Fe2+"). If `charge` is not given, it is obtained from the
+        oxidation states of the species, as in `from_pymatgen`."""
+        elements, oxi_charge = split_species(eldict)
+        charge = charge if charge is not None else oxi_charge
+        return cls.from_counts(get_counts(elements), charge=charge)
+
+    @classmethod
+    def from_many(
+        cls, numbers: Iterable[np.ndarray], charges: Iterable[int] = None
+    ) -> List["FormulaInfo"]:
+        """Creates the formulas of several molecules or structures at once.
+
+        Parameters:
+            numbers: for each molecule, an array with its atomic numbers.
+            charges: total charge of each molecule. If not given, all
+                molecules are assumed to be neutral.
+        """
+        numbers = list(numbers)
+        charges = [None] * len(numbers) if charges is None else list(charges)
+
+        if len(charges) != len(numbers):
+            raise ValueError("Number of charges does not match the number of molecules")
+
+        infos = []
+        for z, charge in zip(numbers, charges):
+            unique, amounts = np.unique(np.asarray(z), return_counts=True)
+            counts = get_counts(
+                {SYMBOLS[i]: int(n) for i, n in zip(unique.tolist(), amounts.tolist())}
+            )
+            infos.append(cls.from_counts(counts, charge=charge))
+
+        return infos
 
     def as_pymatgen(self):
+        from pymatgen.core.composition import Composition
+
         return Composition(self.name)
@@ -1,10 +1,29 @@
+import os
+import struct
 from datetime import datetime
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Union
 
 from .base import BaseInfo
+from .base import get_decoder
+from .base import get_encoder
+from .base import get_extension
+from .base import get_format
 from .base import NodeResults
+from .compression import get_compression_extension
+from .compression import open_file
+
+
+# MessagePack streams start with this signature and contain
+# length-prefixed objects: the header followed by the nodes
+STREAM_MAGIC = b"MKRS\x01"
+STREAM_FORMATS = ["jsonl", "msgpack"]
+LENGTH = struct.Struct("<Q")
 
 
 class JobInfo(BaseInfo):
@@ -46,6 +65,21 @@ class JobInfo(BaseInfo):
         timestamp = int(datetime.timestamp(datetime.now()))
         return f"{prefix}_{timestamp}"
 
+    def iter_inputs(self) -> Iterator[dict]:
+        """Iterates over the inputs of the job. Inputs that refer to
+        a `StructureStore` are expanded into the dictionaries of each
+        structure they refer to, which are read only when needed."""
+        from .store import StoreReference
+
+        for inp in self.inputs:
+            if not StoreReference.is_reference(inp):
+                yield inp
+                continue
+
+            ref = StoreReference.from_dict(inp)
+            for info in ref.iter_infos():
+                yield info.as_dict()
+
     @classmethod
     def from_job(cls, job: "Job") -> "JobInfo":
         def get_inputs(job: "Job"):
@@ -64,25 +98,87 @@ class JobInfo(BaseInfo):
         )
 
     @staticmethod
-    def file_name():
-        return "jobinfo.json"
+    def file_name(fmt: str = "json", compression: str = None):
+        ext = get_extension(fmt) + get_compression_extension(compression)
+        return "jobinfo" + ext
+
+
+def sum_timings(timings: List[Dict[str, float]]) -> Dict[str, float]:
+    total = {}
+    for phases in timings:
+        for phase, duration in phases.items():
+            total[phase] = round(total.get(phase, 0) + duration, 6)
+
+    return total
+
+
+# how the resources of several runs are combined
+RUNSTATS_AGGREGATES = {
+    "duration": sum,
+    "cpu_user": sum,
+    "cpu_system": sum,
+    "read_bytes": sum,
+    "write_bytes": sum,
+    "maxrss": max,
+    "timings": sum_timings,
+}
 
 
 class RunStatsInfo(BaseInfo):
+    """Statistics of a run. The resources used by the external program
+    are optional: `maxrss` is its peak resident memory (in bytes),
+    `cpu_user` and `cpu_system` are its CPU times (in seconds), and
+    `read_bytes` and `write_bytes` are the bytes it read from and wrote
+    to storage. `timings` is the wall time (in seconds) of each phase
+    of the recipe, such as "copy_in" or "run_job"."""
+
     host: str
     cluster: str
     duration: Union[float, str]
     ncores: int
     ngpus: int
-    pkgversion: str = None
+    pkgversion: Optional[str] = None
+    maxrss: Optional[int] = None
+    cpu_user: Optional[float] = None
+    cpu_system: Optional[float] = None
+    read_bytes: Optional[int] = None
+    write_bytes: Optional[int] = None
+    timings: Optional[Dict[str, float]] = None
 
     @staticmethod
     def file_name():
         return "runstats.json"
 
+    @property
+    def cpu_efficiency(self) -> Optional[float]:
+        """Fraction of the allocated cores used by the external program"""
+        if self.cpu_user is None or not self.duration or not self.ncores:
+            return None
+
+        cpu_time = self.cpu_user + (self.cpu_system or 0)
+        return cpu_time / (float(self.duration) * self.ncores)
+
+    @staticmethod
+    def aggregate(runstats: Iterable[dict]) -> dict:
+        """Combines the resources of several runs (given as dictionaries):
+        durations, CPU times, I/O and the timings of each phase are summed,
+        and the peak memory is the largest one. Resources missing in all
+        runs are left out."""
+        runstats = list(runstats)
+        combined = {}
+        for field, fn in RUNSTATS_AGGREGATES.items():
+            values = [s[field] for s in runstats if s.get(field) is not None]
+            if not values:
+                continue
+
+            value = fn(values)
+            combined[field] = round(value, 6) if isinstance(value, float) else value
+
+        return combined
+
     def __add__(self, other):
         args = other.as_dict()
-        args["duration"] = self.duration + other.duration
+        args.update(self.aggregate([self.as_dict(), other.as_dict()]))
         return self.__class__(**args)
 
 
@@ -94,7 +190,10 @@ class JobResults(BaseInfo):
 
     Parameters:
         runstats: dictionary containing the description of RunStats, such as
-            host name, wall time, number of cores/GPUs etc.
+            host name, wall time, number of cores/GPUs etc. It is a plain
+            dictionary rather than a `RunStatsInfo`, as the run stats given
+            by the parsers and chains usually contain only some of the
+            fields (e.g. `BaseParser.get_runstats`).
         nodes: list of ChemNodes containing all the information necessary to
             create each ChemNode. This special representation includes a key
             in each ChemNode dictionary called `calcnodes`, which should be a
@@ -103,7 +202,7 @@ class JobResults(BaseInfo):
     """
 
     job: dict
-    runstats: RunStatsInfo = {}
+    runstats: dict = {}
     nodes: List[NodeResults] = []
     workdir: Optional[str] = None
 
@@ -129,5 +228,210 @@ class JobResults(BaseInfo):
         raise ValueError("No identifier for the job")
 
     @staticmethod
-    def file_name():
-        return "jobresults.json"
+    def file_name(fmt: str = "json", compression: str = None):
+        ext = get_extension(fmt) + get_compression_extension(compression)
+        return "jobresults" + ext
+
+    def save_arrays(
+        self,
+        folder: os.PathLike,
+        threshold: int = None,
+        fmt: str = "npy",
+        prefix: str = "jobresults.arrays",
+    ) -> "JobResults":
+        """Saves the large arrays of the calcnodes to binary files in
+        `folder` and returns a copy of the results in which the arrays are
+        replaced by references. The results themselves are not modified,
+        and the copy should be saved in `folder`. See `models.blobs`."""
+        from .blobs import ArrayWriter, BLOB_THRESHOLD
+
+        threshold = BLOB_THRESHOLD if threshold is None else threshold
+        with ArrayWriter(folder, prefix, threshold=threshold, fmt=fmt) as writer:
+            nodes = [
+                NodeResults(
+                    chemnode=node.chemnode,
+                    calcnodes=writer.externalize(node.calcnodes),
+                )
+                for node in self.nodes
+            ]
+
+        return self.__class__(
+            job=self.job, runstats=self.runstats, nodes=nodes, workdir=self.workdir
+        )
+
+    def load_arrays(self, folder: os.PathLike, mmap: bool = True):
+        """Replaces the references created by `save_arrays` by the arrays
+        saved in `folder`. Arrays in .npy files are memory-mapped."""
+        from .blobs import load_arrays
+
+        for node in self.nodes:
+            node.calcnodes = load_arrays(node.calcnodes, folder, mmap=mmap)
+
+    @classmethod
+    def from_file(cls, path: os.PathLike, load_arrays: bool = True) -> "JobResults":
+        """Loads the results from a file, which may have been written
+        either with `to_file` or with a `JobResultsWriter`. Arrays saved
+        next to the file with `save_arrays` are loaded as well, unless
+        `load_arrays` is False (see `JobResultsReader`)."""
+        return JobResultsReader(path, load_arrays=load_arrays).load()
+
+
+class JobResultsWriter:
+    """Writes a JobResults file incrementally, so that the nodes do not
+    have to be kept in memory. The header (the job, the run stats and the
+    workdir) is written when the file is opened, and each node is written
+    as soon as it is given to the writer.
+
+    With a .jsonl file, the header and each node are written in separate
+    lines. With a .msgpack file, the file contains a signature followed by
+    the length-prefixed header and nodes. In both cases, the file can be
+    read lazily with `JobResultsReader` or loaded with `JobResults.from_file`.
+
+    Recipes whose parser implements `BaseParser.iter_nodes` stream their
+    results with this writer (see `BaseRecipe.postprocess`).
+
+    Example:
+        with JobResultsWriter("jobresults.jsonl", job=job) as writer:
+            for node in parser.iter_nodes():
+                writer.write(node)
+    """
+
+    def __init__(
+        self,
+        path: os.PathLike,
+        job: dict,
+        runstats: dict = None,
+        workdir: str = None,
+        level: int = None,
+    ):
+        self.path = str(path)
+        self.level = level
+        self.fmt = get_format(path)
+        if self.fmt not in STREAM_FORMATS:
+            raise ValueError(f"Results can only be streamed to {STREAM_FORMATS}")
+
+        self.header = JobResults(job=job, workdir=workdir)
+        if runstats is not None:
+            self.header.runstats = runstats
+
+        self.num_nodes = 0
+        self._file = None
+
+    def open(self):
+        self._file = open_file(self.path, "wb", level=self.level)
+        if self.fmt == "msgpack":
+            self._file.write(STREAM_MAGIC)
+
+        self._write(self.header)
+        return self
+
+    def _write(self, obj):
+        data = get_encoder(self.fmt).encode(obj)
+        if self.fmt == "jsonl":
+            self._file.write(data + b"\n")
+        else:
+            self._file.write(LENGTH.pack(len(data)) + data)
+
+    def write(self, node: NodeResults):
+        self._write(node)
+        self.num_nodes += 1
+
+    def write_many(self, nodes: Iterable[NodeResults]):
+        for node in nodes:
+            self.write(node)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class JobResultsReader:
+    """Reads a JobResults file lazily. `header` contains the results
+    without the nodes, which are decoded one at a time when iterating
+    over the reader. Files that were not written by a `JobResultsWriter`
+    are decoded at once, and their nodes are then iterated over.
+
+    If `load_arrays` is True, the references to arrays saved in binary
+    files (see `JobResults.save_arrays`) are replaced by the arrays, read
+    from the folder of the file. Arrays in .npy files are memory-mapped,
+    so their data is only read when accessed."""
+
+    def __init__(self, path: os.PathLike, load_arrays: bool = True):
+        self.path = str(path)
+        self.fmt = get_format(path)
+        self.load_arrays = load_arrays
+
+        with open_file(self.path, "rb") as f:
+            self.is_stream, self._results = self._read_header(f)
+
+        self.header = JobResults(
+            job=self._results.job,
+            runstats=self._results.runstats,
+            workdir=self._results.workdir,
+        )
+
+    def _read_header(self, f) -> Tuple[bool, JobResults]:
+        """Reads the header of a stream or, if the file is not a stream,
+        the complete results. Compressed files cannot always seek, so
+        the file is only read forward."""
+        decoder = get_decoder(JobResults, self.fmt)
+        if self.fmt == "jsonl":
+            return True, decoder.decode(f.readline())
+
+        prefix = f.read(len(STREAM_MAGIC)) if self.fmt == "msgpack" else b""
+        if prefix == STREAM_MAGIC:
+            return True, decoder.decode(self._read_frame(f))
+
+        return False, decoder.decode(prefix + f.read())
+
+    @staticmethod
+    def _read_frame(f) -> bytes:
+        prefix = f.read(LENGTH.size)
+        if not prefix:
+            return None
+
+        (length,) = LENGTH.unpack(prefix)
+        return f.read(length)
+
+    def __iter__(self) -> Iterator[NodeResults]:
+        if not self.load_arrays:
+            yield from self._iter_nodes()
+            return
+
+        from .blobs import load_arrays
+
+        folder = os.path.dirname(self.path)
+        for node in self._iter_nodes():
+            node.calcnodes = load_arrays(node.calcnodes, folder)
+            yield node
+
+    def _iter_nodes(self) -> Iterator[NodeResults]:
+        yield from self._results.nodes
+        if not self.is_stream:
+            return
+
+        decoder = get_decoder(NodeResults, self.fmt)
+        with open_file(self.path, "rb") as f:
+            self._read_header(f)
+
+            if self.fmt == "jsonl":
+                for line in f:
+                    if line.strip():
+                        yield decoder.decode(line)
+                return
+
+            while (frame := self._read_frame(f)) is not None:
+                yield decoder.decode(frame)
+
+    def load(self) -> JobResults:
+        """Loads the complete results, including all nodes"""
+        results = self.header.copy()
+        results.nodes = list(self)
+        return results
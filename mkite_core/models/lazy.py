@@ -0,0 +1,148 @@
+"""Jobs and results whose inputs and nodes are only decoded when they
+are accessed. Useful when reading many files to inspect only the job,
+the recipe or the workdir."""
+
+import os
+from typing import Any, Iterator, List, Optional, Sequence, Type
+
+import msgspec as msg
+
+from .base import BaseInfo, CalcInfo, NodeResults, get_decoder, get_format
+from .compression import open_file
+from .jobs import JobInfo, JobResults
+from .structs import CrystalInfo
+from .mols import MoleculeInfo, ConformerInfo
+
+
+# classes of the models, as given by `@class` in their dictionaries
+MODEL_CLASSES = {
+    "Crystal": CrystalInfo,
+    "Conformer": ConformerInfo,
+    "Molecule": MoleculeInfo,
+    "CalcNode": CalcInfo,
+}
+
+
+class ClassTag(msg.Struct):
+    name: Optional[str] = msg.field(name="@class", default=None)
+
+
+def get_model_class(name: str) -> Optional[Type[BaseInfo]]:
+    if name == "StoreReference":
+        from .store import StoreReference
+
+        return StoreReference
+
+    return MODEL_CLASSES.get(name)
+
+
+def decode_raw(raw: msg.Raw, fmt: str = "json", type_: Type = None) -> Any:
+    """Decodes `raw` into `type_` or, if `type_` is not given, into the
+    model given by its `@class` key. Objects without a known `@class`
+    are decoded as dictionaries."""
+    if type_ is None:
+        tag = get_decoder(ClassTag, fmt).decode(raw)
+        type_ = get_model_class(tag.name) or dict
+
+    return get_decoder(type_, fmt).decode(raw)
+
+
+class LazyList(Sequence):
+    """Read-only list of objects that are decoded each time they are
+    accessed. See `decode_raw`."""
+
+    def __init__(self, raws: List[msg.Raw], fmt: str = "json", type_: Type = None):
+        self.raws = raws
+        self.fmt = fmt
+        self.type_ = type_
+
+    def __len__(self) -> int:
+        return len(self.raws)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._decode(raw) for raw in self.raws[idx]]
+
+        return self._decode(self.raws[idx])
+
+    def __iter__(self) -> Iterator[Any]:
+        for raw in self.raws:
+            yield self._decode(raw)
+
+    def _decode(self, raw: msg.Raw) -> Any:
+        return decode_raw(raw, self.fmt, self.type_)
+
+
+class LazyInfo(BaseInfo, dict=True):
+    """Base class of the lazy models. Stores the format of the decoded
+    data, which is needed to decode the raw fields. Objects created
+    directly, instead of decoded, assume their raw fields are JSON."""
+
+    def __post_init__(self):
+        self.fmt = "json"
+
+    @classmethod
+    def decode(cls, data: bytes, fmt: str = "json"):
+        info = get_decoder(cls, fmt).decode(data)
+        info.fmt = fmt
+        return info
+
+    @classmethod
+    def from_file(cls, path: os.PathLike):
+        with open_file(path, "rb") as f:
+            data = f.read()
+
+        return cls.decode(data, fmt=get_format(path))
+
+
+class LazyJobInfo(LazyInfo):
+    """JobInfo whose inputs are kept encoded until they are accessed.
+
+    Example:
+        info = LazyJobInfo.from_file("jobinfo.json")
+        crystal = info.get_inputs()[0]
+    """
+
+    job: dict
+    recipe: dict
+    options: dict
+    inputs: List[msg.Raw] = []
+    workdir: Optional[str] = None
+
+    def get_inputs(self, type_: Type = None) -> LazyList:
+        """Returns the inputs, which are decoded into `type_` or, by
+        default, into the model given by their `@class` when accessed"""
+        return LazyList(self.inputs, self.fmt, type_)
+
+    def load(self) -> JobInfo:
+        """Decodes all inputs and returns the complete JobInfo"""
+        return JobInfo(
+            job=self.job,
+            recipe=self.recipe,
+            options=self.options,
+            inputs=list(self.get_inputs(dict)),
+            workdir=self.workdir,
+        )
+
+
+class LazyJobResults(LazyInfo):
+    """JobResults whose nodes are kept encoded until they are accessed.
+    Results written with a `JobResultsWriter` should be read with a
+    `JobResultsReader` instead."""
+
+    job: dict
+    runstats: dict = {}
+    nodes: List[msg.Raw] = []
+    workdir: Optional[str] = None
+
+    def get_nodes(self) -> LazyList:
+        return LazyList(self.nodes, self.fmt, NodeResults)
+
+    def load(self) -> JobResults:
+        """Decodes all nodes and returns the complete JobResults"""
+        return JobResults(
+            job=self.job,
+            runstats=self.runstats,
+            nodes=list(self.get_nodes()),
+            workdir=self.workdir,
+        )
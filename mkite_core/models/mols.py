@@ -1,8 +1,12 @@
-from typing import List, Tuple
+import copy
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 import msgspec as msg
+import numpy as np
 
 from .base import BaseInfo
+from .arrays import as_builtins, as_float_array, as_siteprops, str_enc_hook
+from .arrays import as_writeable_array, values_equal
 
 
 class MoleculeInfo(BaseInfo):
@@ -45,12 +49,57 @@ class MoleculeInfo(BaseInfo):
         return minf.molecule_info
 
     @classmethod
-    def from_smiles(cls, smiles: str) -> "MoleculeInfo":
-        from mkite_core.external.rdkit import RdkitInterface
+    def from_smiles(cls, smiles: str, cache: "SmilesCache" = None) -> "MoleculeInfo":
+        """Creates a molecule from a SMILES string. If a `SmilesCache` is
+        given, the canonical SMILES and InChIKey are taken from the cache
+        whenever possible."""
+        from mkite_core.external.rdkit import RdkitInterface, canonicalize
 
-        minf = RdkitInterface.from_smiles(smiles)
+        if cache is None:
+            minf = RdkitInterface.from_smiles(smiles)
+            return minf.molecule_info
 
-        return minf.molecule_info
+        found, result = cache.get(smiles)
+        if not found:
+            result = canonicalize(smiles)
+            cache.put(smiles, result)
+
+        if result is None:
+            raise ValueError(f"Invalid SMILES: {smiles}")
+
+        canonical, inchikey = result
+        return cls(inchikey=inchikey, smiles=canonical)
+
+    @classmethod
+    def from_smiles_many(
+        cls,
+        smiles: Iterable[str],
+        n_workers: int = None,
+        chunksize: int = 1000,
+        stereochemistry: bool = True,
+        cache: "SmilesCache" = None,
+    ) -> Iterator[Optional["MoleculeInfo"]]:
+        """Creates molecules from many SMILES strings, canonicalizing them
+        in a pool of `n_workers` processes. The input is consumed lazily
+        and the results are yielded in the same order as `smiles`. Invalid
+        SMILES yield None instead of raising an error. If a `SmilesCache`
+        is given, SMILES found in the cache are not canonicalized again."""
+        from mkite_core.external.rdkit import canonicalize_many
+
+        results = canonicalize_many(
+            smiles,
+            stereochemistry=stereochemistry,
+            n_workers=n_workers,
+            chunksize=chunksize,
+            cache=cache,
+        )
+        for result in results:
+            if result is None:
+                yield None
+                continue
+
+            canonical, inchikey = result
+            yield cls(inchikey=inchikey, smiles=canonical)
 
     def as_rdkit(self) -> "rdkit.Chem.Mol":
         from mkite_core.external.rdkit import RdkitInterface
@@ -72,12 +121,21 @@ class MoleculeInfo(BaseInfo):
 
 
 class ConformerInfo(BaseInfo):
+    """Describes the 3D structure of a molecule. Cartesian coordinates
+    are stored as a float64 array with shape (N, 3), and numeric site
+    properties are stored as arrays.
+    """
+
     species: List[str]
-    coords: List[Tuple[float, float, float]]
+    coords: np.ndarray
     mol: MoleculeInfo = None
     siteprops: dict = {}
     attributes: dict = {}
 
+    def __post_init__(self):
+        self.coords = as_float_array(self.coords, shape=(-1, 3))
+        self.siteprops = as_siteprops(self.siteprops)
+
     @property
     def extra_dict_fields(self):
         return {
@@ -131,7 +189,7 @@ class ConformerInfo(BaseInfo):
     ) -> "ConformerInfo":
         return cls(
             species=[str(sp) for sp in molecule.species],
-            coords=list(molecule.cart_coords),
+            coords=molecule.cart_coords,
             siteprops=molecule.site_properties,
             **kwargs,
         )
@@ -140,8 +198,8 @@ class ConformerInfo(BaseInfo):
     def from_ase(cls, atoms: "ase.Atoms", **kwargs) -> "ConformerInfo":
         return cls(
             species=list(atoms.get_chemical_symbols()),
-            coords=atoms.positions.tolist(),
-            attributes=atoms.info,
+            coords=atoms.arrays["positions"],
+            attributes=as_builtins(atoms.info, str_enc_hook),
             **kwargs,
         )
 
@@ -157,21 +215,124 @@ class ConformerInfo(BaseInfo):
     def as_ase(self) -> "ase.Atoms":
         from ase import Atoms
 
-        return Atoms(
-            symbols=self.species,
-            positions=self.coords,
-        )
+        atoms = Atoms(symbols=self.species)
+        # Atoms copies the positions given to the constructor
+        atoms.arrays["positions"] = as_writeable_array(self.coords)
+        return atoms
 
     def __eq__(self, other: "ConformerInfo") -> bool:
-        import numpy as np
-
         if not isinstance(other, self.__class__):
             return False
 
         species_eq = self.species == other.species
-        coords_eq = np.allclose(self.coords, other.coords)
-        props_eq = self.siteprops == other.siteprops
+        coords_eq = values_equal(self.coords, other.coords)
+        props_eq = values_equal(self.siteprops, other.siteprops)
         attrs_eq = self.attributes == other.attributes
 
         return all([species_eq, coords_eq, props_eq, attrs_eq])
-        return all([species_eq, coords_eq, props_eq, attrs_eq])
+
+
+class ConformerEnsembleInfo(BaseInfo):
+    """Set of conformers of the same molecule. The species, molecule
+    and site properties are stored only once, and the coordinates of
+    all conformers are stored in a single float64 array with shape
+    (n_conformers, n_atoms, 3).
+
+    Parameters:
+        species: species of the atoms, shared by all conformers.
+        coords: coordinates of the conformers.
+        mol: molecule the conformers belong to.
+        siteprops: site properties shared by all conformers.
+        attributes: attributes shared by all conformers.
+        conformer_attributes: attributes of each conformer (e.g. energies).
+            If given, should have one dictionary per conformer.
+    """
+
+    species: List[str]
+    coords: np.ndarray
+    mol: MoleculeInfo = None
+    siteprops: dict = {}
+    attributes: dict = {}
+    conformer_attributes: List[dict] = []
+
+    def __post_init__(self):
+        self.coords = as_float_array(self.coords, shape=(-1, len(self.species), 3))
+        self.siteprops = as_siteprops(self.siteprops)
+
+        if self.conformer_attributes and len(self.conformer_attributes) != len(self):
+            raise ValueError("conformer_attributes should have one entry per conformer")
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+    def __getitem__(self, idx: int) -> ConformerInfo:
+        """Returns the conformer `idx`. Its coordinates are a view of
+        the coordinates of the ensemble, and its other fields are copies
+        that can be modified independently of the ensemble"""
+        attributes = self.attributes
+        if self.conformer_attributes:
+            attributes = {**attributes, **self.conformer_attributes[idx]}
+
+        return ConformerInfo(
+            species=list(self.species),
+            coords=self.coords[idx],
+            mol=None if self.mol is None else self.mol.copy(deepcopy=True),
+            siteprops=copy.deepcopy(self.siteprops),
+            attributes=copy.deepcopy(attributes),
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_conformers(self) -> List[ConformerInfo]:
+        return list(self)
+
+    @classmethod
+    def from_conformers(
+        cls, conformers: List[ConformerInfo]
+    ) -> "ConformerEnsembleInfo":
+        """Creates an ensemble from conformers of the same molecule. The
+        molecule and site properties of the first conformer are used for
+        the whole ensemble, and the attributes of each conformer are kept
+        in `conformer_attributes`."""
+        if len(conformers) == 0:
+            raise ValueError("Cannot create an ensemble without conformers")
+
+        first = conformers[0]
+        for conf in conformers[1:]:
+            if conf.species != first.species:
+                raise ValueError("All conformers should have the same species")
+
+        attributes = [conf.attributes for conf in conformers]
+        if not any(attributes):
+            attributes = []
+
+        return cls(
+            species=first.species,
+            coords=np.stack([conf.coords for conf in conformers]),
+            mol=first.mol,
+            siteprops=first.siteprops,
+            conformer_attributes=attributes,
+        )
+
+    @classmethod
+    def from_rdkit(cls, mol: "rdkit.Chem.Mol", **kwargs) -> "ConformerEnsembleInfo":
+        from mkite_core.external.rdkit import RdkitInterface
+
+        minf = RdkitInterface(mol, **kwargs)
+
+        return minf.conformer_ensemble
+
+    def __eq__(self, other: "ConformerEnsembleInfo") -> bool:
+        if not isinstance(other, self.__class__):
+            return False
+
+        species_eq = self.species == other.species
+        coords_eq = values_equal(self.coords, other.coords)
+        mol_eq = self.mol == other.mol
+        props_eq = values_equal(self.siteprops, other.siteprops)
+        attrs_eq = self.attributes == other.attributes
+        conf_attrs_eq = self.conformer_attributes == other.conformer_attributes
+
+        return all([species_eq, coords_eq, mol_eq, props_eq, attrs_eq, conf_attrs_eq])
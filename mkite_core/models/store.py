@@ -0,0 +1,387 @@
+import os
+import json
+import functools
+from typing import Iterable, Iterator, List, Union
+
+import msgspec as msg
+import numpy as np
+
+from .base import BaseInfo, get_encoder
+from .batch import CrystalBatch, get_numbers, get_symbols
+from .structs import CrystalInfo
+from .mols import ConformerInfo, MoleculeInfo
+
+
+STORE_VERSION = 1
+META_FILE = "store.json"
+NUMBERS_FILE = "numbers.bin"
+COORDS_FILE = "coords.bin"
+LATTICES_FILE = "lattices.bin"
+OFFSETS_FILE = "offsets.bin"
+EXTRAS_FILE = "extras.bin"
+EXTRA_OFFSETS_FILE = "extra_offsets.bin"
+
+# fields stored in the extras file when they are not empty
+EXTRA_FIELDS = ["siteprops", "attributes", "mol"]
+
+KINDS = {
+    "crystal": CrystalInfo,
+    "conformer": ConformerInfo,
+}
+
+
+def _memmap(path: os.PathLike, dtype, shape: tuple) -> np.ndarray:
+    """Memory-maps the complete records of `path`. Trailing bytes that
+    do not form a complete record (e.g. from an interrupted append)
+    are ignored. Empty files cannot be memory-mapped, so an empty
+    array is returned instead."""
+    if not os.path.exists(path):
+        return np.zeros((0, *shape), dtype=dtype)
+
+    itemsize = np.dtype(dtype).itemsize * int(np.prod(shape))
+    num = os.path.getsize(path) // itemsize
+
+    if num == 0:
+        return np.zeros((0, *shape), dtype=dtype)
+
+    return np.memmap(path, dtype=dtype, mode="r", shape=(num, *shape))
+
+
+def _read_meta(path: os.PathLike) -> dict:
+    with open(os.path.join(path, META_FILE), "r") as f:
+        meta = json.load(f)
+
+    if meta.get("version") != STORE_VERSION:
+        raise ValueError(f"Unsupported version of the structure store at {path}")
+
+    return meta
+
+
+class StructureStore:
+    """Read-only, memory-mapped dataset of crystals or conformers. The
+    store is a folder containing a few binary files with fixed layouts:
+
+        numbers.bin: uint8 atomic numbers of all sites
+        coords.bin: float64 cartesian coordinates of all sites, (N_total, 3)
+        lattices.bin: float64 lattice vectors, (n, 3, 3). Only for crystals.
+        offsets.bin: int64 offsets, (n + 1,). The sites of the structure `i`
+            are `offsets[i]:offsets[i + 1]`.
+        extras.bin: MessagePack dictionaries with the other fields of the
+            structures (site properties, attributes, molecule and, if they
+            are not elements, species). Empty for structures without them.
+        extra_offsets.bin: int64 offsets, (n + 1,). The extras of the
+            structure `i` are the bytes `extra_offsets[i]:extra_offsets[i + 1]`.
+
+    Opening the store only maps the files into memory, so fetching the
+    structure `i` does not require reading the rest of the dataset.
+    Stores are created with `StructureStoreWriter`.
+    """
+
+    def __init__(self, path: os.PathLike):
+        self.path = str(path)
+        meta = _read_meta(path)
+        self.kind = meta["kind"]
+
+        self.offsets = _memmap(self._file(OFFSETS_FILE), np.int64, ())
+        self.numbers = _memmap(self._file(NUMBERS_FILE), np.uint8, ())
+        self.coords = _memmap(self._file(COORDS_FILE), np.float64, (3,))
+
+        if self.kind == "crystal":
+            self.lattices = _memmap(self._file(LATTICES_FILE), np.float64, (3, 3))
+        else:
+            self.lattices = None
+
+        # stores written before the extras were added do not have them
+        self.extras = _memmap(self._file(EXTRAS_FILE), np.uint8, ())
+        self.extra_offsets = _memmap(self._file(EXTRA_OFFSETS_FILE), np.int64, ())
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    @property
+    def info_cls(self):
+        return KINDS[self.kind]
+
+    def __len__(self) -> int:
+        return max(len(self.offsets) - 1, 0)
+
+    def __iter__(self) -> Iterator[BaseInfo]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, idx: Union[int, slice]):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+
+        n = len(self)
+        if idx < 0:
+            idx += n
+
+        if not 0 <= idx < n:
+            raise IndexError(f"Index {idx} out of range for store of size {n}")
+
+        start, end = self.offsets[idx], self.offsets[idx + 1]
+        kwargs = {
+            "species": get_symbols(self.numbers[start:end]),
+            "coords": self.coords[start:end],
+        }
+
+        if self.lattices is not None:
+            kwargs["lattice"] = self.lattices[idx]
+
+        kwargs.update(self.get_extras(idx))
+        return self.info_cls(**kwargs)
+
+    def get_extras(self, idx: int) -> dict:
+        if idx + 1 >= len(self.extra_offsets):
+            return {}
+
+        start, end = self.extra_offsets[idx], self.extra_offsets[idx + 1]
+        if start == end:
+            return {}
+
+        extras = msg.msgpack.decode(self.extras[start:end])
+        if "mol" in extras:
+            extras["mol"] = msg.convert(extras["mol"], MoleculeInfo)
+
+        return extras
+
+    def get_batch(self, start: int = 0, stop: int = None) -> CrystalBatch:
+        """Returns the crystals `start:stop` as a `CrystalBatch` whose
+        arrays are views of the memory-mapped files"""
+        if self.kind != "crystal":
+            raise TypeError("Only stores of crystals can be converted to batches")
+
+        stop = len(self) if stop is None else min(stop, len(self))
+        first, last = self.offsets[start], self.offsets[stop]
+        return CrystalBatch(
+            numbers=self.numbers[first:last],
+            coords=self.coords[first:last],
+            lattices=self.lattices[start:stop],
+            offsets=self.offsets[start : stop + 1] - first,
+        )
+
+    def reference(self, start: int = 0, stop: int = None) -> dict:
+        """Creates a dictionary that refers to the structures `start:stop`
+        of this store and can be used as one of the `inputs` of a JobInfo"""
+        stop = len(self) if stop is None else stop
+        ref = StoreReference(path=os.path.abspath(self.path), start=start, stop=stop)
+        return ref.as_dict()
+
+
+def open_store(path: os.PathLike) -> StructureStore:
+    """Opens the store at `path`, reusing stores opened before by the
+    same process. The store is opened again if its offsets changed since
+    then (e.g. when structures were appended by a `StructureStoreWriter`)."""
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(os.path.join(path, OFFSETS_FILE))
+        version = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        version = None
+
+    return _open_store(path, version)
+
+
+@functools.lru_cache(maxsize=32)
+def _open_store(path: str, version: tuple) -> StructureStore:
+    return StructureStore(path)
+
+
+class StructureStoreWriter:
+    """Append-only writer of a `StructureStore`. If the store at `path`
+    already exists, new structures are appended to it.
+
+    The data of the structures is always written before the offsets,
+    so readers only see structures that have been completely written.
+
+    Example:
+        with StructureStoreWriter("candidates", kind="crystal") as writer:
+            for info in infos:
+                writer.append(info)
+    """
+
+    def __init__(
+        self, path: os.PathLike, kind: str = "crystal", flush_every: int = 4096
+    ):
+        if kind not in KINDS:
+            raise ValueError(f"Unrecognized kind {kind}. Options are {list(KINDS)}")
+
+        self.path = str(path)
+        self.kind = kind
+        self.flush_every = flush_every
+        self._pending = []
+        self._pending_extras = []
+        self._open()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _open(self):
+        if os.path.exists(self._file(META_FILE)):
+            store = StructureStore(self.path)
+            if store.kind != self.kind:
+                raise ValueError(f"Store at {self.path} contains {store.kind}s")
+
+            # discards data that was not committed to the offsets
+            num_offsets = len(store.offsets)
+            self._total = int(store.offsets[-1]) if num_offsets > 0 else 0
+            num = len(store)
+            extra_offsets = np.array(store.extra_offsets[:num_offsets])
+            del store
+
+            self._truncate(OFFSETS_FILE, num_offsets * 8)
+            self._truncate(NUMBERS_FILE, self._total * 1)
+            self._truncate(COORDS_FILE, self._total * 3 * 8)
+            if self.kind == "crystal":
+                self._truncate(LATTICES_FILE, num * 9 * 8)
+
+            # stores without extras get empty extras for their structures
+            self._extras_size = int(extra_offsets[-1]) if len(extra_offsets) else 0
+            missing = num_offsets - len(extra_offsets)
+            self._truncate(EXTRA_OFFSETS_FILE, len(extra_offsets) * 8)
+            self._truncate(EXTRAS_FILE, self._extras_size)
+            self._pending_extras.extend([self._extras_size] * missing)
+
+            if num_offsets == 0:
+                self._pending.append(0)
+                self._pending_extras.append(0)
+
+        else:
+            os.makedirs(self.path, exist_ok=True)
+            with open(self._file(META_FILE), "w") as f:
+                json.dump({"kind": self.kind, "version": STORE_VERSION}, f)
+
+            self._total = 0
+            self._extras_size = 0
+            self._pending.append(0)
+            self._pending_extras.append(0)
+
+        self._numbers = open(self._file(NUMBERS_FILE), "ab")
+        self._coords = open(self._file(COORDS_FILE), "ab")
+        self._offsets = open(self._file(OFFSETS_FILE), "ab")
+        self._extras = open(self._file(EXTRAS_FILE), "ab")
+        self._extra_offsets = open(self._file(EXTRA_OFFSETS_FILE), "ab")
+
+        if self.kind == "crystal":
+            self._lattices = open(self._file(LATTICES_FILE), "ab")
+        else:
+            self._lattices = None
+
+    def _truncate(self, name: str, size: int):
+        with open(self._file(name), "ab") as f:
+            f.truncate(size)
+
+    def append(self, info: BaseInfo):
+        if not isinstance(info, KINDS[self.kind]):
+            raise TypeError(f"Expected {KINDS[self.kind].__name__}, got {type(info)}")
+
+        numbers = get_numbers(info.species)
+        coords = np.ascontiguousarray(info.coords, dtype=np.float64)
+        self._numbers.write(numbers.tobytes())
+        self._coords.write(coords.tobytes())
+
+        if self._lattices is not None:
+            lattice = np.ascontiguousarray(info.lattice, dtype=np.float64)
+            self._lattices.write(lattice.tobytes())
+
+        extras = self.get_extras(info, numbers)
+        if extras:
+            data = get_encoder("msgpack").encode(extras)
+            self._extras.write(data)
+            self._extras_size += len(data)
+
+        self._total += len(info.species)
+        self._pending.append(self._total)
+        self._pending_extras.append(self._extras_size)
+
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    @staticmethod
+    def get_extras(info: BaseInfo, numbers: np.ndarray) -> dict:
+        """Returns the fields of `info` that are not stored in the arrays"""
+        extras = {}
+        for field in EXTRA_FIELDS:
+            value = getattr(info, field, None)
+            if value:
+                extras[field] = value
+
+        # species with oxidation states or isotopes are stored as elements
+        if get_symbols(numbers) != list(info.species):
+            extras["species"] = list(info.species)
+
+        return extras
+
+    def extend(self, infos: Iterable[BaseInfo]):
+        for info in infos:
+            self.append(info)
+
+    def flush(self):
+        """Writes the pending offsets after all the data they refer to"""
+        for f in [self._numbers, self._coords, self._lattices, self._extras]:
+            if f is not None:
+                f.flush()
+
+        if self._pending_extras:
+            offsets = np.array(self._pending_extras, dtype=np.int64)
+            self._extra_offsets.write(offsets.tobytes())
+            self._pending_extras = []
+
+        self._extra_offsets.flush()
+
+        if self._pending:
+            self._offsets.write(np.array(self._pending, dtype=np.int64).tobytes())
+            self._pending = []
+
+        self._offsets.flush()
+
+    def close(self):
+        self.flush()
+        files = [self._numbers, self._coords, self._lattices, self._offsets]
+        for f in [*files, self._extras, self._extra_offsets]:
+            if f is not None:
+                f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class StoreReference(BaseInfo):
+    """Refers to the structures `start:stop` of a `StructureStore`.
+    Allows a JobInfo to list thousands of inputs without embedding
+    them in the job file."""
+
+    path: str
+    start: int
+    stop: int
+
+    @property
+    def extra_dict_fields(self):
+        return {
+            "@module": "mkite_core.models.store",
+            "@class": "StoreReference",
+        }
+
+    @staticmethod
+    def is_reference(data: dict) -> bool:
+        return data.get("@class") == "StoreReference"
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StoreReference":
+        return cls(path=data["path"], start=data["start"], stop=data["stop"])
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def load(self) -> List[BaseInfo]:
+        store = open_store(self.path)
+        return store[self.start : self.stop]
+
+    def iter_infos(self) -> Iterator[BaseInfo]:
+        store = open_store(self.path)
+        for i in range(self.start, self.stop):
+            yield store[i]
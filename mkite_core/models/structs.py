@@ -1,8 +1,43 @@
 import os
+import hashlib
 import msgspec as msg
-from typing import List, Tuple
+import numpy as np
+from collections import OrderedDict
+from typing import Iterable, List, Tuple
 
 from .base import BaseInfo
+from .arrays import as_builtins, as_float_array, as_siteprops
+from .arrays import as_writeable_array, enc_hook, str_enc_hook, values_equal
+
+
+SPACEGROUP_CACHE_SIZE = 2**16
+# defaults of pymatgen's `get_space_group_info`
+SPACEGROUP_DEFAULTS = {"symprec": 0.01, "angle_tolerance": 5.0}
+_spacegroup_cache: "OrderedDict[tuple, Tuple[str, int]]" = OrderedDict()
+
+
+def _get_space_group_info(info: "CrystalInfo", kwargs: dict) -> Tuple[str, int]:
+    struct = info.as_pymatgen()
+    return struct.get_space_group_info(**kwargs)
+
+
+def _get_space_group_info_args(args: tuple) -> Tuple[str, int]:
+    return _get_space_group_info(*args)
+
+
+def _cache_get(key: tuple):
+    value = _spacegroup_cache.get(key)
+    if value is not None:
+        _spacegroup_cache.move_to_end(key)
+
+    return value
+
+
+def _cache_set(key: tuple, value: Tuple[str, int]):
+    _spacegroup_cache[key] = value
+    _spacegroup_cache.move_to_end(key)
+    while len(_spacegroup_cache) > SPACEGROUP_CACHE_SIZE:
+        _spacegroup_cache.popitem(last=False)
 
 
 class SpaceGroupInfo(BaseInfo):
@@ -18,24 +53,102 @@ class SpaceGroupInfo(BaseInfo):
         info = CrystalInfo.from_crystal(crystal)
         return cls.from_info(info, **kwargs)
 
+    @staticmethod
+    def cache_key(crystal_info: "CrystalInfo", **kwargs) -> tuple:
+        kwargs = {**SPACEGROUP_DEFAULTS, **kwargs}
+        return (crystal_info.digest(), tuple(sorted(kwargs.items())))
+
+    @staticmethod
+    def clear_cache():
+        _spacegroup_cache.clear()
+
     @classmethod
     def from_info(cls, crystal_info: "CrystalInfo", **kwargs):
-        struct = crystal_info.as_pymatgen()
-        symbol, number = struct.get_space_group_info(**kwargs)
+        key = cls.cache_key(crystal_info, **kwargs)
+        result = _cache_get(key)
+
+        if result is None:
+            result = _get_space_group_info(crystal_info, kwargs)
+            _cache_set(key, result)
+
+        symbol, number = result
         return cls(number=number, symbol=symbol)
 
+    @classmethod
+    def from_infos(
+        cls,
+        infos: Iterable["CrystalInfo"],
+        symprec: float = 0.01,
+        angle_tolerance: float = 5.0,
+        n_workers: int = None,
+        chunksize: int = 16,
+    ) -> List["SpaceGroupInfo"]:
+        """Computes the space groups of several structures. Identical
+        structures (and structures analyzed before with the same
+        parameters) are analyzed only once. The remaining structures
+        are distributed across a pool of `n_workers` processes. If
+        `n_workers` is 1, everything runs in the current process.
+
+        Parameters:
+            infos: structures to analyze.
+            symprec: tolerance for symmetry finding, as in pymatgen.
+            angle_tolerance: angle tolerance for symmetry finding, as
+                in pymatgen.
+            n_workers: number of processes. Defaults to the number of CPUs.
+            chunksize: number of structures sent to a worker at once.
+        """
+        kwargs = {"symprec": symprec, "angle_tolerance": angle_tolerance}
+        infos = list(infos)
+        keys = [cls.cache_key(info, **kwargs) for info in infos]
+
+        found = {}
+        missing = {}
+        for key, info in zip(keys, infos):
+            if key in found or key in missing:
+                continue
+
+            result = _cache_get(key)
+            if result is None:
+                missing[key] = info
+            else:
+                found[key] = result
+
+        args = [(info, kwargs) for info in missing.values()]
+        if n_workers == 1 or len(args) <= 1:
+            results = list(map(_get_space_group_info_args, args))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                results = list(
+                    pool.map(_get_space_group_info_args, args, chunksize=chunksize)
+                )
+
+        for key, result in zip(missing, results):
+            _cache_set(key, result)
+            found[key] = result
+
+        return [cls(number=found[key][1], symbol=found[key][0]) for key in keys]
+
 
 class CrystalInfo(BaseInfo):
+    """Describes a crystal structure. Cartesian coordinates and lattice
+    vectors are stored as float64 arrays with shapes (N, 3) and (3, 3),
+    and numeric site properties are stored as arrays. Whenever possible,
+    conversions to and from ASE share the underlying buffers.
+    """
+
     species: List[str]
-    coords: List[Tuple[float, float, float]]
-    lattice: Tuple[
-        Tuple[float, float, float],
-        Tuple[float, float, float],
-        Tuple[float, float, float],
-    ]
+    coords: np.ndarray
+    lattice: np.ndarray
     siteprops: dict = {}
     attributes: dict = {}
 
+    def __post_init__(self):
+        self.coords = as_float_array(self.coords, shape=(-1, 3))
+        self.lattice = as_float_array(self.lattice, shape=(3, 3))
+        self.siteprops = as_siteprops(self.siteprops)
+
     @property
     def extra_dict_fields(self):
         return {
@@ -77,54 +190,72 @@ class CrystalInfo(BaseInfo):
     def as_ase(self):
         from ase import Atoms
 
-        return Atoms(
-            cell=self.lattice,
-            symbols=self.species,
-            positions=self.coords,
-            pbc=True,
-        )
+        atoms = Atoms(symbols=self.species, cell=self.lattice, pbc=True)
+        # Atoms copies the positions given to the constructor
+        atoms.arrays["positions"] = as_writeable_array(self.coords)
+        return atoms
 
     @classmethod
     def from_pymatgen(cls, structure: "pymatgen.core.Structure", **kwargs):
-        from mkite_core.external.serialization import reserialize
-
         return cls(
-            lattice=structure.lattice.matrix.tolist(),
+            lattice=structure.lattice.matrix,
             species=[str(sp) for sp in structure.species],
-            coords=structure.cart_coords.tolist(),
-            siteprops=reserialize(structure.site_properties),
+            coords=structure.cart_coords,
+            siteprops=structure.site_properties,
             **kwargs,
         )
 
     @classmethod
     def from_ase(cls, atoms: "ase.Atoms", **kwargs):
         return cls(
-            lattice=atoms.cell.tolist(),
+            lattice=atoms.cell.array,
             species=list(atoms.get_chemical_symbols()),
-            coords=atoms.positions.tolist(),
-            attributes=atoms.info,
+            coords=atoms.arrays["positions"],
+            attributes=as_builtins(atoms.info, str_enc_hook),
             **kwargs,
         )
 
     def __eq__(self, other: "CrystalInfo"):
-        import numpy as np
-
         if not isinstance(other, self.__class__):
             return False
 
         species_eq = self.species == other.species
-        coords_eq = np.allclose(self.coords, other.coords)
-        lattice_eq = np.allclose(self.lattice, other.lattice)
-        props_eq = self.siteprops == other.siteprops
+        coords_eq = values_equal(self.coords, other.coords)
+        lattice_eq = values_equal(self.lattice, other.lattice)
+        props_eq = values_equal(self.siteprops, other.siteprops)
         attrs_eq = self.attributes == other.attributes
 
         return all([species_eq, coords_eq, lattice_eq, props_eq, attrs_eq])
 
+    def digest(self) -> str:
+        """Hash of the species, coordinates, lattice and site properties
+        (e.g. magnetic moments) of the structure. Only identical structures
+        have the same digest."""
+        h = hashlib.sha1()
+        h.update(" ".join(self.species).encode())
+        h.update(np.ascontiguousarray(self.coords).tobytes())
+        h.update(np.ascontiguousarray(self.lattice).tobytes())
+        for key in sorted(self.siteprops):
+            value = self.siteprops[key]
+            h.update(key.encode())
+            if isinstance(value, np.ndarray) and value.dtype != object:
+                h.update(value.dtype.str.encode())
+                h.update(np.ascontiguousarray(value).tobytes())
+            else:
+                h.update(msg.json.encode(value, enc_hook=enc_hook))
+
+        return h.hexdigest()
+
+    def fingerprint(self) -> "StructureFingerprint":
+        """Fingerprint invariant to the ordering of atoms and lattice
+        vectors. See `mkite_core.models.fingerprint`."""
+        from .fingerprint import StructureFingerprint
+
+        return StructureFingerprint.from_info(self)
+
     @property
     def frac_coords(self):
-        import numpy as np
-
-        return np.array(self.coords) @ np.linalg.inv(np.array(self.lattice))
+        return np.linalg.solve(self.lattice.T, self.coords.T).T
 
     @property
     def anonymize_species(self, start_int: int = 1):
@@ -0,0 +1,126 @@
+import json
+import unittest as ut
+import numpy as np
+from pkg_resources import resource_filename
+
+from mkite_core.models.base import get_decoder, get_encoder, get_format
+from mkite_core.models.base import get_nested_fields, is_json_lines
+from mkite_core.models.jobs import JobInfo, JobResults
+from mkite_core.models.mols import ConformerInfo
+from mkite_core.models.structs import CrystalInfo
+
+
+INFO_FILE = resource_filename("mkite_core.tests.files", "jobinfo.json")
+TEST_CRYSTAL = resource_filename("mkite_core.tests.files.models", "crystal.json")
+
+
+class TestCodecs(ut.TestCase):
+    def setUp(self):
+        self.info = JobInfo.from_json(INFO_FILE)
+        self.crystal = CrystalInfo.from_json(TEST_CRYSTAL)
+
+    def test_cached(self):
+        self.assertIs(get_decoder(JobInfo), get_decoder(JobInfo))
+        self.assertIsNot(get_decoder(JobInfo), get_decoder(CrystalInfo))
+        self.assertIs(get_encoder(), get_encoder())
+
+    def test_decode(self):
+        new = JobInfo.decode(self.info.encode())
+        self.assertEqual(self.info, new)
+
+    def test_unsupported(self):
+        for fmt in ["json", "msgpack"]:
+            with self.assertRaises(TypeError):
+                get_encoder(fmt).encode({"a": object()})
+
+        self.info.options["a"] = object()
+        with self.assertRaises(TypeError):
+            self.info.encode()
+
+        with self.assertRaises(TypeError):
+            self.info.as_dict()
+
+    def test_many_array(self):
+        items = [self.crystal, self.crystal.copy()]
+        data = CrystalInfo.encode_many(items)
+        self.assertTrue(data.startswith(b"["))
+
+        new = CrystalInfo.decode_many(data)
+        self.assertEqual(new, items)
+
+    def test_many_lines(self):
+        items = [self.info, self.info.copy(), self.info.copy()]
+        data = JobInfo.encode_many(iter(items), lines=True)
+        self.assertEqual(len(data.splitlines()), 3)
+
+        new = JobInfo.decode_many(data)
+        self.assertEqual(new, items)
+
+        new = JobInfo.decode_many(data, lines=True)
+        self.assertEqual(new, items)
+
+    def test_is_json_lines(self):
+        self.assertFalse(is_json_lines(b'  \n[{"a": 1}]'))
+        self.assertTrue(is_json_lines(b'{"a": 1}\n{"a": 2}\n'))
+        self.assertTrue(is_json_lines(b""))
+
+    def test_many_empty(self):
+        self.assertEqual(JobInfo.decode_many(b"[]"), [])
+        self.assertEqual(JobInfo.decode_many(b""), [])
+
+    def test_many_msgpack(self):
+        items = [self.crystal, self.crystal.copy()]
+        data = CrystalInfo.encode_many(items, fmt="msgpack")
+        new = CrystalInfo.decode_many(data, fmt="msgpack")
+        self.assertEqual(new, items)
+
+    def test_get_format(self):
+        self.assertEqual(get_format("jobinfo.json"), "json")
+        self.assertEqual(get_format("path/to/jobresults.jsonl"), "jsonl")
+        self.assertEqual(get_format("jobresults.msgpack"), "msgpack")
+
+        with self.assertRaises(ValueError):
+            get_format("jobinfo.yaml")
+
+
+class TestDicts(ut.TestCase):
+    def setUp(self):
+        self.info = JobInfo.from_json(INFO_FILE)
+        self.crystal = CrystalInfo.from_json(TEST_CRYSTAL)
+
+    def test_nested_fields(self):
+        self.assertEqual(get_nested_fields(JobInfo), ())
+        self.assertEqual(get_nested_fields(JobResults), ())
+        self.assertEqual(get_nested_fields(ConformerInfo), ("mol",))
+
+    def test_as_dict(self):
+        data = self.crystal.as_dict()
+        self.assertEqual(data["@class"], "Crystal")
+        self.assertIsInstance(data["coords"], list)
+        self.assertIsInstance(data["lattice"][0], list)
+        self.assertEqual(json.loads(json.dumps(data)), data)
+        self.assertEqual(CrystalInfo.from_dict(data), self.crystal)
+
+    def test_copy(self):
+        new = self.info.copy()
+        self.assertEqual(new, self.info)
+        self.assertIsNot(new, self.info)
+        self.assertIs(new.job, self.info.job)
+
+    def test_deepcopy(self):
+        new = self.info.copy(deepcopy=True)
+        self.assertEqual(new, self.info)
+        self.assertIsNot(new.job, self.info.job)
+
+        new.job["status"] = "E"
+        self.assertNotIn("status", self.info.job)
+
+        self.info.inputs[0]["forces"] = np.zeros((2, 3))
+        new = self.info.copy(deepcopy=True)
+        self.assertIsInstance(new.inputs[0]["forces"], np.ndarray)
+        forces = new.inputs[0]["forces"]
+        self.assertFalse(np.shares_memory(forces, self.info.inputs[0]["forces"]))
+
+        crystal = self.crystal.copy(deepcopy=True)
+        self.assertEqual(crystal, self.crystal)
+        self.assertFalse(np.shares_memory(crystal.coords, self.crystal.coords))
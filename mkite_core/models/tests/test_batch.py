@@ -0,0 +1,73 @@
+import os
+import unittest as ut
+from pkg_resources import resource_filename
+
+import numpy as np
+
+from mkite_core.tests.tempdirs import run_in_tempdir
+from mkite_core.models import CrystalBatch, CrystalInfo
+from mkite_core.models.batch import get_numbers
+
+
+TEST_CRYSTAL = resource_filename("mkite_core.tests.files.models", "crystal.json")
+
+
+class TestCrystalBatch(ut.TestCase):
+    def setUp(self):
+        self.crystal = CrystalInfo.from_json(TEST_CRYSTAL)
+        self.other = CrystalInfo(
+            species=["Na", "Cl", "Na"],
+            coords=[[0, 0, 0], [1.5, 1.5, 1.5], [0.5, 0, 0]],
+            lattice=[[3, 0, 0], [0, 3, 0], [0, 0, 3]],
+        )
+        self.infos = [self.crystal, self.other, self.crystal]
+        self.batch = CrystalBatch.from_infos(self.infos)
+
+    def test_arrays(self):
+        self.assertEqual(self.batch.numbers.dtype, np.uint8)
+        self.assertEqual(self.batch.coords.shape, (7, 3))
+        self.assertEqual(self.batch.lattices.shape, (3, 3, 3))
+        self.assertEqual(self.batch.offsets.tolist(), [0, 2, 5, 7])
+        self.assertEqual(self.batch.natoms.tolist(), [2, 3, 2])
+
+    def test_numbers(self):
+        numbers = get_numbers(["Fe2+", "O2-", "D", "Na"])
+        self.assertEqual(numbers.tolist(), [26, 8, 1, 11])
+
+        with self.assertRaisesRegex(ValueError, "Xx"):
+            get_numbers(["Na", "Xx"])
+
+    def test_getitem(self):
+        self.assertEqual(len(self.batch), 3)
+        self.assertEqual(self.batch[1], self.other)
+        self.assertEqual(self.batch[-1], self.crystal)
+        self.assertTrue(np.shares_memory(self.batch[1].coords, self.batch.coords))
+
+        with self.assertRaises(IndexError):
+            self.batch[3]
+
+    def test_slice(self):
+        sub = self.batch[1:]
+        self.assertIsInstance(sub, CrystalBatch)
+        self.assertEqual(sub.to_infos(), self.infos[1:])
+
+    def test_iter(self):
+        self.assertEqual(list(self.batch), self.infos)
+
+    def test_frac_coords(self):
+        expected = np.concatenate([info.frac_coords for info in self.infos])
+        self.assertTrue(np.allclose(self.batch.frac_coords, expected))
+
+    def test_volumes(self):
+        self.assertTrue(np.allclose(self.batch.volumes, [40.692834, 27.0, 40.692834]))
+
+    @run_in_tempdir
+    def test_save_load(self):
+        for path in ["batch.npz", "batch"]:
+            self.batch.save(path)
+            new = CrystalBatch.load(path)
+            self.assertEqual(new.to_infos(), self.infos)
+
+        self.assertTrue(os.path.isdir("batch"))
+        new = CrystalBatch.load("batch")
+        self.assertFalse(new.coords.flags.writeable)
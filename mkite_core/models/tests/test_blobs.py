@@ -0,0 +1,73 @@
+import os
+import unittest as ut
+
+import numpy as np
+
+from mkite_core.tests.tempdirs import run_in_tempdir
+from mkite_core.models import CalcInfo, JobResults, NodeResults
+from mkite_core.models.blobs import ArrayReference, ArrayWriter, load_arrays
+
+
+class TestBlobs(ut.TestCase):
+    def setUp(self):
+        self.forces = np.random.rand(100, 3)
+        self.data = {
+            "energy": -1.0,
+            "forces": self.forces,
+            "traj": [np.arange(200, dtype=np.int64), np.zeros(2)],
+            "species": np.array(["H"] * 1000),
+        }
+
+    @run_in_tempdir
+    def test_npy(self):
+        with ArrayWriter(".", "arrays", threshold=1000) as writer:
+            data = writer.externalize(self.data)
+
+        self.assertEqual(data["energy"], -1.0)
+        self.assertTrue(ArrayReference.is_reference(data["forces"]))
+        self.assertEqual(data["forces"]["shape"], [100, 3])
+        self.assertTrue(ArrayReference.is_reference(data["traj"][0]))
+        self.assertIsInstance(data["traj"][1], np.ndarray)
+        self.assertIsInstance(data["species"], np.ndarray)
+        self.assertTrue(os.path.exists("arrays.0.npy"))
+
+        loaded = load_arrays(data)
+        self.assertIsInstance(loaded["forces"], np.memmap)
+        self.assertTrue(np.array_equal(loaded["forces"], self.forces))
+        self.assertTrue(np.array_equal(loaded["traj"][0], np.arange(200)))
+
+    @run_in_tempdir
+    def test_npz(self):
+        with ArrayWriter(".", "arrays", threshold=1000, fmt="npz") as writer:
+            data = writer.externalize(self.data)
+
+        self.assertEqual(os.listdir("."), ["arrays.npz"])
+        self.assertEqual(data["traj"][0]["key"], "arr_1")
+
+        loaded = load_arrays(data)
+        self.assertTrue(np.array_equal(loaded["forces"], self.forces))
+
+    @run_in_tempdir
+    def test_job_results(self):
+        calc = {**CalcInfo().as_dict(), "data": {"forces": self.forces}}
+        node = NodeResults(chemnode={}, calcnodes=[calc])
+        results = JobResults(job={}, nodes=[node])
+
+        os.mkdir("calc")
+        saved = results.save_arrays("calc", threshold=1000)
+        saved.to_file("calc/jobresults.json")
+        self.assertLess(os.path.getsize("calc/jobresults.json"), 1000)
+        self.assertIs(results.nodes[0].calcnodes[0]["data"]["forces"], self.forces)
+
+        new = JobResults.from_file("calc/jobresults.json")
+        forces = new.nodes[0].calcnodes[0]["data"]["forces"]
+        self.assertIsInstance(forces, np.memmap)
+        self.assertTrue(np.array_equal(forces, self.forces))
+
+        new = JobResults.from_file("calc/jobresults.json", load_arrays=False)
+        ref = new.nodes[0].calcnodes[0]["data"]["forces"]
+        self.assertTrue(ArrayReference.is_reference(ref))
+
+        new.load_arrays("calc")
+        forces = new.nodes[0].calcnodes[0]["data"]["forces"]
+        self.assertTrue(np.array_equal(forces, self.forces))
@@ -0,0 +1,87 @@
+import importlib.util
+import unittest as ut
+from pkg_resources import resource_filename
+
+from mkite_core.tests.tempdirs import run_in_tempdir
+from mkite_core.models import JobInfo, JobResults, NodeResults
+from mkite_core.models import JobResultsReader, JobResultsWriter
+from mkite_core.models.base import get_format
+from mkite_core.models.compression import (
+    get_compression,
+    strip_compression,
+    open_file,
+)
+
+
+INFO_FILE = resource_filename("mkite_core.tests.files", "jobinfo.json")
+COMPRESSIONS = ["gzip", "xz"]
+HAS_ZSTD = importlib.util.find_spec("zstandard") is not None
+
+
+class TestCompression(ut.TestCase):
+    def setUp(self):
+        self.info = JobInfo.from_json(INFO_FILE)
+
+    def test_extensions(self):
+        self.assertEqual(get_compression("jobresults.json.zst"), "zstd")
+        self.assertIsNone(get_compression("jobresults.json"))
+        self.assertEqual(strip_compression("a/jobinfo.msgpack.GZ"), "a/jobinfo.msgpack")
+        self.assertEqual(get_format("jobinfo.msgpack.xz"), "msgpack")
+        self.assertEqual(JobResults.file_name("json", "zstd"), "jobresults.json.zst")
+
+    def check_open_file(self, ext: str):
+        data = b"test data" * 100
+        with open_file("test" + ext, "wb", level=1) as f:
+            f.write(data)
+
+        with open("test" + ext, "rb") as f:
+            self.assertLess(len(f.read()), len(data))
+
+        with open_file("test" + ext, "rb") as f:
+            self.assertEqual(f.read(), data)
+
+    def check_to_file(self, compression: str):
+        for fmt in ["json", "jsonl", "msgpack"]:
+            name = JobInfo.file_name(fmt, compression)
+            self.info.to_file(name)
+            self.assertEqual(JobInfo.from_file(name), self.info)
+
+    def check_stream(self, compression: str):
+        nodes = [NodeResults(chemnode={"idx": i}) for i in range(3)]
+        for fmt in ["jsonl", "msgpack"]:
+            name = JobResults.file_name(fmt, compression)
+            with JobResultsWriter(name, job={"id": 1}) as writer:
+                writer.write_many(nodes)
+
+            self.assertEqual(list(JobResultsReader(name)), nodes)
+
+        results = JobResults(job={"id": 1}, nodes=nodes)
+        results.to_file(JobResults.file_name("msgpack", compression))
+        reader = JobResultsReader(JobResults.file_name("msgpack", compression))
+        self.assertFalse(reader.is_stream)
+        self.assertEqual(list(reader), nodes)
+
+    @run_in_tempdir
+    def test_open_file(self):
+        for ext in [".gz", ".xz"]:
+            self.check_open_file(ext)
+
+    @run_in_tempdir
+    def test_to_file(self):
+        for compression in COMPRESSIONS:
+            self.check_to_file(compression)
+
+        self.info.to_json("jobinfo.json.gz", level=1)
+        self.assertEqual(JobInfo.from_json("jobinfo.json.gz"), self.info)
+
+    @run_in_tempdir
+    def test_stream(self):
+        for compression in COMPRESSIONS:
+            self.check_stream(compression)
+
+    @ut.skipUnless(HAS_ZSTD, "zstandard is not installed")
+    @run_in_tempdir
+    def test_zstd(self):
+        self.check_open_file(".zst")
+        self.check_to_file("zstd")
+        self.check_stream("zstd")
@@ -0,0 +1,133 @@
+import unittest as ut
+from unittest.mock import patch
+from pkg_resources import resource_filename
+
+import numpy as np
+
+from mkite_core.models import CrystalInfo, StructureIndex
+from mkite_core.models.fingerprint import get_distances
+
+
+TEST_CRYSTAL = resource_filename("mkite_core.tests.files.models", "crystal.json")
+
+
+def make_rocksalt(a: float = 5.64) -> CrystalInfo:
+    frac = np.array(
+        [
+            [0, 0, 0],
+            [0.5, 0.5, 0],
+            [0.5, 0, 0.5],
+            [0, 0.5, 0.5],
+            [0.5, 0, 0],
+            [0, 0.5, 0],
+            [0, 0, 0.5],
+            [0.5, 0.5, 0.5],
+        ]
+    )
+    lattice = np.diag([a, a, a])
+    return CrystalInfo(
+        species=["Na"] * 4 + ["Cl"] * 4,
+        coords=frac @ lattice,
+        lattice=lattice,
+    )
+
+
+def permute(info: CrystalInfo, seed: int = 0) -> CrystalInfo:
+    """Shuffles the atoms, permutes the lattice vectors and shifts the origin"""
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(info.species))
+    perm = [2, 0, 1]
+
+    frac = info.frac_coords[order][:, perm] + 0.13
+    lattice = info.lattice[perm]
+    return CrystalInfo(
+        species=[info.species[i] for i in order],
+        coords=(frac % 1.0) @ lattice,
+        lattice=lattice,
+    )
+
+
+class TestFingerprint(ut.TestCase):
+    def setUp(self):
+        self.crystal = CrystalInfo.from_json(TEST_CRYSTAL)
+        self.rocksalt = make_rocksalt()
+
+    def test_invariance(self):
+        fp = self.rocksalt.fingerprint()
+        other = permute(self.rocksalt).fingerprint()
+
+        self.assertEqual(fp.key(), other.key())
+        self.assertTrue(fp.matches(other))
+
+    def test_different(self):
+        fp = self.rocksalt.fingerprint()
+        other = make_rocksalt(5.7).fingerprint()
+
+        self.assertNotEqual(fp.key(), other.key())
+        self.assertFalse(fp.matches(other))
+        self.assertFalse(fp.matches(self.crystal.fingerprint()))
+
+    def test_hashable(self):
+        keys = {self.rocksalt.fingerprint().key(), self.crystal.fingerprint().key()}
+        self.assertEqual(len(keys), 2)
+
+    def test_skewed(self):
+        # rounding the fractional displacement gives 0.764 in this cell
+        lattice = np.array([[1.0, 0, 0], [0.9, 0.2, 0], [0, 0, 5.0]])
+        frac = np.array([[0, 0, 0], [0.4, 0.4, 0]])
+        info = CrystalInfo(species=["H", "H"], coords=frac @ lattice, lattice=lattice)
+
+        images = np.array(np.meshgrid(*[range(-3, 4)] * 3)).reshape(3, -1).T
+        expected = np.linalg.norm((frac[1] + images) @ lattice, axis=1).min()
+        self.assertAlmostEqual(expected, 0.184391, places=6)
+        np.testing.assert_allclose(get_distances(info), [expected])
+
+    def test_chunks(self):
+        expected = get_distances(self.crystal)
+        with patch("mkite_core.models.fingerprint.MAX_DISPLACEMENTS", 1):
+            np.testing.assert_allclose(get_distances(self.crystal), expected)
+
+
+class TestStructureIndex(ut.TestCase):
+    def setUp(self):
+        self.crystal = CrystalInfo.from_json(TEST_CRYSTAL)
+        self.rocksalt = make_rocksalt()
+
+    def test_add(self):
+        index = StructureIndex()
+        self.assertEqual(index.add(self.rocksalt), 0)
+        self.assertEqual(index.add(self.crystal), 1)
+        self.assertEqual(index.add(permute(self.rocksalt)), 0)
+        self.assertEqual(len(index), 2)
+
+        self.assertIn(permute(self.crystal, seed=1), index)
+        self.assertNotIn(make_rocksalt(6.0), index)
+
+    def test_dedup(self):
+        infos = [
+            self.rocksalt,
+            permute(self.rocksalt, seed=1),
+            self.crystal,
+            make_rocksalt(5.64 + 1e-4),
+            make_rocksalt(6.0),
+        ]
+        unique = StructureIndex(tol=0.01).dedup(infos)
+        self.assertEqual(unique, [infos[0], infos[2], infos[4]])
+
+    def test_boundary(self):
+        # lattice lengths on each side of the edge of a bin
+        index = StructureIndex(tol=0.01)
+        index.add(make_rocksalt(5.6449))
+        self.assertIn(make_rocksalt(5.6451), index)
+
+    def test_buckets(self):
+        # same composition and different cells are kept in different buckets
+        index = StructureIndex(tol=0.01)
+        infos = [make_rocksalt(5.0 + 0.1 * i) for i in range(5)]
+        self.assertEqual(index.dedup(infos), infos)
+        self.assertEqual(len(index._buckets), 5)
+        self.assertEqual(len(index._keys), 5)
+
+        fp = permute(infos[2]).fingerprint()
+        self.assertEqual(index._keys[fp.key(index.tol)], 2)
+        self.assertEqual(index.find(permute(infos[2])), 2)
@@ -0,0 +1,82 @@
+import unittest as ut
+
+import numpy as np
+from pymatgen.core.composition import Composition
+
+from mkite_core.models.formula import FormulaInfo, get_formula
+
+
+class TestFormulaInfo(ut.TestCase):
+    def test_from_list(self):
+        symbols = ["C", "C", "N"] + ["H"] * 20 + ["C"] * 6
+        info = FormulaInfo.from_list(symbols, charge=1)
+        self.assertEqual(info.name, "H20 C8 N1 +1")
+        self.assertEqual(info.charge, 1)
+
+    def test_from_dict(self):
+        info = FormulaInfo.from_dict({"Si": 2})
+        self.assertEqual(info.name, "Si2 +0")
+
+        info = FormulaInfo.from_dict({"O": 2, "Fe": 1.5, "Li": 0}, charge=-1)
+        self.assertEqual(info.name, "Fe1.5 O2 -1")
+
+        with self.assertRaises(ValueError):
+            FormulaInfo.from_dict({"Xy": 1})
+
+    def test_species(self):
+        info = FormulaInfo.from_dict({"Fe2+": 1, "O2-": 1})
+        self.assertEqual(info.name, "Fe1 O1 +0")
+        self.assertEqual(info.charge, 0)
+
+        info = FormulaInfo.from_list(["Fe3+", "Fe3+", "O2-", "O2-"])
+        self.assertEqual(info.name, "Fe2 O2 +2")
+
+        info = FormulaInfo.from_dict({"Na+": 1, "Cl-": 1}, charge=1)
+        self.assertEqual(info.name, "Na1 Cl1 +1")
+
+        with self.assertRaises(ValueError):
+            FormulaInfo.from_dict({"Xy2+": 1})
+
+    def test_isotopes(self):
+        info = FormulaInfo.from_dict({"D": 2, "O": 1})
+        self.assertEqual(info.name, "H2 O1 +0")
+
+        info = FormulaInfo.from_list(["H", "D", "T"])
+        self.assertEqual(info.name, "H3 +0")
+
+    def test_pymatgen_species(self):
+        compositions = [
+            {"Fe2+": 1, "O2-": 1},
+            {"Fe3+": 2, "O2-": 3},
+            {"Li+": 1, "Co3+": 1, "O2-": 2},
+            {"D": 2, "O": 1},
+        ]
+        for eldict in compositions:
+            formula, _ = FormulaInfo.from_dict(eldict).name.rsplit(" ", 1)
+            self.assertEqual(formula, Composition(eldict).formula)
+
+    def test_pymatgen(self):
+        compositions = [
+            {"Li": 4, "Fe": 4, "P": 4, "O": 16},
+            {"Ne": 2, "He": 1, "C": 1},
+            {"Ru": 1, "H": 2, "Pd": 3},
+            {"Cs": 1, "Pb": 1, "I": 3},
+        ]
+        for eldict in compositions:
+            expected = FormulaInfo.from_pymatgen(Composition(eldict), charge=0)
+            self.assertEqual(FormulaInfo.from_dict(eldict, charge=0), expected)
+
+    def test_from_many(self):
+        numbers = [np.array([6, 1, 1, 1, 1]), np.array([14, 14]), [8, 1, 1]]
+        infos = FormulaInfo.from_many(numbers, charges=[0, 0, 1])
+        names = [info.name for info in infos]
+        self.assertEqual(names, ["H4 C1 +0", "Si2 +0", "H2 O1 +1"])
+
+        with self.assertRaises(ValueError):
+            FormulaInfo.from_many(numbers, charges=[0])
+
+    def test_cache(self):
+        get_formula.cache_clear()
+        FormulaInfo.from_list(["O", "H", "H"])
+        FormulaInfo.from_list(["H", "O", "H"])
+        self.assertEqual(get_formula.cache_info().hits, 1)
@@ -1,11 +1,14 @@
 import json
+import msgspec as msg
 import unittest as ut
 from datetime import datetime
 from freezegun import freeze_time
 from pkg_resources import resource_filename
 
 from mkite_core.tests.tempdirs import run_in_tempdir
-from mkite_core.models.jobs import JobInfo, RunStatsInfo
+from mkite_core.models.base import NodeResults
+from mkite_core.models.jobs import JobInfo, JobResults, RunStatsInfo
+from mkite_core.models.jobs import JobResultsWriter, JobResultsReader
 
 
 INFO_FILE = resource_filename("mkite_core.tests.files", "jobinfo.json")
@@ -34,6 +37,20 @@ class TestJobInfo(ut.TestCase):
 
         self.assertEqual(self.info, new)
 
+    @run_in_tempdir
+    def test_to_file(self):
+        for fmt in ["json", "jsonl", "msgpack"]:
+            name = JobInfo.file_name(fmt)
+            self.info.to_file(name)
+            new = JobInfo.from_file(name)
+
+            self.assertEqual(self.info, new)
+
+    def test_file_name(self):
+        self.assertEqual(JobInfo.file_name(), "jobinfo.json")
+        self.assertEqual(JobInfo.file_name("msgpack"), "jobinfo.msgpack")
+        self.assertEqual(JobResults.file_name("jsonl"), "jobresults.jsonl")
+
     def test_uuid(self):
         self.assertEqual(self.info.uuid_short, "7615c560")
 
@@ -45,3 +62,102 @@ class TestJobInfo(ut.TestCase):
         expected = f"test_recipe_7615c560_{TIMESTAMP}"
 
         self.assertEqual(name, expected)
+
+
+class TestJobResultsStream(ut.TestCase):
+    def setUp(self):
+        self.job = {"uuid": "7615c560-0000"}
+        self.runstats = {"host": "host", "duration": 1.0}
+        self.nodes = [
+            NodeResults(chemnode={"idx": i}, calcnodes=[{"energy": -i}])
+            for i in range(5)
+        ]
+
+    @run_in_tempdir
+    def test_stream(self):
+        for fmt in ["jsonl", "msgpack"]:
+            name = JobResults.file_name(fmt)
+            with JobResultsWriter(name, job=self.job, runstats=self.runstats) as w:
+                w.write(self.nodes[0])
+                w.write_many(iter(self.nodes[1:]))
+
+            self.assertEqual(w.num_nodes, 5)
+
+            reader = JobResultsReader(name)
+            self.assertTrue(reader.is_stream)
+            self.assertEqual(reader.header.job, self.job)
+            self.assertEqual(reader.header.nodes, [])
+            self.assertEqual(list(reader), self.nodes)
+
+            results = JobResults.from_file(name)
+            expected = JobResults(
+                job=self.job, runstats=self.runstats, nodes=self.nodes
+            )
+            self.assertEqual(results, expected)
+
+    @run_in_tempdir
+    def test_read_plain(self):
+        results = JobResults(job=self.job, nodes=self.nodes)
+        for fmt in ["json", "jsonl", "msgpack"]:
+            name = JobResults.file_name(fmt)
+            results.to_file(name)
+
+            reader = JobResultsReader(name)
+            self.assertEqual(reader.is_stream, fmt == "jsonl")
+            self.assertEqual(list(reader), self.nodes)
+            self.assertEqual(JobResults.from_file(name), results)
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            JobResultsWriter("jobresults.json", job=self.job)
+
+
+class TestJobResults(ut.TestCase):
+    def test_partial_runstats(self):
+        for runstats in [{}, {"host": "host", "cluster": "cluster"}]:
+            results = JobResults(job={"id": 1}, runstats=runstats)
+            for fmt in ["json", "msgpack"]:
+                new = JobResults.decode(results.encode(fmt=fmt), fmt=fmt)
+                self.assertEqual(new.runstats, runstats)
+
+
+class TestRunStatsInfo(ut.TestCase):
+    def setUp(self):
+        self.stats = RunStatsInfo(
+            host="host",
+            cluster="cluster",
+            duration=10.0,
+            ncores=2,
+            ngpus=0,
+            maxrss=100,
+            cpu_user=12.0,
+            cpu_system=3.0,
+        )
+
+    def test_add(self):
+        other = msg.structs.replace(self.stats, maxrss=300, read_bytes=50)
+        total = self.stats + other
+
+        self.assertEqual(total.duration, 20.0)
+        self.assertEqual(total.maxrss, 300)
+        self.assertEqual(total.cpu_user, 24.0)
+        self.assertEqual(total.read_bytes, 50)
+        self.assertIsNone(total.write_bytes)
+
+    def test_aggregate(self):
+        runstats = [self.stats.as_dict(), {"host": "host", "duration": 5}]
+        combined = RunStatsInfo.aggregate(runstats)
+        self.assertEqual(
+            combined,
+            {"duration": 15.0, "cpu_user": 12.0, "cpu_system": 3.0, "maxrss": 100},
+        )
+
+        runstats = [{"timings": {"setup": 1.0, "run_job": 2.0}}] * 2
+        combined = RunStatsInfo.aggregate(runstats)
+        self.assertEqual(combined["timings"], {"setup": 2.0, "run_job": 4.0})
+
+    def test_cpu_efficiency(self):
+        self.assertAlmostEqual(self.stats.cpu_efficiency, 0.75)
+
+        stats = msg.structs.replace(self.stats, cpu_user=None)
+        self.assertIsNone(stats.cpu_efficiency)
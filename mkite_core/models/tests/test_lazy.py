@@ -0,0 +1,60 @@
+import unittest as ut
+from pkg_resources import resource_filename
+
+import numpy as np
+import msgspec as msg
+
+from mkite_core.tests.tempdirs import run_in_tempdir
+from mkite_core.models import JobInfo, JobResults, NodeResults, CrystalInfo
+from mkite_core.models.lazy import LazyJobInfo, LazyJobResults
+
+
+INFO_FILE = resource_filename("mkite_core.tests.files", "jobinfo.json")
+
+
+class TestLazyJobInfo(ut.TestCase):
+    def setUp(self):
+        self.info = JobInfo.from_json(INFO_FILE)
+
+    @run_in_tempdir
+    def test_inputs(self):
+        self.info.inputs.append({"species": ["H"], "@class": "Unknown"})
+        for fmt in ["json", "jsonl", "msgpack"]:
+            name = JobInfo.file_name(fmt)
+            self.info.to_file(name)
+
+            lazy = LazyJobInfo.from_file(name)
+            self.assertEqual(lazy.job, self.info.job)
+            self.assertEqual(lazy.recipe, self.info.recipe)
+
+            inputs = lazy.get_inputs()
+            self.assertEqual(len(inputs), 2)
+            self.assertIsInstance(inputs[0], CrystalInfo)
+            self.assertTrue(np.allclose(inputs[0].lattice[0], [0, 2.73, 2.73]))
+            self.assertEqual(inputs[1], {"species": ["H"], "@class": "Unknown"})
+
+            as_dicts = lazy.get_inputs(dict)
+            self.assertEqual(as_dicts[:1], self.info.inputs[:1])
+            self.assertEqual(lazy.load(), self.info)
+
+    def test_direct(self):
+        raw = msg.Raw(msg.json.encode({"species": ["H"]}))
+        lazy = LazyJobInfo(job={}, recipe={}, options={}, inputs=[raw])
+        self.assertEqual(lazy.fmt, "json")
+        self.assertEqual(lazy.get_inputs()[0], {"species": ["H"]})
+
+
+class TestLazyJobResults(ut.TestCase):
+    @run_in_tempdir
+    def test_nodes(self):
+        nodes = [NodeResults(chemnode={"idx": i}) for i in range(3)]
+        results = JobResults(job={"id": 1}, nodes=nodes)
+        for fmt in ["json", "msgpack"]:
+            name = JobResults.file_name(fmt, "gzip")
+            results.to_file(name)
+
+            lazy = LazyJobResults.from_file(name)
+            self.assertEqual(lazy.job, {"id": 1})
+            self.assertEqual(lazy.get_nodes()[2], nodes[2])
+            self.assertEqual(list(lazy.get_nodes()), nodes)
+            self.assertEqual(lazy.load(), results)
@@ -2,12 +2,14 @@ import unittest as ut
 from copy import deepcopy
 from pkg_resources import resource_filename
 
+import numpy as np
 from ase import Atoms
 from pymatgen.core import Molecule
 import rdkit.Chem.AllChem as Chem
 
 from mkite_core.external.rdkit import RdkitInterface
 from mkite_core.models.mols import MoleculeInfo, ConformerInfo
+from mkite_core.models.mols import ConformerEnsembleInfo
 
 
 TEST_MOLECULE = resource_filename("mkite_core.tests.files.models", "molecule.json")
@@ -330,9 +332,89 @@ class TestConformerInfo(ut.TestCase):
 
         self.assertEqual(self.conformer, new)
 
+    def test_shared_buffers(self):
+        atoms = self.get_ase()
+        new = ConformerInfo.from_ase(atoms)
+        self.assertTrue(np.shares_memory(new.coords, atoms.positions))
+
+        conformer = new.as_ase()
+        self.assertTrue(np.shares_memory(new.coords, conformer.positions))
+
+    def test_encode(self):
+        self.assertEqual(self.conformer.coords.shape, (29, 3))
+        new = ConformerInfo.decode(self.conformer.encode())
+        self.assertEqual(self.conformer, new)
+
     def test_inequality(self):
         self.assertNotEqual(self.conformer, ["test"])
 
         modified = deepcopy(self.conformer)
         modified.species = ["Si", "Al"]
         self.assertNotEqual(self.conformer, modified)
+
+
+class TestConformerEnsembleInfo(ut.TestCase):
+    def setUp(self):
+        self.conformer = ConformerInfo.from_json(TEST_CONFORMER)
+        shifted = deepcopy(self.conformer)
+        shifted.coords = shifted.coords + 1.0
+        shifted.attributes = {"energy": -1.0}
+        self.conformers = [self.conformer, shifted]
+
+    def test_from_conformers(self):
+        ensemble = ConformerEnsembleInfo.from_conformers(self.conformers)
+        self.assertEqual(len(ensemble), 2)
+        self.assertEqual(ensemble.coords.shape, (2, 29, 3))
+        self.assertEqual(ensemble.conformer_attributes, [{}, {"energy": -1.0}])
+        self.assertEqual(ensemble.to_conformers(), self.conformers)
+
+    def test_views(self):
+        ensemble = ConformerEnsembleInfo.from_conformers(self.conformers)
+        self.assertTrue(np.shares_memory(ensemble[1].coords, ensemble.coords))
+
+    def test_independent(self):
+        species = list(self.conformer.species)
+        ensemble = ConformerEnsembleInfo(
+            species=list(species),
+            coords=np.stack([self.conformer.coords] * 2),
+            mol=self.conformer.mol,
+            siteprops={
+                "charge": np.zeros(len(self.conformer.species)),
+                "labels": ("a",) * len(self.conformer.species),
+                "spin": None,
+                "tags": [["x"]] * len(self.conformer.species),
+            },
+            attributes={"source": "test"},
+        )
+        first, second = ensemble[0], ensemble[1]
+        self.assertEqual(first.siteprops["labels"], ensemble.siteprops["labels"])
+        self.assertIsNone(first.siteprops["spin"])
+        first.siteprops["tags"][0].append("y")
+        self.assertEqual(ensemble.siteprops["tags"][0], ["x"])
+
+        first.attributes["energy"] = -1.0
+        first.siteprops["charge"][0] = 1.0
+        first.species[0] = "X"
+        first.mol.attributes["modified"] = True
+
+        self.assertEqual(second.attributes, {"source": "test"})
+        self.assertEqual(ensemble.attributes, {"source": "test"})
+        self.assertEqual(ensemble.siteprops["charge"][0], 0.0)
+        self.assertEqual(ensemble.species, species)
+        self.assertEqual(second.mol, ensemble.mol)
+
+    def test_invalid(self):
+        modified = deepcopy(self.conformer)
+        modified.species = modified.species[::-1]
+
+        with self.assertRaises(ValueError):
+            ConformerEnsembleInfo.from_conformers([self.conformer, modified])
+
+        with self.assertRaises(ValueError):
+            ConformerEnsembleInfo.from_conformers([])
+
+    def test_encode(self):
+        ensemble = ConformerEnsembleInfo.from_conformers(self.conformers)
+        for fmt in ["json", "msgpack"]:
+            new = ConformerEnsembleInfo.decode(ensemble.encode(fmt), fmt=fmt)
+            self.assertEqual(new, ensemble)
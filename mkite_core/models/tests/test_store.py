@@ -0,0 +1,170 @@
+import os
+import unittest as ut
+from pkg_resources import resource_filename
+
+import numpy as np
+
+from mkite_core.tests.tempdirs import run_in_tempdir
+from mkite_core.models import (
+    CrystalInfo,
+    ConformerInfo,
+    JobInfo,
+    MoleculeInfo,
+    StructureStore,
+    StructureStoreWriter,
+)
+from mkite_core.models.store import open_store
+
+
+TEST_CRYSTAL = resource_filename("mkite_core.tests.files.models", "crystal.json")
+TEST_CONFORMER = resource_filename("mkite_core.tests.files.models", "conformer.json")
+
+
+class TestStructureStore(ut.TestCase):
+    def setUp(self):
+        self.crystal = CrystalInfo.from_json(TEST_CRYSTAL)
+        self.other = CrystalInfo(
+            species=["Na", "Cl"],
+            coords=[[0, 0, 0], [1.5, 1.5, 1.5]],
+            lattice=[[3, 0, 0], [0, 3, 0], [0, 0, 3]],
+        )
+        self.infos = [self.crystal, self.other] * 3
+
+    @run_in_tempdir
+    def test_write_read(self):
+        with StructureStoreWriter("store", kind="crystal", flush_every=4) as writer:
+            writer.extend(self.infos)
+
+        store = StructureStore("store")
+        self.assertEqual(len(store), 6)
+        self.assertEqual(store[1], self.other)
+        self.assertEqual(store[-2], self.crystal)
+        self.assertEqual(list(store), self.infos)
+        self.assertEqual(store[2:4], self.infos[2:4])
+        self.assertIsInstance(store.coords, np.memmap)
+
+        batch = store.get_batch(1, 3)
+        self.assertEqual(batch.to_infos(), self.infos[1:3])
+
+    @run_in_tempdir
+    def test_append(self):
+        with StructureStoreWriter("store") as writer:
+            writer.append(self.crystal)
+
+        with StructureStoreWriter("store") as writer:
+            writer.append(self.other)
+
+        store = StructureStore("store")
+        self.assertEqual(list(store), [self.crystal, self.other])
+
+        with self.assertRaises(ValueError):
+            StructureStoreWriter("store", kind="conformer")
+
+    @run_in_tempdir
+    def test_uncommitted(self):
+        writer = StructureStoreWriter("store")
+        writer.append(self.crystal)
+        writer.flush()
+        writer.append(self.other)
+        writer._coords.flush()
+
+        store = StructureStore("store")
+        self.assertEqual(len(store), 1)
+        writer.close()
+
+        self.assertEqual(len(StructureStore("store")), 2)
+
+    @run_in_tempdir
+    def test_conformers(self):
+        conformer = ConformerInfo.from_json(TEST_CONFORMER)
+        with StructureStoreWriter("store", kind="conformer") as writer:
+            writer.append(conformer)
+
+            with self.assertRaises(TypeError):
+                writer.append(self.crystal)
+
+        store = StructureStore("store")
+        new = store[0]
+        self.assertEqual(new.species, conformer.species)
+        self.assertTrue(np.allclose(new.coords, conformer.coords))
+        self.assertEqual(new, conformer)
+
+    @run_in_tempdir
+    def test_extras(self):
+        crystal = self.other.copy(deepcopy=True)
+        crystal.species = ["Na+", "Cl-"]
+        crystal.siteprops = {"magmom": [0.5, -0.5], "label": ["a", "b"]}
+        crystal.attributes = {"energy": -1.0}
+
+        conformer = ConformerInfo.from_json(TEST_CONFORMER)
+        conformer.mol = MoleculeInfo(inchikey="key", smiles="CCO")
+        conformer.siteprops = {"charge": np.zeros(len(conformer.species))}
+
+        with StructureStoreWriter("store") as writer:
+            writer.extend([self.other, crystal, self.other])
+
+        with StructureStoreWriter("conformers", kind="conformer") as writer:
+            writer.append(conformer)
+
+        store = StructureStore("store")
+        self.assertEqual(list(store), [self.other, crystal, self.other])
+        self.assertIsInstance(store[1].siteprops["magmom"], np.ndarray)
+        self.assertEqual(store.get_batch().to_infos()[1].species, ["Na", "Cl"])
+        self.assertEqual(StructureStore("conformers")[0], conformer)
+
+    @run_in_tempdir
+    def test_without_extras(self):
+        # stores written before the extras were added
+        with StructureStoreWriter("store") as writer:
+            writer.append(self.other)
+
+        os.remove("store/extras.bin")
+        os.remove("store/extra_offsets.bin")
+        self.assertEqual(list(StructureStore("store")), [self.other])
+
+        crystal = self.other.copy(deepcopy=True)
+        crystal.attributes = {"energy": -1.0}
+        with StructureStoreWriter("store") as writer:
+            writer.append(crystal)
+
+        self.assertEqual(list(StructureStore("store")), [self.other, crystal])
+
+    @run_in_tempdir
+    def test_unsupported_species(self):
+        crystal = self.other.copy(deepcopy=True)
+        crystal.species = ["Na", "Xx"]
+        with StructureStoreWriter("store") as writer:
+            with self.assertRaisesRegex(ValueError, "Xx"):
+                writer.append(crystal)
+
+    @run_in_tempdir
+    def test_reference(self):
+        with StructureStoreWriter("store") as writer:
+            writer.extend(self.infos)
+
+        store = StructureStore("store")
+        info = JobInfo(
+            job={},
+            recipe={},
+            options={},
+            inputs=[store.reference(1, 3), self.crystal.as_dict()],
+        )
+        new = JobInfo.decode(info.encode())
+
+        inputs = [CrystalInfo.from_dict(inp) for inp in new.iter_inputs()]
+        self.assertEqual(inputs, [self.other, self.crystal, self.crystal])
+
+    @run_in_tempdir
+    def test_open_store(self):
+        with StructureStoreWriter("store") as writer:
+            writer.append(self.crystal)
+
+        store = open_store("store")
+        self.assertIs(open_store("./store"), store)
+        self.assertEqual(len(store), 1)
+
+        with StructureStoreWriter("store") as writer:
+            writer.extend(self.infos)
+
+        new = open_store("store")
+        self.assertEqual(len(new), 1 + len(self.infos))
@@ -1,11 +1,16 @@
 import unittest as ut
+from unittest.mock import patch
 from copy import deepcopy
 from pkg_resources import resource_filename
 
+import ase.io
+import numpy as np
 from ase import Atoms
+from ase.spacegroup import Spacegroup
 from pymatgen.core import Structure
 
-from mkite_core.models.structs import CrystalInfo
+from mkite_core.tests.tempdirs import run_in_tempdir
+from mkite_core.models.structs import CrystalInfo, SpaceGroupInfo
 
 
 TEST_CRYSTAL = resource_filename("mkite_core.tests.files.models", "crystal.json")
@@ -77,15 +82,126 @@ class TestCrystalInfo(ut.TestCase):
 
         self.assertEqual(self.crystal, new)
 
+    def test_from_ase_info(self):
+        atoms = self.get_ase()
+        atoms.info = {"energy": np.float32(-1.5), "stress": np.zeros(3)}
+        new = CrystalInfo.from_ase(atoms)
+
+        self.assertEqual(new.attributes, {"energy": -1.5, "stress": [0.0] * 3})
+        self.assertIs(type(new.attributes["energy"]), float)
+
+    @run_in_tempdir
+    def test_from_cif(self):
+        self.crystal.as_pymatgen().to(filename="crystal.cif")
+        atoms = ase.io.read("crystal.cif")
+        self.assertIsInstance(atoms.info["spacegroup"], Spacegroup)
+
+        new = CrystalInfo.from_ase(atoms)
+        self.assertIsInstance(new.attributes["spacegroup"], str)
+        self.assertEqual(CrystalInfo.decode(new.encode()), new)
+
     def test_as_ase(self):
         structure = self.crystal.as_ase()
         expected = self.get_ase()
 
         self.assertEqual(structure, expected)
 
+    def test_arrays(self):
+        self.assertIsInstance(self.crystal.coords, np.ndarray)
+        self.assertEqual(self.crystal.coords.dtype, np.float64)
+        self.assertEqual(self.crystal.coords.shape, (2, 3))
+        self.assertEqual(self.crystal.lattice.shape, (3, 3))
+
+    def test_shared_buffers(self):
+        atoms = self.get_ase()
+        new = CrystalInfo.from_ase(atoms)
+        self.assertTrue(np.shares_memory(new.coords, atoms.positions))
+
+        structure = new.as_ase()
+        self.assertTrue(np.shares_memory(new.coords, structure.positions))
+
+    def test_frac_coords(self):
+        expected = [[0.0, 0.0, 0.0], [0.25, 0.25, 0.25]]
+        self.assertTrue(np.allclose(self.crystal.frac_coords, expected))
+
+    def test_encode(self):
+        siteprops = {"magmom": [0.5, -0.5], "label": ["a", "b"]}
+        crystal = CrystalInfo(
+            species=self.crystal.species,
+            coords=self.crystal.coords,
+            lattice=self.crystal.lattice,
+            siteprops=siteprops,
+        )
+        self.assertIsInstance(crystal.siteprops["magmom"], np.ndarray)
+        self.assertEqual(crystal.siteprops["label"], ["a", "b"])
+
+        for fmt in ["json", "msgpack"]:
+            new = CrystalInfo.decode(crystal.encode(fmt), fmt=fmt)
+            self.assertEqual(crystal, new)
+
     def test_inequality(self):
         self.assertNotEqual(self.crystal, ["test"])
 
         modified = deepcopy(self.crystal)
         modified.species = ["Si", "Al"]
         self.assertNotEqual(self.crystal, modified)
+
+
+class TestSpaceGroupInfo(ut.TestCase):
+    def setUp(self):
+        SpaceGroupInfo.clear_cache()
+        self.crystal = CrystalInfo.from_json(TEST_CRYSTAL)
+        self.other = CrystalInfo(
+            species=["Na", "Cl"],
+            coords=[[0, 0, 0], [1.5, 1.5, 1.5]],
+            lattice=[[3, 0, 0], [0, 3, 0], [0, 0, 3]],
+        )
+
+    def test_from_info(self):
+        sg = SpaceGroupInfo.from_info(self.crystal)
+        self.assertEqual(sg.number, 227)
+        self.assertEqual(sg.symbol, "Fd-3m")
+
+    def test_digest(self):
+        self.assertEqual(self.crystal.digest(), self.crystal.copy().digest())
+        self.assertNotEqual(self.crystal.digest(), self.other.digest())
+
+    def test_digest_siteprops(self):
+        magnetic = self.crystal.copy(deepcopy=True)
+        magnetic.siteprops = {"magmom": np.array([1.0, -1.0])}
+        self.assertNotEqual(self.crystal.digest(), magnetic.digest())
+
+        other = magnetic.copy(deepcopy=True)
+        other.siteprops = {"magmom": np.array([1.0, 1.0])}
+        self.assertNotEqual(other.digest(), magnetic.digest())
+
+        labels = self.crystal.copy(deepcopy=True)
+        labels.siteprops = {"label": ["a", "b"]}
+        self.assertNotEqual(self.crystal.digest(), labels.digest())
+
+    @patch("mkite_core.models.structs._get_space_group_info")
+    def test_cache(self, mock_sg):
+        mock_sg.return_value = ("Fd-3m", 227)
+        SpaceGroupInfo.from_info(self.crystal, symprec=0.1)
+        SpaceGroupInfo.from_info(self.crystal.copy(), symprec=0.1)
+        self.assertEqual(mock_sg.call_count, 1)
+
+        SpaceGroupInfo.from_info(self.crystal)
+        SpaceGroupInfo.from_info(self.crystal, symprec=0.01)
+        SpaceGroupInfo.from_info(self.crystal, angle_tolerance=5)
+        self.assertEqual(mock_sg.call_count, 2)
+
+        SpaceGroupInfo.from_info(self.crystal, symprec=0.01)
+        self.assertEqual(mock_sg.call_count, 2)
+
+    def test_from_infos(self):
+        infos = [self.crystal, self.other, self.crystal.copy(), self.other]
+        expected = [SpaceGroupInfo.from_info(info) for info in infos]
+
+        SpaceGroupInfo.clear_cache()
+        spacegroups = SpaceGroupInfo.from_infos(infos, n_workers=2)
+        self.assertEqual(spacegroups, expected)
+        self.assertEqual(spacegroups[1].number, 221)
+
+        serial = SpaceGroupInfo.from_infos(infos, n_workers=1)
+        self.assertEqual(serial, expected)
@@ -3,6 +3,6 @@ from .options import BaseOptions
 from .parser import BaseParser
 from .errors import BaseErrorHandler
 from .recipe import PythonRecipe, BaseRecipe, RecipeError
-from .chain import RecipeChain
+from .chain import RecipeChain, RecipeGraph
 from .runner import BaseRunner
 from .pipes import JobPipe, SaveResultsPipe, CopyWorkdirPipe
@@ -1,7 +1,9 @@
 import os
-from typing import List, Union
+import shutil
+import traceback
+from typing import Dict, List, Optional, Type, Union
 
-from mkite_core.models import JobResults, JobInfo
+from mkite_core.models import JobResults, JobInfo, RunStatsInfo
 
 from .base import Runnable
 from .recipe import BaseRecipe
@@ -19,18 +21,29 @@ class RecipeChain(Runnable):
         self.info = info
         self.settings_path = settings_path
 
+    @classmethod
+    def from_file(cls, filename: os.PathLike, settings_path: os.PathLike = None):
+        """Creates the chain from a JobInfo saved in any of the
+        supported file formats (JSON, JSON Lines or MessagePack)"""
+        info = JobInfo.from_file(filename)
+        return cls(info, settings_path=settings_path)
+
     def run(self) -> JobResults:
         info = self.info
         results = None
 
-        total_duration = 0
+        runstats = []
         for jcls in self.JOBS:
             if issubclass(jcls, BaseRecipe):
                 job = jcls(info, settings_path=self.settings_path)
                 results = job.run()
-                total_duration += results.runstats.get("duration", 0)
+                runstats.append(results.runstats)
 
-            results.runstats["duration"] = round(total_duration, 6)
+            results.runstats = {
+                **results.runstats,
+                "duration": 0,
+                **RunStatsInfo.aggregate(runstats),
+            }
             if issubclass(jcls, JobPipe):
                 job = jcls(info, results)
                 info = job.run()
@@ -42,3 +55,240 @@ class RecipeChain(Runnable):
         jcls = [j for j in self.JOBS if issubclass(j, BaseRecipe)][0]
         job = jcls(self.info, settings_path=self.settings_path)
         return job.handle_errors(**kwargs)
+
+
+def _run_in_folder(fn, folder: os.PathLike, *args, **kwargs):
+    basedir = os.getcwd()
+    os.makedirs(folder, exist_ok=True)
+    os.chdir(folder)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        os.chdir(basedir)
+
+
+def _run_recipe(
+    jcls: Type[BaseRecipe],
+    info: JobInfo,
+    settings_path: os.PathLike,
+    folder: os.PathLike,
+) -> Optional[JobResults]:
+    job = jcls(info, settings_path=settings_path)
+    return _run_in_folder(job.run, folder)
+
+
+class RecipeGraph(Runnable):
+    """Runs recipes and pipes whose dependencies form a directed acyclic
+    graph. Steps whose parents have finished run concurrently in a pool
+    of `n_workers` processes, so independent branches (e.g. phonons and
+    band structure after a relaxation) do not wait for each other.
+
+    `NODES` maps the name of each step to its class, and `DEPENDENCIES`
+    maps the name of a step to the name of its parent. As in `RecipeChain`,
+    a recipe receives the JobInfo of its parent (the output of a pipe or
+    the input of a recipe), and a pipe receives the JobInfo and results of
+    its parent recipe. Steps without parents receive the JobInfo of the
+    graph. Each step runs in its own folder, named after the step, and
+    receives its own copy of the JobInfo and of its workdir.
+
+    The returned JobResults contains the nodes of all recipes that are not
+    followed by other recipes, and the sum of the durations of all recipes.
+    If any recipe fails, its descendants are skipped and None is returned.
+
+    Example:
+        class PropertiesGraph(RecipeGraph):
+            NODES = {
+                "relax": RelaxRecipe,
+                "next": RelaxedPipe,
+                "phonons": PhononRecipe,
+                "bands": BandsRecipe,
+            }
+            DEPENDENCIES = {"next": "relax", "phonons": "next", "bands": "next"}
+    """
+
+    NODES: Dict[str, Union[Type[BaseRecipe], Type[JobPipe]]]
+    DEPENDENCIES: Dict[str, str] = {}
+
+    def __init__(
+        self,
+        info: JobInfo,
+        settings_path: os.PathLike = None,
+        n_workers: int = None,
+    ):
+        self.info = info
+        self.settings_path = settings_path
+        self.n_workers = n_workers
+
+    @classmethod
+    def from_file(
+        cls,
+        filename: os.PathLike,
+        settings_path: os.PathLike = None,
+        n_workers: int = None,
+    ):
+        info = JobInfo.from_file(filename)
+        return cls(info, settings_path=settings_path, n_workers=n_workers)
+
+    def get_input(self, info: JobInfo, folder: os.PathLike) -> JobInfo:
+        """Returns a copy of `info` for the step running in `folder`. If
+        `info` has a workdir, it is copied into `folder`, since recipes
+        move their workdir and sibling steps cannot share it."""
+        info = info.copy(deepcopy=True)
+        if getattr(info, "workdir", None) is None:
+            return info
+
+        src = os.path.abspath(info.workdir)
+        dst = os.path.join(folder, os.path.basename(src))
+        os.makedirs(folder, exist_ok=True)
+        shutil.copytree(src, dst)
+        info.workdir = dst
+        return info
+
+    def get_order(self) -> List[str]:
+        """Returns the names of the steps sorted such that each step comes
+        after its parent. Raises a ValueError if the graph is invalid."""
+        for name, parent in self.DEPENDENCIES.items():
+            if name not in self.NODES or parent not in self.NODES:
+                raise ValueError(f"Unknown step in dependency {name} -> {parent}")
+
+        for name, jcls in self.NODES.items():
+            parent = self.DEPENDENCIES.get(name)
+            if issubclass(jcls, JobPipe) and (
+                parent is None or not issubclass(self.NODES[parent], BaseRecipe)
+            ):
+                raise ValueError(f"Pipe {name} has to follow a recipe")
+
+        order = []
+        visiting = set()
+
+        def visit(name):
+            if name in order:
+                return
+
+            if name in visiting:
+                raise ValueError(f"Dependencies of {name} form a cycle")
+
+            visiting.add(name)
+            parent = self.DEPENDENCIES.get(name)
+            if parent is not None:
+                visit(parent)
+
+            order.append(name)
+
+        for name in self.NODES:
+            visit(name)
+
+        return order
+
+    def get_children(self, name: str) -> List[str]:
+        return [child for child, parent in self.DEPENDENCIES.items() if parent == name]
+
+    def run(self) -> Optional[JobResults]:
+        from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+        order = self.get_order()
+        basedir = os.path.abspath(".")
+
+        # JobInfo received by each step, and results of each recipe
+        inputs = {}
+        outputs = {}
+        results = {}
+        failed = []
+
+        def get_input(name, folder):
+            parent = self.DEPENDENCIES.get(name)
+            if parent is None:
+                return self.get_input(self.info, folder)
+
+            return self.get_input(outputs[parent], folder)
+
+        with ProcessPoolExecutor(max_workers=self.n_workers) as pool:
+            running = {}
+            ready = [name for name in order if name not in self.DEPENDENCIES]
+
+            while ready or running:
+                while ready:
+                    name = ready.pop(0)
+                    jcls = self.NODES[name]
+                    folder = os.path.join(basedir, name)
+                    inputs[name] = get_input(name, folder)
+
+                    if issubclass(jcls, BaseRecipe):
+                        future = pool.submit(
+                            _run_recipe, jcls, inputs[name], self.settings_path, folder
+                        )
+                        running[future] = name
+                        continue
+
+                    # pipes are cheap and run in this process
+                    parent = self.DEPENDENCIES[name]
+                    pipe = jcls(inputs[parent], results[parent])
+                    outputs[name] = _run_in_folder(pipe.run, folder)
+                    ready.extend(self.get_children(name))
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception:
+                        traceback.print_exc()
+                        result = None
+
+                    if result is None:
+                        failed.append(name)
+                        continue
+
+                    results[name] = result
+                    outputs[name] = inputs[name]
+                    ready.extend(self.get_children(name))
+
+        if failed:
+            return None
+
+        return self.combine_results(results)
+
+    def combine_results(self, results: Dict[str, JobResults]) -> JobResults:
+        """Joins the results of the recipes that are not followed by
+        other recipes and aggregates the resources used by all recipes"""
+
+        def has_recipe_descendant(name):
+            for child in self.get_children(name):
+                if issubclass(self.NODES[child], BaseRecipe):
+                    return True
+
+                if has_recipe_descendant(child):
+                    return True
+
+            return False
+
+        # follows the order of NODES, as recipes may finish in any order
+        names = [name for name in self.NODES if name in results]
+        leaves = [name for name in names if not has_recipe_descendant(name)]
+        if not leaves:
+            job = {k: self.info.job[k] for k in ["id", "uuid"] if k in self.info.job}
+            return JobResults(job={**job, "status": "D"}, nodes=[])
+
+        first = results[leaves[0]]
+        runstats = {
+            **first.runstats,
+            "duration": 0,
+            **RunStatsInfo.aggregate(results[name].runstats for name in names),
+        }
+        nodes = [node for name in leaves for node in results[name].nodes]
+
+        return JobResults(
+            job=first.job,
+            runstats=runstats,
+            nodes=nodes,
+            workdir=first.workdir,
+        )
+
+    def handle_errors(self, **kwargs) -> JobInfo:
+        # use handle_errors from the first recipe
+        name = [n for n in self.get_order() if issubclass(self.NODES[n], BaseRecipe)][0]
+        job = self.NODES[name](self.info, settings_path=self.settings_path)
+        return job.handle_errors(**kwargs)
@@ -2,8 +2,10 @@ import os
 import re
 import json
 from abc import ABC, abstractmethod
+from typing import Iterator
 
-from mkite_core.models import JobInfo, JobResults, RunStatsInfo
+from mkite_core.models import JobInfo, JobResults, NodeResults, RunStatsInfo
+from mkite_core.models.compression import open_file
 
 
 class ParseError(Exception):
@@ -28,12 +30,24 @@ class BaseParser(ABC):
     def parse(self) -> JobResults:
         """Functions that will be run to parse the results of the recipe"""
 
+    def iter_nodes(self) -> Iterator[NodeResults]:
+        """Yields the nodes of the results one at a time. Parsers of large
+        outputs can implement it so that recipes write each node to the
+        results file as soon as it is parsed (see `BaseRecipe.postprocess`)
+        instead of building all results in memory."""
+        raise NotImplementedError
+
+    @classmethod
+    def can_iter_nodes(cls) -> bool:
+        return cls.iter_nodes is not BaseParser.iter_nodes
+
     def to_json(self, obj, filename: os.PathLike):
-        with open(filename, "w") as f:
+        with open_file(filename, "wt") as f:
             json.dump(obj, f)
 
     def load_json(self, filename: os.PathLike):
-        with open(filename, "r") as f:
+        """Loads a JSON file, which may be compressed (.gz, .xz or .zst)"""
+        with open_file(filename, "rt") as f:
             return json.load(f)
 
     def get_path(self, filename: str):
@@ -21,8 +21,13 @@ class JobPipe(Runnable):
 
 
 class SaveResultsPipe(JobPipe):
+    FORMAT: str = "json"
+    COMPRESSION: str = None
+    COMPRESSION_LEVEL: int = None
+
     def run(self) -> JobInfo:
-        self.results.to_json(JobResults.file_name())
+        filename = JobResults.file_name(self.FORMAT, self.COMPRESSION)
+        self.results.to_file(filename, level=self.COMPRESSION_LEVEL)
         return self.info
 
 
@@ -1,15 +1,17 @@
-import json
 import os
+import re
 import shutil
 import socket
 import subprocess
 import tempfile
 import traceback
 from abc import abstractmethod
-from typing import List
+from typing import Iterator, List
 
-from mkite_core.models import JobInfo, JobResults, RunStatsInfo, Status
-from pkg_resources import get_distribution
+from mkite_core.models import JobInfo, JobResults, JobResultsWriter
+from mkite_core.models import RunStatsInfo, Status
+from mkite_core.models.jobs import STREAM_FORMATS
+from mkite_core.models.arrays import as_builtins
 
 from .base import Runnable
 from .errors import BaseErrorHandler
@@ -17,6 +19,8 @@ from .options import BaseOptions
 from .parser import BaseParser
 from .runner import BaseRunner
 from .settings import EnvSettings
+from .tracing import JsonlTraceSink, Tracer
+from .usage import ChildUsage
 
 
 class RecipeError(Exception):
@@ -43,11 +47,20 @@ class PythonRecipe(Runnable):
         """Runs the script"""
 
     def __init__(
-        self, info: JobInfo, settings_path: os.PathLike = None, workdir: str = None
+        self,
+        info: JobInfo,
+        settings_path: os.PathLike = None,
+        workdir: str = None,
+        settings: EnvSettings = None,
     ):
         self.info = info
-        self.settings = self._load_settings(settings_path)
+        self.settings = settings or self._load_settings(settings_path)
         self.workdir = workdir
+        self.usage = ChildUsage()
+        self.tracer = self._get_tracer()
+
+        # path of the results file, if the recipe saves its own results
+        self.results_path = None
 
     def _load_settings(self, path: os.PathLike = None):
         """Loads the settings relevant to the recipe using the
@@ -59,19 +72,44 @@ class PythonRecipe(Runnable):
 
         return self.SETTINGS_CLS()
 
+    def _get_tracer(self) -> Tracer:
+        """Creates the tracer timing the phases of the recipe. Events
+        are saved to the TRACE_FILE of the settings, if given."""
+        tracer = Tracer(self.__class__.__name__, job=self.info.job.get("uuid"))
+        if getattr(self.settings, "TRACE_FILE", None):
+            tracer.callbacks.append(JsonlTraceSink(self.settings.TRACE_FILE))
+
+        return tracer
+
     @classmethod
     def from_json(cls, filename: os.PathLike):
         info = JobInfo.from_json(filename)
         return cls(info)
 
+    @classmethod
+    def from_file(cls, filename: os.PathLike, settings_path: os.PathLike = None):
+        """Creates the recipe from a JobInfo saved in any of the
+        supported file formats (JSON, JSON Lines or MessagePack)"""
+        info = JobInfo.from_file(filename)
+        return cls(info, settings_path=settings_path)
+
     def get_options(self):
         """Builds an options dictionary for recipes"""
         options = self.OPTIONS_CLS().model_dump()
         options = BaseOptions.dict_update(options, self.info.options)
         return options
 
-    def get_inputs(self):
-        return self.info.inputs
+    def iter_inputs(self) -> Iterator[dict]:
+        """Iterates over the inputs of the job. Inputs referring to a
+        `StructureStore` are expanded one structure at a time, so recipes
+        with many inputs should iterate over them instead of using
+        `get_inputs`."""
+        return self.info.iter_inputs()
+
+    def get_inputs(self) -> List[dict]:
+        """Returns all inputs of the job, reading the structures of the
+        stores they refer to at once"""
+        return list(self.iter_inputs())
 
     def get_done_job(self) -> dict:
         job = {k: self.info.job[k] for k in ["id", "uuid"] if k in self.info.job}
@@ -81,10 +119,14 @@ class PythonRecipe(Runnable):
         # from a yaml or anything that generates
         # an OrderedDict
         opts = self.get_options()
-        job["options"] = json.loads(json.dumps(opts))
+        job["options"] = as_builtins(opts)
         return job
 
-    def get_run_stats(self, duration: float, num_cores: bool = False) -> RunStatsInfo:
+    def get_run_stats(
+        self, duration: float, num_cores: bool = False, ngpus: int = 0
+    ) -> RunStatsInfo:
+        """Returns the statistics of the run, including the resources used
+        by the external program when they were measured by `run`"""
         ncores = os.cpu_count() if num_cores else 1
         host = socket.gethostname()
         cluster = socket.gethostbyname(host)
@@ -94,13 +136,21 @@ class PythonRecipe(Runnable):
             cluster=cluster[:64],
             duration=round(duration, 6),
             ncores=ncores,
-            ngpus=0,
+            ngpus=ngpus,
             pkgversion=self.get_version(),
+            timings=dict(self.tracer.timings) or None,
+            **self.usage.as_dict(),
         )
 
     def get_version(self):
+        """Returns the name and version of the package where the recipe
+        is defined, e.g. `mkite-core 25.11.3`"""
+        from importlib.metadata import distribution
+
         module_name = self.__module__.split(".")[0]
-        return str(get_distribution(module_name))
+        dist = distribution(module_name)
+        name = re.sub("[^A-Za-z0-9.]+", "-", dist.metadata["Name"])
+        return f"{name} {dist.version}"
 
     def handle_errors(self) -> JobInfo:
         """Handle errors that may have happened with the execution
@@ -135,24 +185,107 @@ class BaseRecipe(PythonRecipe):
         return runner.run()
 
     def postprocess(self, calcdir) -> JobResults:
+        """Parses the results in `calcdir` and saves them to the results
+        file. If the parser implements `iter_nodes` and the results are
+        saved as JSON Lines or MessagePack, each node is written as soon
+        as it is parsed, and the returned results do not contain the nodes
+        (they can be read with a `JobResultsReader`)."""
         parser = self.PARSER_CLS(calcdir)
+        path = os.path.join(calcdir, self.get_results_file())
+
+        if self.can_stream(parser):
+            return self.stream_results(parser, path)
+
         results = parser.parse()
 
         results = self.propagate_key(results, key="attributes")
         results.job = self.get_done_job()
-
-        results.to_json(os.path.join(calcdir, JobResults.file_name()))
+        results.runstats = self.get_runstats_dict(results.runstats)
+
+        # the references to the arrays are only written to the file,
+        # and the returned results keep the arrays
+        saved = results
+        if self.settings.BLOB_THRESHOLD is not None:
+            saved = results.save_arrays(
+                calcdir,
+                threshold=self.settings.BLOB_THRESHOLD,
+                fmt=self.settings.BLOB_FORMAT,
+            )
+
+        saved.to_file(path, level=self.settings.COMPRESSION_LEVEL)
         return results
 
-    def propagate_key(self, results: JobResults, key="attributes"):
-        """Propagates a key from the input to the output. By default, joins
-        all the keys from all inputs and places then into the output. Useful
-        when propagating information such as `attributes`"""
+    def get_results_file(self) -> str:
+        return JobResults.file_name(
+            self.settings.RESULTS_FORMAT, self.settings.RESULTS_COMPRESSION
+        )
 
+    def can_stream(self, parser: BaseParser) -> bool:
+        return (
+            self.settings.RESULTS_FORMAT in STREAM_FORMATS
+            and parser.can_iter_nodes()
+        )
+
+    def stream_results(self, parser: BaseParser, path: os.PathLike) -> JobResults:
+        """Writes the nodes yielded by `parser.iter_nodes` to `path` one
+        at a time. Returns the results without their nodes."""
+        from mkite_core.models.blobs import ArrayWriter
+
+        attrs = self.get_input_key("attributes")
+        runstats = self.get_runstats_dict(parser.get_runstats())
+
+        arrays = None
+        if self.settings.BLOB_THRESHOLD is not None:
+            arrays = ArrayWriter(
+                os.path.dirname(path),
+                "jobresults.arrays",
+                threshold=self.settings.BLOB_THRESHOLD,
+                fmt=self.settings.BLOB_FORMAT,
+            )
+
+        with JobResultsWriter(
+            path,
+            job=self.get_done_job(),
+            runstats=runstats,
+            level=self.settings.COMPRESSION_LEVEL,
+        ) as writer:
+            for node in parser.iter_nodes():
+                node.chemnode["attributes"] = {
+                    **attrs,
+                    **node.chemnode.get("attributes", {}),
+                }
+                if arrays is not None:
+                    node.calcnodes = arrays.externalize(node.calcnodes)
+
+                writer.write(node)
+
+        if arrays is not None:
+            arrays.close()
+
+        return writer.header
+
+    def get_runstats_dict(self, runstats: dict) -> dict:
+        """Adds the resources and timings measured by the recipe to the
+        run stats given by the parser"""
+        return {
+            **self.usage.as_dict(),
+            "timings": dict(self.tracer.timings),
+            **runstats,
+        }
+
+    def get_input_key(self, key="attributes") -> dict:
+        """Joins the values of `key` of all inputs"""
         attrs = {}
         for inp in self.info.inputs:
             attrs = {**attrs, **inp.get(key, {})}
 
+        return attrs
+
+    def propagate_key(self, results: JobResults, key="attributes"):
+        """Propagates a key from the input to the output. By default, joins
+        all the keys from all inputs and places then into the output. Useful
+        when propagating information such as `attributes`"""
+        attrs = self.get_input_key(key)
         for node_results in results.nodes:
             node_results.chemnode[key] = {**attrs, **node_results.chemnode.get(key, {})}
 
@@ -171,17 +304,34 @@ class BaseRecipe(PythonRecipe):
         return name
 
     def run(self) -> JobResults:
+        """Runs the recipe. The wall time of each phase is saved in
+        `runstats["timings"]` of the returned results. The results file
+        is written during `postprocess`, and thus only contains the
+        timings of the phases before it."""
         basedir = self.pwd()
-        workdir = self.get_workdir()
-        self.setup(workdir)
+        results = None
+        with self.tracer.phase("workdir"):
+            workdir = self.get_workdir()
+
+        with self.tracer.phase("setup"):
+            self.setup(workdir)
+
         with tempfile.TemporaryDirectory(
             prefix=f"{self.info.folder_name}_",
             dir=self.get_scratch(),
         ) as tempdir:
             try:
-                self.to_folder(workdir, tempdir)
-                self.run_job()
-                results = self.postprocess(tempdir)
+                with self.tracer.phase("copy_in"):
+                    self.to_folder(workdir, tempdir)
+
+                with self.tracer.phase("run_job"), self.usage:
+                    self.run_job()
+
+                with self.tracer.phase("postprocess"):
+                    results = self.postprocess(tempdir)
+
+                # the results file is copied back to the workdir
+                self.results_path = os.path.join(workdir, self.get_results_file())
 
                 if hasattr(results, "workdir"):
                     results.workdir = workdir
@@ -191,8 +341,13 @@ class BaseRecipe(PythonRecipe):
                 results = None
 
             finally:
-                self.to_folder(tempdir, workdir)
+                with self.tracer.phase("copy_back"):
+                    self.to_folder(tempdir, workdir)
+
                 os.chdir(basedir)
+                if results is not None:
+                    results.runstats["timings"] = dict(self.tracer.timings)
+
                 return results
 
     def get_existing_scratch(self, abspath: bool = True) -> List[str]:
@@ -226,7 +381,7 @@ class BaseRecipe(PythonRecipe):
             # could not find any information about temporary
             # files for the job. Return the existing job as
             # an error
-            info = self.info.copy()
+            info = self.info.copy(deepcopy=True)
             info.job["status"] = Status.ERROR.value
             return info
 
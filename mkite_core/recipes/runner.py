@@ -1,24 +1,192 @@
+import os
+import shlex
+import signal
 import subprocess
+import threading
 from abc import ABC, abstractmethod
+from typing import List
 from .settings import EnvSettings
 
 
+CHUNK_SIZE = 2**16
+TAIL_SIZE = 2**16
+
+
+class OutputTail:
+    """Keeps the last `size` bytes written to it"""
+
+    def __init__(self, size: int = TAIL_SIZE):
+        self.size = size
+        self._buffer = bytearray()
+
+    def write(self, data: bytes):
+        self._buffer += data
+        if len(self._buffer) > self.size:
+            del self._buffer[: -self.size]
+
+    def getvalue(self) -> bytes:
+        return bytes(self._buffer)
+
+
 class BaseRunner(ABC):
+    """Runs the external program of a recipe. Its standard output is
+    streamed to the file `stdout`, and only the last `tail_size` bytes
+    are kept in memory (as the `stdout` of the returned CompletedProcess).
+
+    If `timeout` (in seconds) is given, the process receives a SIGTERM
+    when the timeout expires and, if it is still running `kill_timeout`
+    seconds later, a SIGKILL. A `subprocess.TimeoutExpired` is then raised.
+    By default, the timeout is taken from `settings.RUNNER_TIMEOUT`. The
+    program runs in its own session, so that the signals also reach the
+    processes it starts (e.g. the ranks launched by `mpirun`).
+
+    As the program is not in the process group of the caller, signals sent
+    to the foreground group (e.g. Ctrl-C in a terminal) do not reach it.
+    Instead, if running the program is interrupted (e.g. by a
+    KeyboardInterrupt or by cancelling `arun`), the runner terminates it
+    as when the timeout expires. Schedulers should signal the Python
+    process, not only its group.
+    """
+
     def __init__(
         self,
         settings: EnvSettings,
         stdout: str = "stdout.out",
         stderr: str = "stderr.out",
+        timeout: float = None,
+        kill_timeout: float = 10.0,
+        tail_size: int = TAIL_SIZE,
     ):
         self.settings = settings
         self.stdout = stdout
         self.stderr = stderr
+        self.timeout = timeout or getattr(settings, "RUNNER_TIMEOUT", None)
+        self.kill_timeout = kill_timeout
+        self.tail_size = tail_size
 
     @property
     @abstractmethod
     def cmd(self):
         """Command used to execute the runner"""
 
-    def run(self):
-        with open(self.stderr, "w", buffering=1) as err:
-            return subprocess.run(self.cmd, stdout=subprocess.PIPE, stderr=err)
+    def get_args(self) -> List[str]:
+        """Returns `cmd` as a list of arguments. Commands given as a string
+        are split as in a shell, but are not run in a shell."""
+        if isinstance(self.cmd, str):
+            return shlex.split(self.cmd)
+
+        return list(self.cmd)
+
+    @staticmethod
+    def send_signal(proc, sig: int):
+        """Sends `sig` to the process group of `proc`, if it still exists"""
+        try:
+            os.killpg(proc.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def terminate(self, proc: subprocess.Popen):
+        """Sends SIGTERM to `proc` and, if it does not exit within
+        `kill_timeout` seconds, SIGKILL"""
+        self.send_signal(proc, signal.SIGTERM)
+        try:
+            proc.wait(self.kill_timeout)
+        except subprocess.TimeoutExpired:
+            self.send_signal(proc, signal.SIGKILL)
+
+    def run(self) -> subprocess.CompletedProcess:
+        tail = OutputTail(self.tail_size)
+
+        with open(self.stdout, "wb") as out, open(self.stderr, "w", buffering=1) as err:
+            proc = subprocess.Popen(
+                self.get_args(),
+                stdout=subprocess.PIPE,
+                stderr=err,
+                start_new_session=True,
+            )
+
+            timed_out = threading.Event()
+
+            def on_timeout():
+                if proc.poll() is None:
+                    timed_out.set()
+                    self.terminate(proc)
+
+            timer = None
+            if self.timeout is not None:
+                timer = threading.Timer(self.timeout, on_timeout)
+                timer.daemon = True
+                timer.start()
+
+            try:
+                while chunk := proc.stdout.read1(CHUNK_SIZE):
+                    out.write(chunk)
+                    tail.write(chunk)
+
+                proc.wait()
+            finally:
+                if timer is not None:
+                    timer.cancel()
+
+                # e.g. KeyboardInterrupt, which does not reach the session
+                if proc.poll() is None:
+                    self.terminate(proc)
+
+                proc.stdout.close()
+
+        return self._completed(proc.returncode, tail, timed_out=timed_out.is_set())
+
+    def _completed(
+        self, returncode: int, tail: OutputTail, timed_out: bool = False
+    ) -> subprocess.CompletedProcess:
+        if timed_out:
+            raise subprocess.TimeoutExpired(
+                self.cmd, self.timeout, output=tail.getvalue()
+            )
+
+        return subprocess.CompletedProcess(self.cmd, returncode, stdout=tail.getvalue())
+
+    async def arun(self) -> subprocess.CompletedProcess:
+        """Runs the command without blocking the event loop. Behaves
+        as `run`, including the streaming of the output and the timeout."""
+        import asyncio
+
+        tail = OutputTail(self.tail_size)
+
+        with open(self.stdout, "wb") as out, open(self.stderr, "w", buffering=1) as err:
+            proc = await asyncio.create_subprocess_exec(
+                *self.get_args(),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=err,
+                start_new_session=True,
+            )
+
+            async def communicate():
+                while chunk := await proc.stdout.read(CHUNK_SIZE):
+                    out.write(chunk)
+                    tail.write(chunk)
+
+                return await proc.wait()
+
+            try:
+                returncode = await asyncio.wait_for(communicate(), self.timeout)
+            except asyncio.TimeoutError:
+                await self.aterminate(proc)
+                return self._completed(proc.returncode, tail, timed_out=True)
+            finally:
+                # e.g. the task was cancelled
+                if proc.returncode is None:
+                    await self.aterminate(proc)
+
+        return self._completed(returncode, tail)
+
+    async def aterminate(self, proc: "asyncio.subprocess.Process"):
+        """Same as `terminate`, but for processes started by `arun`"""
+        import asyncio
+
+        self.send_signal(proc, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(proc.wait(), self.kill_timeout)
+        except asyncio.TimeoutError:
+            self.send_signal(proc, signal.SIGKILL)
+            await proc.wait()
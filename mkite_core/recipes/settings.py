@@ -1,3 +1,4 @@
+from typing import Literal, Optional
 from pydantic import Field, DirectoryPath, FilePath
 from mkite_core.external import load_config
 from pydantic_settings import BaseSettings
@@ -10,6 +11,41 @@ class EnvSettings(BaseSettings):
         ".",
         description="Root directory for all temporary files and calculations",
     )
+    RESULTS_FORMAT: Literal["json", "jsonl", "msgpack"] = Field(
+        "json",
+        description="File format used to save the results of the recipes",
+    )
+    RESULTS_COMPRESSION: Optional[Literal["gzip", "xz", "zstd"]] = Field(
+        None,
+        description="Compression of the results of the recipes",
+    )
+    COMPRESSION_LEVEL: Optional[int] = Field(
+        None,
+        description="Compression level of the results. Defaults to the\
+            default level of each compression library",
+    )
+    BLOB_THRESHOLD: Optional[int] = Field(
+        None,
+        description="If given, numeric arrays in the results with at least\
+            this number of bytes are saved to binary files next to the\
+            results file",
+    )
+    BLOB_FORMAT: Literal["npy", "npz"] = Field(
+        "npy",
+        description="Format of the binary files with large arrays",
+    )
+
+    RUNNER_TIMEOUT: Optional[float] = Field(
+        None,
+        description="Maximum wall time (in seconds) of the external programs\
+            run by the recipes. If not given, there is no limit",
+    )
+
+    TRACE_FILE: Optional[str] = Field(
+        None,
+        description="JSON Lines file where the start and end of each phase\
+            of the recipes are appended. If not given, phases are only timed",
+    )
 
     @classmethod
     def from_file(cls, filename: FilePath):
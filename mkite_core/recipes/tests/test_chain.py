@@ -1,14 +1,17 @@
+import io
 import os
 import json
 import unittest as ut
 from pathlib import Path
+from contextlib import redirect_stderr
 from unittest.mock import patch, MagicMock
 from pkg_resources import resource_filename
 
-from mkite_core.models import JobInfo, JobResults
+from mkite_core.models import JobInfo, JobResults, NodeResults
 from mkite_core.tests.tempdirs import run_in_tempdir
-from mkite_core.recipes import BaseRecipe, RecipeChain, BaseRunner, BaseParser
-from mkite_core.recipes.pipes import JobPipe
+from mkite_core.recipes import BaseRecipe, RecipeChain, RecipeGraph
+from mkite_core.recipes import BaseRunner, BaseParser
+from mkite_core.recipes.pipes import JobPipe, CopyWorkdirPipe
 
 
 INFO_FILE = resource_filename("mkite_core.tests.files", "jobinfo.json")
@@ -42,6 +45,8 @@ class MockRecipe(BaseRecipe):
             "duration": 5,
             "ncores": 1,
             "ngpus": 0,
+            "maxrss": 100,
+            "cpu_user": 4.0,
         }
         results = JobResults(
             job={"id": 1},
@@ -72,3 +77,130 @@ class TestChain(ut.TestCase):
 
         duration = results.runstats["duration"]
         self.assertEqual(duration, 10)
+        self.assertEqual(results.runstats["maxrss"], 100)
+        self.assertEqual(results.runstats["cpu_user"], 8.0)
+
+
+class MockNodeRecipe(MockRecipe):
+    def run(self):
+        results = super().run()
+        results.nodes = [NodeResults(chemnode={"cwd": os.getcwd()})]
+        return results
+
+
+class MockFailedRecipe(MockRecipe):
+    def run(self):
+        return None
+
+
+class MockRaisingRecipe(MockRecipe):
+    def run(self):
+        raise RuntimeError("failed recipe")
+
+
+class MockGraph(RecipeGraph):
+    NODES = {
+        "relax": MockRecipe,
+        "next": MockJobPipe,
+        "phonons": MockNodeRecipe,
+        "bands": MockNodeRecipe,
+    }
+    DEPENDENCIES = {"next": "relax", "phonons": "next", "bands": "next"}
+
+
+class MockWorkdirRecipe(MockRecipe):
+    def run(self):
+        results = super().run()
+        workdir = self.get_workdir()
+        os.makedirs(workdir, exist_ok=True)
+        Path(workdir, self.__class__.__name__).touch()
+
+        files = sorted(os.listdir(workdir))
+        results.nodes = [NodeResults(chemnode={"files": files})]
+        results.workdir = workdir
+        return results
+
+
+class MockWorkdirGraph(RecipeGraph):
+    NODES = {
+        "relax": MockWorkdirRecipe,
+        "next": CopyWorkdirPipe,
+        "phonons": MockWorkdirRecipe,
+        "bands": MockWorkdirRecipe,
+    }
+    DEPENDENCIES = {"next": "relax", "phonons": "next", "bands": "next"}
+
+
+class TestGraph(ut.TestCase):
+    def setUp(self):
+        self.info = JobInfo.from_json(INFO_FILE)
+
+    def test_order(self):
+        graph = MockGraph(self.info)
+        order = graph.get_order()
+        self.assertEqual(order[:2], ["relax", "next"])
+        self.assertEqual(graph.get_children("next"), ["phonons", "bands"])
+
+        graph.DEPENDENCIES = {"relax": "next", "next": "relax"}
+        with self.assertRaises(ValueError):
+            graph.get_order()
+
+        graph.DEPENDENCIES = {"phonons": "next"}
+        with self.assertRaises(ValueError):
+            graph.get_order()
+
+    @run_in_tempdir
+    def test_run(self):
+        graph = MockGraph(self.info, n_workers=2)
+        results = graph.run()
+
+        self.assertEqual(results.runstats["duration"], 15)
+        self.assertEqual(results.runstats["cpu_user"], 12.0)
+        folders = sorted(os.path.basename(n.chemnode["cwd"]) for n in results.nodes)
+        self.assertEqual(folders, ["bands", "phonons"])
+        self.assertTrue(os.path.isdir("relax"))
+
+    @run_in_tempdir
+    def test_workdir(self):
+        graph = MockWorkdirGraph(self.info, n_workers=2)
+        results = graph.run()
+
+        self.assertEqual(len(results.nodes), 2)
+        for node in results.nodes:
+            self.assertEqual(node.chemnode["files"], ["MockWorkdirRecipe"])
+
+    @run_in_tempdir
+    def test_from_file(self):
+        self.info.to_json("jobinfo.json")
+        graph = MockGraph.from_file("jobinfo.json", n_workers=2)
+        self.assertEqual(graph.n_workers, 2)
+
+    @run_in_tempdir
+    def test_failed(self):
+        graph = MockGraph(self.info, n_workers=2)
+        graph.NODES = {**MockGraph.NODES, "relax": MockFailedRecipe}
+        self.assertIsNone(graph.run())
+        self.assertFalse(os.path.exists("phonons"))
+
+    @run_in_tempdir
+    def test_raised(self):
+        graph = MockGraph(self.info, n_workers=2)
+        graph.NODES = {**MockGraph.NODES, "bands": MockRaisingRecipe}
+        with redirect_stderr(io.StringIO()) as err:
+            self.assertIsNone(graph.run())
+
+        self.assertIn("failed recipe", err.getvalue())
+        self.assertTrue(os.path.isdir("phonons"))
+
+    def test_combine_results(self):
+        graph = MockGraph(self.info)
+        first = JobResults(job={"id": 1}, nodes=[NodeResults(chemnode={"i": 1})])
+        second = JobResults(job={"id": 2}, nodes=[NodeResults(chemnode={"i": 2})])
+
+        results = graph.combine_results({"bands": second, "phonons": first})
+        self.assertEqual(results.job, {"id": 1})
+        self.assertEqual([n.chemnode["i"] for n in results.nodes], [1, 2])
+
+        results = graph.combine_results({})
+        self.assertEqual(results.job["status"], "D")
+        self.assertEqual(results.nodes, [])
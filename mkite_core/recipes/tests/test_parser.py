@@ -1,5 +1,6 @@
 import os
 import json
+import importlib.util
 import unittest as ut
 from unittest.mock import patch
 
@@ -32,3 +33,17 @@ class TestParser(ut.TestCase):
             data = json.load(f)
 
         self.assertEqual(data, test)
+
+    @run_in_tempdir
+    def test_compressed_json(self):
+        test = {"test": 1}
+        for name in ["test_file.json.gz", "test_file.json.xz"]:
+            self.parser.to_json(test, name)
+            self.assertEqual(self.parser.load_json(name), test)
+
+    @ut.skipUnless(importlib.util.find_spec("zstandard"), "zstandard is not installed")
+    @run_in_tempdir
+    def test_zstd_json(self):
+        test = {"test": 1}
+        self.parser.to_json(test, "test_file.json.zst")
+        self.assertEqual(self.parser.load_json("test_file.json.zst"), test)
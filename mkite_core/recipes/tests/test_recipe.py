@@ -5,8 +5,12 @@ from pathlib import Path
 from unittest.mock import patch, MagicMock
 from pkg_resources import resource_filename
 
-from mkite_core.models import JobInfo
+import numpy as np
+
+from mkite_core.models import JobInfo, JobResults, JobResultsReader, NodeResults
 from mkite_core.tests.tempdirs import run_in_tempdir
+from mkite_core.recipes.parser import BaseParser
+from mkite_core.recipes.pipes import SaveResultsPipe
 from mkite_core.recipes.recipe import BaseRecipe, BaseOptions
 
 
@@ -61,11 +65,17 @@ class TestRecipe(ut.TestCase):
         mock_obj = mock_cls.return_value
         self.assertTrue(mock_obj.parse.called)
 
+    def test_done_job(self):
+        self.recipe.get_options = MagicMock(return_value={"kpts": {1: np.ones(2)}})
+        job = self.recipe.get_done_job()
+        self.assertEqual(job["options"], {"kpts": {"1": [1.0, 1.0]}})
+
     def test_options(self):
         self.assertEqual(self.recipe.get_options(), INFO.options)
 
     def test_inputs(self):
         self.assertEqual(self.recipe.get_inputs(), INFO.inputs)
+        self.assertEqual(list(self.recipe.iter_inputs()), INFO.inputs)
 
     def test_scratch(self):
         d = self.recipe.get_scratch()
@@ -90,3 +100,85 @@ class TestRecipe(ut.TestCase):
 
         mock_cls = self.recipe.PARSER_CLS
         self.assertTrue(mock_cls.called)
+
+
+class MockStreamParser(BaseParser):
+    def parse(self):
+        return JobResults(job={}, nodes=list(self.iter_nodes()))
+
+    def iter_nodes(self):
+        for i in range(3):
+            yield NodeResults(chemnode={"idx": i}, calcnodes=[{"energy": -i}])
+
+
+class TestStreamResults(ut.TestCase):
+    @patch.dict(os.environ, {**ENVIRONMENT, "RESULTS_FORMAT": "jsonl"})
+    def setUp(self):
+        self.recipe = MockRecipe(INFO)
+        self.recipe.PARSER_CLS = MockStreamParser
+        self.recipe.OPTIONS_CLS = MockOptions
+
+    def test_can_iter_nodes(self):
+        self.assertTrue(MockStreamParser.can_iter_nodes())
+        self.assertFalse(BaseParser.can_iter_nodes())
+
+    @run_in_tempdir
+    def test_postprocess(self):
+        results = self.recipe.postprocess(".")
+        self.assertEqual(results.nodes, [])
+        self.assertIn("host", results.runstats)
+
+        reader = JobResultsReader(JobResults.file_name("jsonl"))
+        self.assertTrue(reader.is_stream)
+        nodes = list(reader)
+        self.assertEqual([n.chemnode["idx"] for n in nodes], [0, 1, 2])
+        self.assertEqual(nodes[0].chemnode["attributes"], {})
+
+    @run_in_tempdir
+    def test_results_path(self):
+        self.recipe.RUNNER_CLS = MagicMock()
+        self.assertIsNone(self.recipe.results_path)
+
+        results = self.recipe.run()
+        self.assertEqual(results.nodes, [])
+        self.assertEqual(
+            self.recipe.results_path,
+            os.path.join(results.workdir, "jobresults.jsonl"),
+        )
+        self.assertEqual(len(list(JobResultsReader(self.recipe.results_path))), 3)
+
+    @run_in_tempdir
+    @patch.dict(os.environ, {**ENVIRONMENT, "RESULTS_FORMAT": "json"})
+    def test_not_streamed(self):
+        self.recipe.settings = self.recipe._load_settings()
+        results = self.recipe.postprocess(".")
+        self.assertEqual(len(results.nodes), 3)
+
+
+class MockArrayParser(BaseParser):
+    def parse(self):
+        node = NodeResults(chemnode={}, calcnodes=[{"forces": np.ones((100, 3))}])
+        return JobResults(job={}, nodes=[node])
+
+
+class TestSaveArrays(ut.TestCase):
+    @patch.dict(os.environ, {**ENVIRONMENT, "BLOB_THRESHOLD": "1000"})
+    def setUp(self):
+        self.recipe = MockRecipe(INFO)
+        self.recipe.PARSER_CLS = MockArrayParser
+        self.recipe.OPTIONS_CLS = MockOptions
+
+    @run_in_tempdir
+    def test_postprocess(self):
+        os.mkdir("calc")
+        results = self.recipe.postprocess("calc")
+        forces = results.nodes[0].calcnodes[0]["forces"]
+        self.assertIsInstance(forces, np.ndarray)
+        self.assertTrue(os.path.exists("calc/jobresults.arrays.0.npy"))
+
+        saved = JobResults.from_file("calc/jobresults.json")
+        self.assertTrue(np.array_equal(saved.nodes[0].calcnodes[0]["forces"], forces))
+
+        SaveResultsPipe(INFO, results).run()
+        new = JobResults.from_file("jobresults.json")
+        self.assertTrue(np.array_equal(new.nodes[0].calcnodes[0]["forces"], forces))
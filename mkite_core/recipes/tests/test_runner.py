@@ -1,9 +1,12 @@
 import os
+import time
+import asyncio
+import subprocess
 import unittest as ut
 from unittest.mock import patch
 
 from mkite_core.tests.tempdirs import run_in_tempdir
-from mkite_core.recipes.runner import BaseRunner
+from mkite_core.recipes.runner import BaseRunner, OutputTail
 from mkite_core.recipes.settings import EnvSettings
 
 
@@ -13,6 +16,36 @@ class MockRunner(BaseRunner):
         return ["echo", "test"]
 
 
+class LongRunner(BaseRunner):
+    @property
+    def cmd(self):
+        return ["sh", "-c", 'for i in $(seq 1000); do echo "line $i"; done']
+
+
+class StringRunner(BaseRunner):
+    @property
+    def cmd(self):
+        return "echo 'test string'"
+
+
+class SleepRunner(BaseRunner):
+    @property
+    def cmd(self):
+        return ["sleep", "10"]
+
+
+class PidRunner(BaseRunner):
+    @property
+    def cmd(self):
+        return ["sh", "-c", "echo $$; exec sleep 10"]
+
+
+class TrapRunner(BaseRunner):
+    @property
+    def cmd(self):
+        return ["sh", "-c", 'trap "" TERM; sleep 10']
+
+
 class TestRunner(ut.TestCase):
     def setUp(self):
         self.runner = MockRunner(settings=EnvSettings())
@@ -24,3 +57,93 @@ class TestRunner(ut.TestCase):
 
         self.assertEqual(out, "test\n")
         self.assertTrue(os.path.exists("./stderr.out"))
+
+    @run_in_tempdir
+    def test_stdout_file(self):
+        results = self.runner.run()
+        with open("stdout.out", "r") as f:
+            self.assertEqual(f.read(), "test\n")
+
+        self.assertEqual(results.returncode, 0)
+
+    @run_in_tempdir
+    def test_tail(self):
+        runner = LongRunner(settings=EnvSettings(), tail_size=10)
+        results = runner.run()
+
+        self.assertEqual(results.stdout, b"line 1000\n")
+        self.assertEqual(os.path.getsize("stdout.out"), 8893)
+
+    @run_in_tempdir
+    def test_timeout(self):
+        runner = SleepRunner(settings=EnvSettings(), timeout=0.2, kill_timeout=0.2)
+        with self.assertRaises(subprocess.TimeoutExpired):
+            runner.run()
+
+    @run_in_tempdir
+    def test_timeout_kill(self):
+        runner = TrapRunner(settings=EnvSettings(), timeout=0.5, kill_timeout=0.2)
+        start = time.perf_counter()
+        with self.assertRaises(subprocess.TimeoutExpired):
+            runner.run()
+
+        self.assertLess(time.perf_counter() - start, 5)
+
+    @run_in_tempdir
+    def test_arun(self):
+        results = asyncio.run(self.runner.arun())
+        self.assertEqual(results.stdout, b"test\n")
+        with open("stdout.out", "r") as f:
+            self.assertEqual(f.read(), "test\n")
+
+        runner = SleepRunner(settings=EnvSettings(), timeout=0.2, kill_timeout=0.2)
+        with self.assertRaises(subprocess.TimeoutExpired):
+            asyncio.run(runner.arun())
+
+    @run_in_tempdir
+    def test_string_cmd(self):
+        runner = StringRunner(settings=EnvSettings())
+        self.assertEqual(runner.get_args(), ["echo", "test string"])
+        self.assertEqual(runner.run().stdout, b"test string\n")
+        self.assertEqual(asyncio.run(runner.arun()).stdout, b"test string\n")
+
+    def assertNotRunning(self, pid: int):
+        with self.assertRaises(ProcessLookupError):
+            os.kill(pid, 0)
+
+    @run_in_tempdir
+    def test_interrupt(self):
+        runner = PidRunner(settings=EnvSettings(), kill_timeout=0.2)
+        pids = []
+
+        def interrupt(tail, data):
+            pids.append(int(data))
+            raise KeyboardInterrupt
+
+        with patch.object(OutputTail, "write", interrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                runner.run()
+
+        self.assertNotRunning(pids[0])
+
+    @run_in_tempdir
+    def test_arun_cancel(self):
+        runner = PidRunner(settings=EnvSettings(), kill_timeout=0.2)
+        pids = []
+
+        async def cancel():
+            task = asyncio.create_task(runner.arun())
+            await asyncio.sleep(0.5)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with patch.object(OutputTail, "write", lambda t, data: pids.append(int(data))):
+            asyncio.run(cancel())
+
+        self.assertNotRunning(pids[0])
+
+    @patch.dict(os.environ, {"RUNNER_TIMEOUT": "3.5"})
+    def test_settings_timeout(self):
+        runner = MockRunner(settings=EnvSettings())
+        self.assertEqual(runner.timeout, 3.5)
@@ -0,0 +1,109 @@
+import os
+import json
+import unittest as ut
+from unittest.mock import patch, MagicMock
+from pkg_resources import resource_filename
+
+from mkite_core.models import JobInfo, JobResults
+from mkite_core.tests.tempdirs import run_in_tempdir
+from mkite_core.recipes.recipe import BaseRecipe
+from mkite_core.recipes.tracing import Tracer, JsonlTraceSink
+from mkite_core.recipes.tracing import register_callback, unregister_callback
+
+
+INFO_FILE = resource_filename("mkite_core.tests.files", "jobinfo.json")
+INFO = JobInfo.from_json(INFO_FILE)
+
+PHASES = ["workdir", "setup", "copy_in", "run_job", "postprocess", "copy_back"]
+
+
+class MockRecipe(BaseRecipe):
+    def setup(self, workdir):
+        if not os.path.exists(workdir):
+            os.mkdir(workdir)
+
+    def get_options(self):
+        return {}
+
+    def postprocess(self, calcdir) -> JobResults:
+        return JobResults(job={"status": "D"}, runstats=self.tracer.timings.copy())
+
+
+class TestTracer(ut.TestCase):
+    def setUp(self):
+        self.events = []
+        self.tracer = Tracer("Recipe", job="uuid", callbacks=[self.events.append])
+
+    def test_phase(self):
+        for _ in range(2):
+            with self.tracer.phase("copy_in"):
+                pass
+
+        self.assertEqual(list(self.tracer.timings), ["copy_in"])
+        self.assertEqual([e.event for e in self.events], ["start", "end"] * 2)
+        self.assertEqual(self.events[0].job, "uuid")
+        self.assertIsNone(self.events[1].error)
+        self.assertGreaterEqual(self.events[1].duration, 0)
+
+    def test_error(self):
+        with self.assertRaises(KeyError):
+            with self.tracer.phase("run_job"):
+                raise KeyError("test")
+
+        self.assertIn("run_job", self.tracer.timings)
+        self.assertEqual(self.events[-1].error, "KeyError")
+
+    def test_failed_callback(self):
+        def fail(event):
+            raise ValueError("sink failed")
+
+        self.tracer.callbacks = [fail]
+        with self.assertWarns(UserWarning):
+            with self.tracer.phase("setup"):
+                pass
+
+    def test_register(self):
+        events = []
+        register_callback(events.append)
+        try:
+            with Tracer("Recipe").phase("setup"):
+                pass
+        finally:
+            unregister_callback(events.append)
+
+        self.assertEqual(len(events), 2)
+
+        with Tracer("Recipe").phase("setup"):
+            pass
+
+        self.assertEqual(len(events), 2)
+
+    @run_in_tempdir
+    def test_jsonl_sink(self):
+        self.tracer.callbacks = [JsonlTraceSink("trace.jsonl")]
+        with self.tracer.phase("setup"):
+            pass
+
+        with open("trace.jsonl") as f:
+            lines = [json.loads(line) for line in f]
+
+        self.assertEqual([line["event"] for line in lines], ["start", "end"])
+        self.assertEqual(lines[1]["phase"], "setup")
+
+
+class TestRecipeTracing(ut.TestCase):
+    @run_in_tempdir
+    @patch.dict(os.environ, {"SCRATCH_DIR": ".", "TRACE_FILE": "trace.jsonl"})
+    def test_run(self):
+        recipe = MockRecipe(INFO)
+        recipe.RUNNER_CLS = MagicMock()
+        results = recipe.run()
+
+        self.assertEqual(list(results.runstats["timings"]), PHASES)
+
+        with open("trace.jsonl") as f:
+            lines = [json.loads(line) for line in f]
+
+        ends = [line["phase"] for line in lines if line["event"] == "end"]
+        self.assertEqual(ends, PHASES)
+        self.assertTrue(all(line["job"] == INFO.job["uuid"] for line in lines))
@@ -0,0 +1,48 @@
+import sys
+import subprocess
+import unittest as ut
+from unittest.mock import patch
+
+from mkite_core.tests.tempdirs import run_in_tempdir
+from mkite_core.recipes.usage import ChildUsage, read_proc_io
+
+
+BUSY_SCRIPT = """
+import time
+data = bytearray(50 * 2**20)
+start = time.process_time()
+while time.process_time() - start < 0.2:
+    pass
+"""
+
+
+class TestChildUsage(ut.TestCase):
+    @run_in_tempdir
+    def test_usage(self):
+        with ChildUsage() as usage:
+            subprocess.run([sys.executable, "-c", BUSY_SCRIPT], check=True)
+
+        stats = usage.as_dict()
+        self.assertGreaterEqual(stats["cpu_user"] + stats["cpu_system"], 0.2)
+        self.assertGreaterEqual(stats["read_bytes"], 0)
+        self.assertGreaterEqual(stats["write_bytes"], 0)
+        if stats["maxrss"] is not None:
+            self.assertGreater(stats["maxrss"], 50 * 2**20)
+
+    def test_no_children(self):
+        with ChildUsage() as usage:
+            pass
+
+        stats = usage.as_dict()
+        self.assertIsNone(stats["maxrss"])
+        self.assertEqual(stats["cpu_user"], 0)
+
+    def test_read_proc_io(self):
+        self.assertIsNone(read_proc_io("/nonexistent/io"))
+
+    @patch("mkite_core.recipes.usage.resource", None)
+    def test_unavailable(self):
+        with ChildUsage() as usage:
+            pass
+
+        self.assertEqual(usage.as_dict(), {})
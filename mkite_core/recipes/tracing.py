@@ -0,0 +1,134 @@
+"""Hooks to follow the phases of the recipes (e.g. staging the files in
+the scratch folder or running the external program). Each phase is timed
+and, if callbacks are registered, reported to them as `PhaseEvent`s.
+
+Example:
+    from mkite_core.recipes.tracing import JsonlTraceSink, register_callback
+
+    register_callback(JsonlTraceSink("trace.jsonl"))
+"""
+
+import os
+import time
+import warnings
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+import msgspec as msg
+
+from mkite_core.models.base import get_encoder
+
+
+class PhaseEvent(msg.Struct):
+    """Start or end of a phase of a recipe. `time` is the Unix time of
+    the event. Events of type "end" also contain the `duration` of the
+    phase (in seconds) and, if the phase failed, the name of the `error`."""
+
+    recipe: str
+    job: Optional[str]
+    phase: str
+    event: str
+    time: float
+    duration: Optional[float] = None
+    error: Optional[str] = None
+
+
+TraceCallback = Callable[[PhaseEvent], None]
+
+_CALLBACKS: List[TraceCallback] = []
+
+
+def register_callback(callback: TraceCallback) -> TraceCallback:
+    """Registers a callback called with the events of all recipes of
+    this process. Can be used as a decorator."""
+    if callback not in _CALLBACKS:
+        _CALLBACKS.append(callback)
+
+    return callback
+
+
+def unregister_callback(callback: TraceCallback):
+    if callback in _CALLBACKS:
+        _CALLBACKS.remove(callback)
+
+
+class Tracer:
+    """Measures the wall time of the phases of a recipe. Phases that run
+    more than once are summed in `timings`. Callbacks are called with the
+    start and end of each phase. The global callbacks are called before
+    the ones given to the tracer. Errors raised by callbacks are turned
+    into warnings, so that tracing never stops a recipe."""
+
+    def __init__(
+        self,
+        recipe: str,
+        job: str = None,
+        callbacks: List[TraceCallback] = None,
+    ):
+        self.recipe = recipe
+        self.job = job
+        self.callbacks = list(callbacks or [])
+        self.timings: Dict[str, float] = {}
+
+    def get_callbacks(self) -> List[TraceCallback]:
+        return [*_CALLBACKS, *self.callbacks]
+
+    def emit(self, callbacks: List[TraceCallback], event: PhaseEvent):
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                warnings.warn(f"Trace callback {callback} failed: {e!r}")
+
+    def event(self, phase: str, event: str, **kwargs) -> PhaseEvent:
+        return PhaseEvent(
+            recipe=self.recipe,
+            job=self.job,
+            phase=phase,
+            event=event,
+            time=time.time(),
+            **kwargs,
+        )
+
+    @contextmanager
+    def phase(self, name: str):
+        callbacks = self.get_callbacks()
+        if callbacks:
+            self.emit(callbacks, self.event(name, "start"))
+
+        error = None
+        start = time.perf_counter()
+        try:
+            yield
+
+        except BaseException as e:
+            error = e.__class__.__name__
+            raise
+
+        finally:
+            duration = time.perf_counter() - start
+            self.timings[name] = round(self.timings.get(name, 0) + duration, 6)
+
+            if callbacks:
+                event = self.event(
+                    name, "end", duration=round(duration, 6), error=error
+                )
+                self.emit(callbacks, event)
+
+
+class JsonlTraceSink:
+    """Callback that appends each event as a line of a JSON Lines file.
+    Each line is written at once in append mode, so several processes
+    can share the same file."""
+
+    def __init__(self, path: os.PathLike):
+        # recipes change the working directory when running
+        self.path = os.path.abspath(path)
+
+    def __call__(self, event: PhaseEvent):
+        line = get_encoder("json").encode(event) + b"\n"
+        with open(self.path, "ab") as f:
+            f.write(line)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.path!r})"
@@ -0,0 +1,95 @@
+"""Measures the resources used by the processes that a recipe runs, such
+as the external program started by its runner."""
+
+import sys
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+# ru_maxrss is given in kilobytes on Linux and in bytes on macOS
+MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
+BLOCK_SIZE = 512
+
+
+def read_proc_io(path: str = "/proc/self/io") -> Optional[Dict[str, int]]:
+    """Returns the bytes read from and written to storage by the current
+    process, including its children that already exited. Returns None if
+    `/proc` is not available."""
+    try:
+        with open(path, "r") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+
+    counters = dict(line.split(": ") for line in lines if ": " in line)
+    return {k: int(counters[k]) for k in ["read_bytes", "write_bytes"]}
+
+
+class ChildUsage:
+    """Measures the CPU time, peak memory and I/O of the child processes
+    finished while the context is active. CPU times are taken from
+    `getrusage(RUSAGE_CHILDREN)` and I/O from `/proc/self/io` or, if it is
+    not available, from the number of blocks reported by `getrusage`.
+
+    The peak RSS of the children is a maximum over the lifetime of the
+    current process. It is only reported when it grows inside the context,
+    and is None if an earlier child used more memory.
+
+    Example:
+        with ChildUsage() as usage:
+            runner.run()
+
+        stats = usage.as_dict()
+    """
+
+    def __init__(self):
+        self._rusage = None
+        self._io = None
+        self.stats = {}
+
+    def start(self):
+        if resource is not None:
+            self._rusage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        self._io = read_proc_io()
+        return self
+
+    def stop(self) -> dict:
+        if self._rusage is None:
+            return self.stats
+
+        before = self._rusage
+        after = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+        maxrss = None
+        if after.ru_maxrss > before.ru_maxrss:
+            maxrss = after.ru_maxrss * MAXRSS_UNIT
+
+        io = read_proc_io()
+        if io is not None and self._io is not None:
+            read_bytes = io["read_bytes"] - self._io["read_bytes"]
+            write_bytes = io["write_bytes"] - self._io["write_bytes"]
+        else:
+            read_bytes = (after.ru_inblock - before.ru_inblock) * BLOCK_SIZE
+            write_bytes = (after.ru_oublock - before.ru_oublock) * BLOCK_SIZE
+
+        self.stats = {
+            "maxrss": maxrss,
+            "cpu_user": round(after.ru_utime - before.ru_utime, 6),
+            "cpu_system": round(after.ru_stime - before.ru_stime, 6),
+            "read_bytes": read_bytes,
+            "write_bytes": write_bytes,
+        }
+        return self.stats
+
+    def as_dict(self) -> dict:
+        return dict(self.stats)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
@@ -0,0 +1,60 @@
+import os
+import sys
+import json
+import subprocess
+import unittest as ut
+
+import mkite_core
+
+
+# maximum time (in seconds) to import `mkite_core.models` in a new interpreter
+MODELS_IMPORT_BUDGET = 1.0
+
+HEAVY_MODULES = ["pymatgen", "ase", "rdkit", "pkg_resources", "scipy"]
+
+SCRIPT = """
+import sys
+import json
+import time
+
+start = time.perf_counter()
+import {module}
+duration = time.perf_counter() - start
+
+print(json.dumps({{"duration": duration, "modules": list(sys.modules)}}))
+"""
+
+
+def import_module(module: str) -> dict:
+    """Imports `module` in a fresh interpreter and reports how long it
+    took and which modules were loaded"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(mkite_core.__file__)))
+    pythonpath = os.pathsep.join([root, os.environ.get("PYTHONPATH", "")])
+    env = {**os.environ, "PYTHONPATH": pythonpath}
+
+    proc = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(module=module)],
+        stdout=subprocess.PIPE,
+        check=True,
+        env=env,
+    )
+    return json.loads(proc.stdout)
+
+
+def get_heavy_modules(modules: list) -> list:
+    return sorted({m for m in modules if m.split(".")[0] in HEAVY_MODULES})
+
+
+class TestImports(ut.TestCase):
+    def test_models(self):
+        result = import_module("mkite_core.models")
+        self.assertEqual(get_heavy_modules(result["modules"]), [])
+        self.assertLess(result["duration"], MODELS_IMPORT_BUDGET)
+
+    def test_recipes(self):
+        result = import_module("mkite_core.recipes")
+        self.assertEqual(get_heavy_modules(result["modules"]), [])
+
+    def test_cli(self):
+        result = import_module("mkite_core.cli.kite")
+        self.assertEqual(get_heavy_modules(result["modules"]), [])